@@ -0,0 +1,290 @@
+"""
+Worker asyncio: procesa cientos de mensajes concurrentes en un solo proceso.
+
+El análisis pasa casi todo el tiempo esperando a Gemini, así que en lugar de
+un hilo por mensaje (worker.py en modo threads) cada mensaje es una tarea de
+asyncio. Sacar de la cola, guardar en MongoDB y confirmar siguen siendo
+llamadas síncronas cortas que corren en un pool de ASYNC_IO_THREADS hilos.
+"""
+
+import asyncio
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from flask_socketio import SocketIO
+from src.frameworks.db.mongo import create_mongo_client
+from src.frameworks.db.redis import create_redis_client
+from src.frameworks.cache.async_redis_cache import AsyncRedisCache
+from src.frameworks.cache.generations import CacheGenerations
+from src.frameworks.queue.message_queue import MessageQueue
+from src.frameworks.queue.factory import create_message_queue
+from src.frameworks.queue.retry_scheduler import RetryScheduler
+from src.frameworks.resilience.rate_limiter import RedisRateLimiter
+from src.frameworks.resilience.circuit_breaker import CircuitBreaker
+from src.frameworks.websocket.socketio_manager import SocketIOManager
+from src.frameworks.websocket.stats_broadcaster import StatsBroadcaster, DEFERRED_INTERVAL_MS
+from src.app.messages.repositories.message_repository import MessageRepository
+from src.app.messages.repositories.analysis_cache_repository import AnalysisCacheRepository, AnalysisHitCounter
+from src.app.messages.services.async_sentiment_analysis_service import AsyncSentimentAnalysisService
+from src.app.messages.services.sentiment_analysis_service import neutral_fallback_analysis, compute_cache_generation
+from src.app.messages.services.lexicon_classifier import LexiconClassifier
+from src.app.messages.services.output_metrics import OutputMetrics
+from src.app.dashboard.repositories.dashboard_repository import DashboardRepository
+from src.app.dashboard.repositories.dashboard_counters import DashboardCounters
+from src.app.dashboard.repositories.rollup_repository import RollupRepository
+from src.frameworks.logging.logger import setup_logger
+from src.config.settings import settings
+from worker import handle_failure, start_maintenance
+
+
+logger = setup_logger(__name__)
+
+
+async def process_message(message_data: dict, message_queue: MessageQueue,
+                          repository: MessageRepository,
+                          sentiment_service: AsyncSentimentAnalysisService,
+                          retry_scheduler: Optional[RetryScheduler] = None):
+    """
+    Procesa un mensaje de la cola: analiza con IA (con timeout de
+    ASYNC_TASK_TIMEOUT), actualiza en MongoDB y confirma el mensaje.
+
+    Si la tarea se cancela por el shutdown, el mensaje vuelve a la cola sin
+    gastar un intento.
+
+    Args:
+        message_data: Dict con texto_mensaje, numero_remitente, message_id
+        message_queue: Cola de mensajes
+        repository: Repositorio de mensajes (con socket manager configurado)
+        sentiment_service: Servicio de análisis asíncrono
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
+    """
+    message_id = message_data.get("message_id")
+
+    try:
+        analysis = await asyncio.wait_for(
+            sentiment_service.analyze_message(message_data["texto_mensaje"]),
+            timeout=settings.ASYNC_TASK_TIMEOUT
+        )
+
+        await asyncio.to_thread(
+            repository.update_analysis,
+            message_id=message_id,
+            sentimiento=analysis["sentimiento"],
+            tema=analysis["tema"],
+            resumen=analysis["resumen"],
+            numero_remitente=message_data.get("numero_remitente"),
+            origen=analysis.get("origen")
+        )
+
+        logger.info(f"Mensaje {message_id} procesado ({analysis.get('origen')}): "
+                    f"{analysis['sentimiento']}/{analysis['tema']}")
+
+    except asyncio.CancelledError:
+        logger.warning(f"Análisis de {message_id} cancelado por shutdown, se devuelve a la cola")
+        message_queue.requeue(message_data)
+        message_queue.ack(message_data)
+        raise
+    except asyncio.TimeoutError:
+        logger.error(f"Análisis de {message_id} superó {settings.ASYNC_TASK_TIMEOUT}s")
+        await asyncio.to_thread(handle_failure, message_data,
+                                TimeoutError("Tiempo de análisis agotado"), retry_scheduler)
+    except Exception as e:
+        logger.error(f"Error procesando mensaje {message_id}: {e}")
+        await asyncio.to_thread(handle_failure, message_data, e, retry_scheduler)
+
+    await asyncio.to_thread(message_queue.ack, message_data)
+
+
+async def run(message_queue: MessageQueue, repository: MessageRepository,
+              sentiment_service: AsyncSentimentAnalysisService, concurrency: int,
+              retry_scheduler: Optional[RetryScheduler] = None):
+    """
+    Saca mensajes de la cola y lanza una tarea por mensaje, con hasta
+    `concurrency` tareas en vuelo.
+
+    Al recibir SIGTERM o SIGINT deja de sacar mensajes, espera hasta
+    WORKER_SHUTDOWN_TIMEOUT a las tareas en vuelo y cancela las que queden.
+
+    Args:
+        message_queue: Cola de mensajes
+        repository: Repositorio de mensajes
+        sentiment_service: Servicio de análisis asíncrono
+        concurrency: Número máximo de mensajes en vuelo
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=settings.ASYNC_IO_THREADS, thread_name_prefix="async-worker-io"
+    ))
+
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    slots = asyncio.Semaphore(concurrency)
+    in_flight = set()
+
+    def finish(task: asyncio.Task):
+        in_flight.discard(task)
+        slots.release()
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error no controlado en tarea del worker: {task.exception()}")
+
+    while not stop.is_set():
+        try:
+            await slots.acquire()
+            if stop.is_set():
+                slots.release()
+                break
+
+            # Timeout corto para notar el shutdown mientras la cola está vacía
+            message_data = await asyncio.to_thread(message_queue.dequeue, 1)
+            if not message_data:
+                slots.release()
+                continue
+
+            task = asyncio.create_task(process_message(
+                message_data, message_queue, repository, sentiment_service, retry_scheduler
+            ))
+            in_flight.add(task)
+            task.add_done_callback(finish)
+
+        except Exception as e:
+            logger.error(f"Error en loop principal del worker: {e}")
+            await asyncio.sleep(1)
+
+    logger.warning("Señal de shutdown recibida, terminando worker...")
+
+    if in_flight:
+        logger.info(f"Drenando {len(in_flight)} mensajes en vuelo "
+                    f"(máximo {settings.WORKER_SHUTDOWN_TIMEOUT}s)...")
+        _, pending = await asyncio.wait(set(in_flight), timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+        if pending:
+            logger.warning(f"Cancelando {len(pending)} mensajes que no terminaron antes del timeout de shutdown")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def main():
+    """Función principal del worker asyncio"""
+    settings.validate()
+
+    # Inicializar dependencias
+    mongo_client = create_mongo_client()
+    mongo_db = mongo_client[settings.MONGO_DB_NAME]
+    redis_client = create_redis_client()
+
+    # Configurar Socket.IO para emitir eventos a través de Redis
+    if settings.REDIS_PASSWORD:
+        redis_url = f'redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/0'
+    else:
+        redis_url = f'redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0'
+
+    socketio = SocketIO(message_queue=redis_url)
+    socketio_manager = SocketIOManager(socketio)
+
+    dashboard_counters = None
+    if settings.DASHBOARD_COUNTERS_ENABLED:
+        dashboard_counters = DashboardCounters(
+            redis_client,
+            log_deltas=settings.STATS_DELTA_EVENTS and settings.STATS_BROADCAST_INTERVAL_MS > 0
+        )
+    dashboard_repository = DashboardRepository(mongo_db, counters=dashboard_counters)
+    message_queue = create_message_queue()
+    retry_scheduler = RetryScheduler(message_queue)
+    redis_cache = AsyncRedisCache()
+
+    # Límites compartidos de Gemini con los demás workers (cliente asyncio:
+    # esperar capacidad no ocupa los hilos de la cola y de MongoDB)
+    rate_limiter = None
+    if settings.GEMINI_RPM or settings.GEMINI_TPM:
+        rate_limiter = RedisRateLimiter(
+            redis_cache.client,
+            name="gemini",
+            requests_per_minute=settings.GEMINI_RPM,
+            tokens_per_minute=settings.GEMINI_TPM
+        )
+
+    circuit_breaker = CircuitBreaker(
+        "gemini",
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        latency_threshold=settings.CIRCUIT_BREAKER_LATENCY_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+        state_client=redis_client
+    )
+
+    cache_generations = CacheGenerations(redis_client, compute_cache_generation())
+    cache_generations.heartbeat()
+
+    local_classifier = LexiconClassifier() if settings.LEXICON_ENABLED else None
+
+    fallback_analyzer = None
+    if settings.CIRCUIT_BREAKER_FALLBACK == "neutral":
+        fallback_analyzer = neutral_fallback_analysis
+    elif settings.CIRCUIT_BREAKER_FALLBACK == "lexicon":
+        fallback_analyzer = (local_classifier or LexiconClassifier()).classify
+
+    analysis_store = AnalysisCacheRepository(mongo_db) if settings.ANALYSIS_CACHE_STORE_ENABLED else None
+
+    sentiment_service = AsyncSentimentAnalysisService(
+        redis_cache=redis_cache,
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+        fallback_analyzer=fallback_analyzer,
+        local_classifier=local_classifier,
+        analysis_store=analysis_store,
+        output_metrics=OutputMetrics(redis_cache.client),
+        hit_counter=AnalysisHitCounter(redis_cache.client) if analysis_store else None
+    )
+
+    # El worker con el turno emite lo que cualquier proceso marcó como pendiente,
+    # incluidos los mensajes que el webhook resuelve desde caché
+    interval_ms = settings.STATS_BROADCAST_INTERVAL_MS or DEFERRED_INTERVAL_MS
+    if dashboard_counters and dashboard_counters.log_deltas:
+        # Los deltas registrados se emiten en orden de versión
+        stats_broadcaster = StatsBroadcaster(
+            redis_client,
+            snapshot=dashboard_counters.take_deltas,
+            emit=socketio_manager.emit_stats_deltas,
+            interval_ms=interval_ms
+        )
+    else:
+        stats_broadcaster = StatsBroadcaster(
+            redis_client,
+            snapshot=lambda: dashboard_repository.get_dashboard_snapshot(topics_limit=6),
+            emit=socketio_manager.emit_stats_updated,
+            interval_ms=interval_ms
+        )
+    stats_broadcaster.start()
+
+    message_repository = MessageRepository(
+        mongo_db=mongo_db,
+        socketio_manager=socketio_manager,
+        dashboard_repository=dashboard_repository,
+        dashboard_counters=dashboard_counters,
+        # Sin emisión agrupada el worker emite stats_updated en cada análisis
+        stats_broadcaster=stats_broadcaster if settings.STATS_BROADCAST_INTERVAL_MS else None,
+        rollup_repository=RollupRepository(mongo_db) if settings.ROLLUPS_ENABLED else None
+    )
+
+    # El volcado de aciertos corre en el hilo de mantenimiento: usa el cliente síncrono
+    hit_flusher = AnalysisHitCounter(redis_client, analysis_store) if analysis_store else None
+    start_maintenance(message_queue, retry_scheduler, cache_generations, dashboard_repository,
+                      circuit_breaker, hit_flusher)
+
+    logger.info(f"Worker asyncio escuchando cola '{message_queue.queue_name}' "
+                f"con hasta {settings.ASYNC_WORKER_CONCURRENCY} mensajes en vuelo...")
+
+    try:
+        await run(message_queue, message_repository, sentiment_service,
+                  concurrency=settings.ASYNC_WORKER_CONCURRENCY, retry_scheduler=retry_scheduler)
+    finally:
+        await redis_cache.close()
+        circuit_breaker.unpublish()
+
+    logger.info("Worker detenido correctamente")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,11 @@
+from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
+from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
 from src.frameworks.http.decorators import handle_errors
+from src.frameworks.http.error_handlers import ValidationError
+from src.frameworks.db.collections import GRANULARIDADES
+from src.utils.datetime_utils import parse_local_date
 
 logger = setup_logger(__name__)
 
@@ -15,6 +20,19 @@ def dashboard_blueprint(dashboard_usecase):
 
     blueprint = Blueprint("dashboard", __name__)
 
+    @blueprint.route("/dashboard", methods=["GET"])
+    @handle_errors
+    def get_dashboard_snapshot():
+        """Obtiene estadísticas, distribución de sentimientos y temas frecuentes en una sola respuesta"""
+        limit = request.args.get("limit", default=6, type=int)
+        snapshot = dashboard_usecase.get_dashboard_snapshot(topics_limit=limit)
+
+        return jsonify({
+            "code": "SUCCESS",
+            "message": "Datos del dashboard obtenidos",
+            "data": snapshot
+        }), 200
+
     @blueprint.route("/estadisticas", methods=["GET"])
     @handle_errors
     def get_statistics():
@@ -52,6 +70,51 @@ def dashboard_blueprint(dashboard_usecase):
             "data": topics
         }), 200
 
+    @blueprint.route("/tendencias", methods=["GET"])
+    @handle_errors
+    def get_trends():
+        """
+        Obtiene la evolución por hora o por día de los mensajes analizados,
+        por tema y sentimiento. Lee solo la colección de rollups.
+
+        Query params (fechas ISO 8601 en hora local):
+            desde: Inicio del rango (default: hace 30 días)
+            hasta: Fin del rango, exclusivo (default: ahora)
+            granularidad: "hora" o "dia" (default: "dia")
+
+        El rango no puede abarcar más de TRENDS_MAX_BUCKETS buckets.
+        """
+        granularidad = request.args.get("granularidad", default="dia")
+        if granularidad not in GRANULARIDADES:
+            raise ValidationError(f"'granularidad' debe ser uno de: {', '.join(GRANULARIDADES)}")
+
+        try:
+            hasta = parse_local_date(request.args["hasta"]) if request.args.get("hasta") else datetime.utcnow()
+            desde = parse_local_date(request.args["desde"]) if request.args.get("desde") else hasta - timedelta(days=30)
+        except ValueError:
+            raise ValidationError("'desde' y 'hasta' deben ser fechas ISO 8601 (por ejemplo, 2025-01-31)")
+
+        if desde >= hasta:
+            raise ValidationError("'desde' debe ser anterior a 'hasta'")
+
+        bucket_size = timedelta(hours=1) if granularidad == "hora" else timedelta(days=1)
+        if (hasta - desde) / bucket_size > settings.TRENDS_MAX_BUCKETS:
+            raise ValidationError(f"El rango supera {settings.TRENDS_MAX_BUCKETS} buckets por {granularidad}; "
+                                  "reduzca el rango o use una granularidad mayor")
+
+        trends = dashboard_usecase.get_trends(desde, hasta, granularidad)
+
+        return jsonify({
+            "code": "SUCCESS",
+            "message": "Tendencias obtenidas",
+            "data": {
+                "granularidad": granularidad,
+                "desde": desde.isoformat(),
+                "hasta": hasta.isoformat(),
+                "buckets": trends
+            }
+        }), 200
+
     @blueprint.route("/mensajes-recientes", methods=["GET"])
     @handle_errors
     def get_recent_messages():
@@ -0,0 +1,311 @@
+"""
+Contadores del dashboard en Redis, mantenidos en cada escritura de mensajes.
+"""
+
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Separador de tema y sentimiento en el hash de pares (ningún tema lo contiene)
+PAIR_SEPARATOR = "|"
+
+# Deltas pendientes de emitir que se conservan si ningún proceso los emite
+DELTA_LOG_SIZE = 10000
+
+# Incrementa la versión, aplica los deltas y (si ARGV[2] > 0) guarda el delta
+# en el log ordenado por versión, todo atómico.
+# KEYS: versión, log, hashes. ARGV: cambios en JSON, tamaño del log, (campo, cantidad) por hash.
+APPLY_SCRIPT = """
+local version = redis.call('INCR', KEYS[1])
+for i = 3, #KEYS do
+    redis.call('HINCRBY', KEYS[i], ARGV[(i - 3) * 2 + 3], ARGV[(i - 3) * 2 + 4])
+end
+local log_size = tonumber(ARGV[2])
+if log_size > 0 then
+    redis.call('ZADD', KEYS[2], version, version .. ':' .. ARGV[1])
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(log_size + 1))
+end
+return version
+"""
+
+# Saca del log los deltas posteriores a la última versión emitida y avanza el cursor.
+# KEYS: log, cursor
+TAKE_SCRIPT = """
+local cursor = tonumber(redis.call('GET', KEYS[2]) or '0')
+local entries = redis.call('ZRANGEBYSCORE', KEYS[1], '(' .. cursor, '+inf', 'WITHSCORES')
+if #entries == 0 then
+    return {}
+end
+local last = entries[#entries]
+redis.call('SET', KEYS[2], last)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', last)
+return entries
+"""
+
+# Reemplaza todos los conteos solo si la versión no cambió desde que se leyó
+# antes de agregar en MongoDB; si cambió, algún delta se aplicó durante la
+# agregación y el reemplazo lo borraría. Devuelve la nueva versión o 0.
+# KEYS: versión, totales, sentimiento, tema, pares, reconciliado.
+# ARGV: versión esperada, fecha de reconciliación, conteos por hash en JSON.
+REPLACE_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+local counts = cjson.decode(ARGV[3])
+for i = 2, 5 do
+    for field, value in pairs(counts[i - 1]) do
+        redis.call('HSET', KEYS[i], field, value)
+    end
+end
+redis.call('SET', KEYS[6], ARGV[2])
+return redis.call('INCR', KEYS[1])
+"""
+
+# Borra el lock solo si sigue teniendo el token de quien lo tomó
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class DashboardCounters:
+    """
+    Conteos del dashboard en hashes de Redis:
+
+    - `<prefix>:totales`: total de mensajes y mensajes analizados
+    - `<prefix>:sentimiento`: mensajes por sentimiento
+    - `<prefix>:tema`: mensajes por tema
+    - `<prefix>:tema_sentimiento`: mensajes por `<tema>|<sentimiento>`
+
+    Cada escritura aplica sus deltas en un script atómico, así que leer el dashboard
+    cuesta lo mismo sin importar el tamaño de la colección. Si algún delta se
+    pierde (Redis caído, proceso muerto a mitad de camino), la reconciliación
+    periódica contra MongoDB reemplaza los conteos.
+
+    Cada cambio incrementa `<prefix>:version` en el mismo script, así que una
+    versión identifica un estado exacto de los conteos. La reconciliación
+    también la incrementa sin generar delta: los clientes que siguen los
+    deltas ven un salto de versión y piden un snapshot completo.
+
+    Con `log_deltas`, cada delta se guarda además en `<prefix>:deltas`
+    (sorted set por versión). Un solo emisor los saca en orden con
+    take_deltas(), así los clientes no los reciben intercalados entre procesos.
+    """
+
+    def __init__(self, client, prefix: str = "dashboard:counters", log_deltas: bool = False):
+        self.client = client
+        self.prefix = prefix
+        self.totals_key = f"{prefix}:totales"
+        self.sentiments_key = f"{prefix}:sentimiento"
+        self.topics_key = f"{prefix}:tema"
+        self.pairs_key = f"{prefix}:tema_sentimiento"
+        self.reconciled_key = f"{prefix}:reconciliado_en"
+        self.version_key = f"{prefix}:version"
+        self.lock_key = f"{prefix}:reconciliando"
+        self.deltas_key = f"{prefix}:deltas"
+        self.emitted_key = f"{prefix}:emitido"
+        self.log_deltas = log_deltas
+        self._apply_script = client.register_script(APPLY_SCRIPT)
+        self._take_script = client.register_script(TAKE_SCRIPT)
+        self._replace_script = client.register_script(REPLACE_SCRIPT)
+        self._release_script = client.register_script(RELEASE_SCRIPT)
+
+    def record_message(self, sentimiento: str = None, tema: str = None) -> Optional[dict]:
+        """
+        Cuenta un mensaje nuevo (con su análisis si ya lo trae).
+
+        Args:
+            sentimiento: Sentimiento del mensaje o None si está pendiente
+            tema: Tema del mensaje o None si está pendiente
+
+        Returns:
+            Delta aplicado (ver _apply) o None
+        """
+        deltas = Counter({(self.totals_key, "total"): 1})
+        deltas.update(self._analysis_deltas(sentimiento, tema, 1))
+        return self._apply(deltas)
+
+    def record_analyses(self, changes: Iterable[Tuple[str, str, Optional[str], Optional[str]]]) -> Optional[dict]:
+        """
+        Cuenta análisis guardados sobre mensajes existentes. Si el mensaje ya
+        tenía un análisis, se descuenta el anterior.
+
+        Args:
+            changes: Tuplas (sentimiento, tema, sentimiento anterior, tema anterior)
+
+        Returns:
+            Delta aplicado (ver _apply) o None
+        """
+        deltas = Counter()
+        for sentimiento, tema, previous_sentimiento, previous_tema in changes:
+            deltas.update(self._analysis_deltas(sentimiento, tema, 1))
+            deltas.update(self._analysis_deltas(previous_sentimiento, previous_tema, -1))
+        return self._apply(deltas)
+
+    def get_counts(self) -> Optional[dict]:
+        """
+        Lee todos los conteos en un solo round trip.
+
+        Returns:
+            Dict con version, total, analizados, sentimientos, temas y pares, o
+            None si los contadores nunca se reconciliaron (no son confiables todavía)
+        """
+        # MULTI para que la versión corresponda exactamente a los conteos leídos
+        pipe = self.client.pipeline(transaction=True)
+        pipe.exists(self.reconciled_key)
+        pipe.get(self.version_key)
+        pipe.hgetall(self.totals_key)
+        pipe.hgetall(self.sentiments_key)
+        pipe.hgetall(self.topics_key)
+        pipe.hgetall(self.pairs_key)
+        reconciled, version, totals, sentiments, topics, pairs = pipe.execute()
+
+        if not reconciled:
+            return None
+
+        return {
+            "version": int(version or 0),
+            "total": int(totals.get("total", 0)),
+            "analizados": int(totals.get("analizados", 0)),
+            "sentimientos": self._positive(sentiments),
+            "temas": self._positive(topics),
+            "pares": self._positive(pairs)
+        }
+
+    def take_deltas(self) -> List[dict]:
+        """
+        Saca los deltas registrados después del último emitido, en orden de
+        versión. Lo llama un solo emisor a la vez (el turno de StatsBroadcaster).
+
+        Returns:
+            Lista de deltas ({"version": 8, "cambios": {...}}), vacía si no hay nuevos
+        """
+        entries = self._take_script(keys=[self.deltas_key, self.emitted_key])
+        deltas = []
+        for member in entries[::2]:
+            version, cambios = member.split(":", 1)
+            deltas.append({"version": int(version), "cambios": json.loads(cambios)})
+        return deltas
+
+    def acquire_reconcile_lock(self, ttl: int = 60) -> Optional[str]:
+        """
+        Reserva la reconciliación para este proceso (una a la vez en el cluster).
+
+        Returns:
+            Token para liberar la reserva, o None si otro proceso la tiene
+        """
+        token = uuid.uuid4().hex
+        if self.client.set(self.lock_key, token, nx=True, ex=ttl):
+            return token
+        return None
+
+    def release_reconcile_lock(self, token: str):
+        """Libera la reserva de reconciliación si sigue siendo de este proceso"""
+        try:
+            self._release_script(keys=[self.lock_key], args=[token])
+        except Exception as e:
+            logger.error(f"Error liberando lock de reconciliación: {e}")
+
+    def get_version(self) -> int:
+        """Versión actual de los conteos (0 si nunca se escribieron)"""
+        return int(self.client.get(self.version_key) or 0)
+
+    def replace(self, total: int, groups: List[Tuple[Optional[str], Optional[str], int]], expected_version: int) -> bool:
+        """
+        Reemplaza atómicamente todos los conteos con los calculados en MongoDB,
+        siempre que la versión siga siendo la leída antes de la agregación.
+
+        Args:
+            total: Total de mensajes
+            groups: Tuplas (tema, sentimiento, cantidad) de los mensajes analizados
+            expected_version: Versión leída con get_version() antes de agregar
+
+        Returns:
+            True si se reemplazó; False si algún delta se aplicó durante la
+            agregación (hay que volver a agregar)
+        """
+        sentiments = Counter()
+        topics = Counter()
+        pairs = Counter()
+        analyzed = 0
+
+        for tema, sentimiento, count in groups:
+            analyzed += count if sentimiento else 0
+            if sentimiento:
+                sentiments[sentimiento] += count
+            if tema:
+                topics[tema] += count
+            if sentimiento and tema:
+                pairs[f"{tema}{PAIR_SEPARATOR}{sentimiento}"] += count
+
+        counts = [{"total": total, "analizados": analyzed}, dict(sentiments), dict(topics), dict(pairs)]
+        version = self._replace_script(
+            keys=[
+                self.version_key, self.totals_key, self.sentiments_key,
+                self.topics_key, self.pairs_key, self.reconciled_key
+            ],
+            args=[expected_version, datetime.utcnow().isoformat(), json.dumps(counts, separators=(",", ":"))]
+        )
+        return bool(version)
+
+    def _analysis_deltas(self, sentimiento: Optional[str], tema: Optional[str], sign: int) -> Counter:
+        """Deltas de sumar (sign=1) o restar (sign=-1) un análisis"""
+        deltas = Counter()
+        if sentimiento:
+            deltas[(self.totals_key, "analizados")] += sign
+            deltas[(self.sentiments_key, sentimiento)] += sign
+        if tema:
+            deltas[(self.topics_key, tema)] += sign
+        if sentimiento and tema:
+            deltas[(self.pairs_key, f"{tema}{PAIR_SEPARATOR}{sentimiento}")] += sign
+        return deltas
+
+    def _apply(self, deltas: Counter) -> Optional[dict]:
+        """
+        Aplica los deltas distintos de cero e incrementa la versión en un
+        script atómico (y registra el delta en el log si `log_deltas`).
+
+        Returns:
+            Dict con la nueva versión y los cambios con la misma forma que
+            get_counts ({"version": 8, "cambios": {"total": 1,
+            "sentimientos": {"positivo": 1}, "temas": {"Precio": 1}, ...}}),
+            o None si no hubo cambios o falló Redis
+        """
+        deltas = {field: amount for field, amount in deltas.items() if amount}
+        if not deltas:
+            return None
+
+        groups = {self.sentiments_key: "sentimientos", self.topics_key: "temas", self.pairs_key: "pares"}
+        cambios = {}
+        for (key, field), amount in deltas.items():
+            if key == self.totals_key:
+                cambios[field] = amount
+            else:
+                cambios.setdefault(groups[key], {})[field] = amount
+
+        keys = [self.version_key, self.deltas_key]
+        args = [json.dumps(cambios, separators=(",", ":")), DELTA_LOG_SIZE if self.log_deltas else 0]
+        for (key, field), amount in deltas.items():
+            keys.append(key)
+            args.extend([field, amount])
+
+        try:
+            version = self._apply_script(keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Error actualizando contadores del dashboard (se corrigen al reconciliar): {e}")
+            return None
+
+        return {"version": version, "cambios": cambios}
+
+    @staticmethod
+    def _positive(counts: dict) -> dict:
+        """Convierte a enteros y descarta los conteos en cero"""
+        return {field: int(value) for field, value in counts.items() if int(value) > 0}
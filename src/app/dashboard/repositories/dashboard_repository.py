@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
 from src.frameworks.http.error_handlers import DatabaseError
@@ -7,12 +7,17 @@ from src.frameworks.db.serializers import serialize_mongo_document
 
 logger = setup_logger(__name__)
 
+# Intentos de reconciliación antes de rendirse si los deltas no dejan de llegar
+RECONCILE_ATTEMPTS = 3
+
 class DashboardRepository():
     """Repositorio para gestionar datos del dashboard en MongoDB"""
 
-    def __init__(self, mongo_db, test=False):
+    def __init__(self, mongo_db, test=False, counters=None):
         self.mongo_db = mongo_db
         self.test = test
+        # Contadores en Redis (DashboardCounters); sin ellos se agrega en MongoDB
+        self.counters = counters
         collection_name = settings.MONGO_COLLECTION_MENSAJES
 
         if test:
@@ -27,6 +32,10 @@ class DashboardRepository():
         Returns:
             Diccionario con estadísticas
         """
+        counts = self._get_counts()
+        if counts:
+            return self._statistics_from_counts(counts)
+
         total = self.collection.count_documents({})
 
         pipeline_sentimientos = [
@@ -85,6 +94,10 @@ class DashboardRepository():
         Returns:
             Diccionario con porcentaje por sentimiento
         """
+        counts = self._get_counts()
+        if counts:
+            return self._distribution_from_counts(counts)
+
         pipeline = [
             {"$match": {"sentimiento": {"$ne": None}}},
             {"$group": {
@@ -123,6 +136,10 @@ class DashboardRepository():
         Returns:
             Lista de temas con su frecuencia
         """
+        counts = self._get_counts()
+        if counts:
+            return self._topics_from_counts(counts, limit)
+
         pipeline = [
             {"$match": {"tema": {"$ne": None}}},
             {"$group": {
@@ -149,6 +166,55 @@ class DashboardRepository():
 
         return topics
 
+    def get_dashboard_snapshot(self, topics_limit: int = 6) -> dict:
+        """
+        Obtiene en una sola consulta todo lo que muestra el dashboard:
+        estadísticas generales, distribución de sentimientos y temas frecuentes.
+        Sin contadores en Redis usa una sola agregación con $facet.
+
+        Args:
+            topics_limit: Número de temas frecuentes a incluir
+
+        Returns:
+            Dict de get_statistics con distribucion_sentimientos y temas_frecuentes
+        """
+        counts = self._get_counts()
+
+        if not counts:
+            pipeline = [
+                {"$facet": {
+                    "total": [{"$count": "count"}],
+                    "sentimientos": [
+                        {"$match": {"sentimiento": {"$ne": None}}},
+                        {"$group": {"_id": "$sentimiento", "count": {"$sum": 1}}}
+                    ],
+                    "temas": [
+                        {"$match": {"tema": {"$ne": None}}},
+                        {"$group": {"_id": "$tema", "count": {"$sum": 1}}},
+                        {"$sort": {"count": -1}},
+                        {"$limit": max(topics_limit, 1)}
+                    ]
+                }}
+            ]
+
+            cursor = self.collection.aggregate(
+                pipeline,
+                readConcern={"level": "majority"}
+            )
+            facets = next(cursor, {})
+
+            counts = {
+                "total": facets["total"][0]["count"] if facets.get("total") else 0,
+                "sentimientos": {item["_id"]: item["count"] for item in facets.get("sentimientos", [])},
+                "temas": {item["_id"]: item["count"] for item in facets.get("temas", [])}
+            }
+
+        return {
+            **self._statistics_from_counts(counts),
+            "distribucion_sentimientos": self._distribution_from_counts(counts),
+            "temas_frecuentes": self._topics_from_counts(counts, topics_limit)
+        }
+
     def get_recent_messages(self, limit: int = 10) -> List[dict]:
         """
         Obtiene los mensajes más recientes.
@@ -160,3 +226,118 @@ class DashboardRepository():
         cursor = self.collection.find().sort("timestamp", -1).limit(limit)
         messages = serialize_mongo_document(list(cursor))
         return messages
+
+    def reconcile_counters(self) -> bool:
+        """
+        Recalcula los contadores de Redis desde MongoDB con una sola
+        agregación por (tema, sentimiento). Solo un proceso a la vez.
+
+        La versión se lee antes de agregar y el reemplazo se rechaza si cambió
+        (un delta aplicado durante la agregación se perdería); en ese caso se
+        vuelve a agregar, hasta RECONCILE_ATTEMPTS veces.
+
+        Returns:
+            True si este proceso hizo la reconciliación
+        """
+        if not self.counters:
+            return False
+
+        token = self.counters.acquire_reconcile_lock()
+        if not token:
+            return False
+
+        pipeline = [
+            {"$match": {"$or": [{"sentimiento": {"$ne": None}}, {"tema": {"$ne": None}}]}},
+            {"$group": {
+                "_id": {"tema": "$tema", "sentimiento": "$sentimiento"},
+                "count": {"$sum": 1}
+            }}
+        ]
+
+        try:
+            for _ in range(RECONCILE_ATTEMPTS):
+                version = self.counters.get_version()
+                total = self.collection.count_documents({})
+                groups = [
+                    (item["_id"].get("tema"), item["_id"].get("sentimiento"), item["count"])
+                    for item in self.collection.aggregate(pipeline, readConcern={"level": "majority"})
+                ]
+
+                if self.counters.replace(total, groups, version):
+                    logger.info(f"Contadores del dashboard reconciliados: {total} mensajes")
+                    return True
+
+            logger.warning("Reconciliación de contadores descartada: la versión cambió en cada intento")
+            return False
+        finally:
+            self.counters.release_reconcile_lock(token)
+
+    def get_versioned_counts(self) -> Optional[dict]:
+        """
+        Obtiene los conteos crudos del dashboard con su versión, para que los
+        clientes que siguen los eventos stats_delta se resincronicen.
+
+        Returns:
+            Conteos de DashboardCounters con version, o None sin contadores
+        """
+        return self._get_counts()
+
+    def _get_counts(self) -> Optional[dict]:
+        """
+        Lee los contadores de Redis (reconciliándolos la primera vez).
+
+        Returns:
+            Conteos de DashboardCounters o None si hay que agregar en MongoDB
+        """
+        if not self.counters:
+            return None
+
+        try:
+            counts = self.counters.get_counts()
+            if counts is None and self.reconcile_counters():
+                counts = self.counters.get_counts()
+            return counts
+        except Exception as e:
+            logger.error(f"Error leyendo contadores del dashboard, se agrega en MongoDB: {e}")
+            return None
+
+    @staticmethod
+    def _statistics_from_counts(counts: dict) -> dict:
+        """Arma el mismo dict que get_statistics a partir de los contadores"""
+        sentimientos = counts["sentimientos"]
+        total_analizados = sum(sentimientos.values())
+        temas = counts["temas"]
+
+        def percentage(sentimiento):
+            return round(sentimientos.get(sentimiento, 0) / total_analizados * 100) if total_analizados > 0 else 0
+
+        return {
+            "total_mensajes": counts["total"],
+            "sentimiento_positivo": percentage("positivo"),
+            "sentimiento_negativo": percentage("negativo"),
+            "tema_principal": max(temas, key=temas.get) if temas else "N/A"
+        }
+
+    @staticmethod
+    def _distribution_from_counts(counts: dict) -> dict:
+        """Arma el mismo dict que get_sentiment_distribution a partir de los contadores"""
+        sentimientos = counts["sentimientos"]
+        total = sum(sentimientos.values())
+
+        distribution = {
+            "positivo": 0,
+            "negativo": 0,
+            "neutro": 0
+        }
+
+        for sentimiento, count in sentimientos.items():
+            if sentimiento in distribution and total > 0:
+                distribution[sentimiento] = round((count / total) * 100)
+
+        return distribution
+
+    @staticmethod
+    def _topics_from_counts(counts: dict, limit: int) -> List[dict]:
+        """Arma la misma lista que get_top_topics a partir de los contadores"""
+        temas = sorted(counts["temas"].items(), key=lambda item: item[1], reverse=True)
+        return [{"tema": tema, "cantidad": cantidad} for tema, cantidad in temas[:limit]]
@@ -0,0 +1,174 @@
+"""
+Repositorio de rollups - Conteos de mensajes analizados por hora y por día,
+tema y sentimiento, para consultar tendencias sin recorrer `mensajes`.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+from pymongo import UpdateOne, ASCENDING
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+from src.frameworks.db.collections import GRANULARIDADES
+from src.frameworks.db.serializers import serialize_mongo_document
+from src.utils.datetime_utils import truncate_to_local
+
+logger = setup_logger(__name__)
+
+
+class RollupRepository:
+    """
+    Repositorio de la colección de rollups.
+
+    Cada documento cuenta los mensajes de un bucket:
+    {granularidad: "hora" | "dia", inicio, tema, sentimiento, cantidad}.
+    `inicio` es el comienzo de la hora o del día en hora local (TIMEZONE),
+    guardado en UTC. Los buckets se asignan por el timestamp de llegada del
+    mensaje, no por la hora del análisis.
+    """
+
+    def __init__(self, mongo_db, test=False):
+        self.mongo_db = mongo_db
+        self.test = test
+        collection_name = settings.MONGO_COLLECTION_ROLLUPS
+
+        if test:
+            collection_name += "_test"
+
+        self.collection = mongo_db[collection_name]
+
+    def record(self, changes: Iterable[Tuple[Optional[datetime], Optional[str], Optional[str], int]]):
+        """
+        Suma (o resta) mensajes a sus buckets con upserts $inc en un solo bulk_write.
+
+        Args:
+            changes: Tuplas (timestamp del mensaje, sentimiento, tema, +1 o -1).
+                Las que no tienen sentimiento, tema o timestamp se ignoran.
+        """
+        deltas = Counter()
+        for timestamp, sentimiento, tema, sign in changes:
+            if not (timestamp and sentimiento and tema):
+                continue
+            for granularidad in GRANULARIDADES:
+                deltas[(granularidad, truncate_to_local(timestamp, granularidad), tema, sentimiento)] += sign
+
+        operations = [
+            UpdateOne(
+                {"granularidad": granularidad, "inicio": inicio, "tema": tema, "sentimiento": sentimiento},
+                {"$inc": {"cantidad": amount}},
+                upsert=True
+            )
+            for (granularidad, inicio, tema, sentimiento), amount in deltas.items()
+            if amount
+        ]
+
+        if not operations:
+            return
+
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error actualizando rollups (se corrigen con backfill_rollups): {e}")
+
+    def get_trends(self, desde: datetime, hasta: datetime, granularidad: str) -> list:
+        """
+        Obtiene los conteos por bucket dentro de un rango, leyendo solo rollups.
+
+        Args:
+            desde: Inicio del rango (UTC, inclusive)
+            hasta: Fin del rango (UTC, exclusivo)
+            granularidad: "hora" o "dia"
+
+        Returns:
+            Lista ordenada de buckets con inicio, total, sentimientos y temas
+        """
+        cursor = self.collection.find(
+            {"granularidad": granularidad, "inicio": {"$gte": desde, "$lt": hasta}, "cantidad": {"$gt": 0}},
+            {"_id": 0, "inicio": 1, "tema": 1, "sentimiento": 1, "cantidad": 1}
+        ).sort("inicio", ASCENDING)
+
+        buckets = {}
+        for doc in cursor:
+            bucket = buckets.setdefault(doc["inicio"], {
+                "inicio": doc["inicio"],
+                "total": 0,
+                "sentimientos": {},
+                "temas": {}
+            })
+            bucket["total"] += doc["cantidad"]
+            bucket["sentimientos"][doc["sentimiento"]] = bucket["sentimientos"].get(doc["sentimiento"], 0) + doc["cantidad"]
+            bucket["temas"][doc["tema"]] = bucket["temas"].get(doc["tema"], 0) + doc["cantidad"]
+
+        return serialize_mongo_document(list(buckets.values()))
+
+    def rebuild(self, mensajes_collection, desde: datetime = None, hasta: datetime = None):
+        """
+        Recalcula los rollups desde la colección de mensajes con una agregación
+        que escribe directamente en la colección de rollups ($merge). Antes se
+        borran los rollups del rango, así que también desaparecen los buckets
+        que quedaron con conteo distinto de cero sin mensajes detrás (un $inc
+        duplicado o perdido). Se puede repetir.
+
+        El rango se amplía a días completos para no reemplazar un bucket diario
+        con un conteo parcial.
+
+        Args:
+            mensajes_collection: Colección de mensajes
+            desde: Solo mensajes desde esta fecha (UTC, opcional)
+            hasta: Solo mensajes antes de esta fecha (UTC, opcional)
+        """
+        if desde:
+            desde = truncate_to_local(desde, "dia")
+        if hasta:
+            day_start = truncate_to_local(hasta, "dia")
+            hasta = day_start if day_start == hasta else truncate_to_local(day_start + timedelta(hours=36), "dia")
+
+        match = {"sentimiento": {"$ne": None}, "tema": {"$ne": None}}
+        bucket_range = {}
+        if desde:
+            bucket_range["$gte"] = desde
+        if hasta:
+            bucket_range["$lt"] = hasta
+        if bucket_range:
+            match["timestamp"] = bucket_range
+
+        # Con el rango alineado a días, los buckets por hora y por día del rango
+        # son exactamente los que tienen `inicio` dentro de [desde, hasta)
+        deleted = self.collection.delete_many({"inicio": bucket_range} if bucket_range else {})
+        logger.info(f"{deleted.deleted_count} rollups del rango eliminados antes de recalcular")
+
+        unidades = {"hora": "hour", "dia": "day"}
+
+        for granularidad in GRANULARIDADES:
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": {
+                        "inicio": {"$dateTrunc": {
+                            "date": "$timestamp",
+                            "unit": unidades[granularidad],
+                            "timezone": settings.TIMEZONE
+                        }},
+                        "tema": "$tema",
+                        "sentimiento": "$sentimiento"
+                    },
+                    "cantidad": {"$sum": 1}
+                }},
+                {"$project": {
+                    "_id": 0,
+                    "granularidad": {"$literal": granularidad},
+                    "inicio": "$_id.inicio",
+                    "tema": "$_id.tema",
+                    "sentimiento": "$_id.sentimiento",
+                    "cantidad": 1
+                }},
+                {"$merge": {
+                    "into": self.collection.name,
+                    "on": ["granularidad", "inicio", "tema", "sentimiento"],
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert"
+                }}
+            ]
+
+            mensajes_collection.aggregate(pipeline, allowDiskUse=True)
+            logger.info(f"Rollups por {granularidad} recalculados")
@@ -2,7 +2,9 @@
 Casos de uso para el dashboard.
 """
 
+from datetime import datetime
 from src.frameworks.logging.logger import setup_logger
+from src.frameworks.http.error_handlers import NotFoundError
 from src.app.dashboard.repositories.dashboard_repository import DashboardRepository
 
 logger = setup_logger(__name__)
@@ -15,8 +17,9 @@ class DashboardUsecase:
     El caso de uso debe funcionar independientemente de la implementación del repositorio.
     """
 
-    def __init__(self, dashboard_repository: DashboardRepository):
+    def __init__(self, dashboard_repository: DashboardRepository, rollup_repository=None):
         self.dashboard_repository = dashboard_repository
+        self.rollup_repository = rollup_repository
 
     def get_statistics(self) -> dict:
         """
@@ -48,6 +51,18 @@ class DashboardUsecase:
         """
         return self.dashboard_repository.get_top_topics(limit)
 
+    def get_dashboard_snapshot(self, topics_limit: int = 6) -> dict:
+        """
+        Obtiene estadísticas, distribución de sentimientos y temas frecuentes juntos.
+
+        Args:
+            topics_limit: Número de temas a incluir
+
+        Returns:
+            Dict con todos los datos del dashboard
+        """
+        return self.dashboard_repository.get_dashboard_snapshot(topics_limit)
+
     def get_recent_messages(self, limit: int = 10) -> list:
         """
         Obtiene los mensajes más recientes.
@@ -59,3 +74,23 @@ class DashboardUsecase:
             Lista de mensajes
         """
         return self.dashboard_repository.get_recent_messages(limit)
+
+    def get_trends(self, desde: datetime, hasta: datetime, granularidad: str) -> list:
+        """
+        Obtiene la evolución de mensajes por tema y sentimiento en un rango.
+
+        Args:
+            desde: Inicio del rango (UTC, inclusive)
+            hasta: Fin del rango (UTC, exclusivo)
+            granularidad: "hora" o "dia"
+
+        Returns:
+            Lista de buckets con inicio, total, sentimientos y temas
+
+        Raises:
+            NotFoundError: Si los rollups no están habilitados
+        """
+        if not self.rollup_repository:
+            raise NotFoundError("Las tendencias no están habilitadas (ROLLUPS_ENABLED)")
+
+        return self.rollup_repository.get_trends(desde, hasta, granularidad)
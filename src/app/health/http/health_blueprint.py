@@ -0,0 +1,83 @@
+"""
+Blueprint con el estado de las dependencias externas.
+"""
+
+from flask import Blueprint, jsonify
+from src.frameworks.logging.logger import setup_logger
+from src.frameworks.http.decorators import handle_errors
+from src.frameworks.http.error_handlers import NotFoundError
+from src.frameworks.resilience.circuit_breaker import CircuitBreaker
+from src.frameworks.cache.tiered_cache import TieredCache
+from src.app.messages.services.output_metrics import OutputMetrics
+
+logger = setup_logger(__name__)
+
+
+def health_blueprint(redis_client, similarity_cache=None, cache=None, cache_generations=None):
+    """
+    Crea el blueprint de health de dependencias.
+
+    Args:
+        redis_client: Cliente Redis donde los workers publican su estado
+        similarity_cache: Caché por similitud cuyas estadísticas se exponen (opcional)
+        cache: Caché de análisis de este proceso (RedisCache o TieredCache)
+        cache_generations: Generaciones del caché de análisis (conteo de claves)
+    """
+
+    blueprint = Blueprint("health", __name__)
+
+    @blueprint.route("/health/gemini", methods=["GET"])
+    @handle_errors
+    def gemini_health():
+        """
+        Estado del circuit breaker de Gemini en cada worker y métricas de
+        salida por modo (texto o JSON): fallos de parseo y tokens de salida.
+        Responde 503 si el circuito está abierto en todos los workers.
+        """
+        workers = CircuitBreaker.read_states(redis_client, "gemini")
+        open_count = sum(1 for state in workers.values() if state["state"] == CircuitBreaker.OPEN)
+
+        if not workers or open_count == 0:
+            status = "ok"
+        elif open_count < len(workers):
+            status = "degraded"
+        else:
+            status = "down"
+
+        return jsonify({
+            "code": "SUCCESS",
+            "data": {
+                "status": status,
+                "workers": workers,
+                "output": OutputMetrics.read(redis_client)
+            }
+        }), 503 if status == "down" else 200
+
+    @blueprint.route("/health/cache", methods=["GET"])
+    @handle_errors
+    def cache_health():
+        """
+        Estadísticas del caché de análisis: aciertos exactos y por similitud,
+        y aciertos y fallos de los niveles L1 (memoria) y L2 (Redis) por proceso,
+        y claves por generación de prompt/modelo.
+        """
+        if not similarity_cache and not isinstance(cache, TieredCache) and not cache_generations:
+            raise NotFoundError("No hay estadísticas de caché habilitadas")
+
+        data = {}
+        if cache_generations:
+            data["generations"] = cache_generations.get_counts()
+        if similarity_cache:
+            data["similarity"] = similarity_cache.get_stats()
+        if isinstance(cache, TieredCache):
+            data["tiers"] = {
+                **TieredCache.read_stats(redis_client),
+                cache.instance_id: cache.get_stats()
+            }
+
+        return jsonify({
+            "code": "SUCCESS",
+            "data": data
+        }), 200
+
+    return blueprint
@@ -20,6 +20,8 @@ class Message:
         sentimiento: Optional[str] = None,
         tema: Optional[str] = None,
         resumen: Optional[str] = None,
+        analizado_en: Optional[datetime] = None,
+        origen_analisis: Optional[str] = None,
         _id: Optional[str] = None
     ):
         self._id = _id
@@ -31,6 +33,8 @@ class Message:
         self.sentimiento = sentimiento  # "positivo", "negativo", "neutro"
         self.tema = tema  # "Servicio al Cliente", "Calidad del Producto", etc.
         self.resumen = resumen
+        self.analizado_en = analizado_en
+        self.origen_analisis = origen_analisis  # "gemini", "cache", "lexico", "respaldo"
 
     def to_dict(self):
         """Convierte la entidad a un diccionario para MongoDB"""
@@ -40,8 +44,11 @@ class Message:
             "timestamp": self.timestamp,
             "sentimiento": self.sentimiento,
             "tema": self.tema,
-            "resumen": self.resumen
+            "resumen": self.resumen,
+            "analizado_en": self.analizado_en
         }
+        if self.origen_analisis:
+            data["origen_analisis"] = self.origen_analisis
         if self.message_sid:
             data["message_sid"] = self.message_sid
         if self._id:
@@ -59,6 +66,8 @@ class Message:
             sentimiento=data.get("sentimiento"),
             tema=data.get("tema"),
             resumen=data.get("resumen"),
+            analizado_en=data.get("analizado_en"),
+            origen_analisis=data.get("origen_analisis"),
             _id=str(data.get("_id")) if data.get("_id") else None
         )
 
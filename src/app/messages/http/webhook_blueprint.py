@@ -5,23 +5,76 @@ Blueprint para manejar webhooks de Twilio WhatsApp.
 from flask import Blueprint, jsonify, request, current_app
 from src.frameworks.logging.logger import setup_logger
 from src.frameworks.http.decorators import handle_errors
-from src.frameworks.http.error_handlers import ValidationError
+from src.frameworks.http.error_handlers import ValidationError, NotFoundError
 from src.app.messages.entities.message import Message
 
 logger = setup_logger(__name__)
 
 
-def webhook_blueprint(message_queue, message_repository):
+def webhook_blueprint(message_queue, message_repository, retry_scheduler=None, sentiment_service=None):
     """
     Crea el blueprint para webhooks de Twilio.
 
     Args:
         message_queue: Servicio de cola para mensajes
         message_repository: Repositorio de mensajes
+        retry_scheduler: Planificador de reintentos y DLQ (opcional)
+        sentiment_service: Servicio de análisis para el atajo por caché (opcional)
     """
 
     blueprint = Blueprint("webhook", __name__)
 
+    def register_message(texto_mensaje: str, numero_remitente: str, message_sid: str = None):
+        """
+        Guarda un mensaje entrante. Si su análisis ya está en caché lo guarda
+        analizado y emite message_analyzed de inmediato; si no, lo encola
+        para el worker.
+
+        Returns:
+            Tupla (message_id, análisis desde caché o None)
+        """
+        analysis = None
+        if sentiment_service:
+            try:
+                analysis = sentiment_service.get_cached_analysis(texto_mensaje)
+            except Exception as e:
+                logger.warning(f"No se pudo consultar el caché de análisis: {e}")
+
+        message = Message(
+            texto_mensaje=texto_mensaje,
+            numero_remitente=numero_remitente,
+            message_sid=message_sid
+        )
+
+        # 1a. Atajo: análisis conocido, se guarda analizado sin pasar por la cola
+        if analysis:
+            message.sentimiento = analysis["sentimiento"]
+            message.tema = analysis["tema"]
+            message.resumen = analysis["resumen"]
+            message.origen_analisis = analysis["origen"]
+            return message_repository.save_analyzed(message), analysis
+
+        # 1b. Guardar y encolar para procesamiento asíncrono
+        message_id = message_repository.save(message)
+        message_queue.enqueue(
+            texto_mensaje=texto_mensaje,
+            numero_remitente=numero_remitente,
+            message_id=message_id
+        )
+
+        # 2. Emitir evento Socket.IO (mensaje recibido, análisis pendiente)
+        try:
+            socketio_manager = current_app.socketio_manager
+            socketio_manager.emit_message_received({
+                "message_id": message_id,
+                "numero_remitente": numero_remitente,
+                "texto_mensaje": texto_mensaje
+            })
+        except Exception as e:
+            logger.warning(f"No se pudo emitir evento Socket.IO: {e}")
+
+        return message_id, None
+
     @blueprint.route("/whatsapp", methods=["POST"])
     @handle_errors
     def receive_whatsapp_message():
@@ -45,35 +98,12 @@ def webhook_blueprint(message_queue, message_repository):
         if not from_number:
             raise ValidationError("Campo 'From' es requerido")
 
-        message = Message(
-            texto_mensaje=message_body,
-            numero_remitente=from_number,
-            message_sid=message_sid
-        )
-        message_id = message_repository.save(message)
-
-        # 2. Encolar para procesamiento asíncrono
-        message_queue.enqueue(
-            texto_mensaje=message_body,
-            numero_remitente=from_number,
-            message_id=message_id
-        )
-
-        # 3. Emitir evento Socket.IO (mensaje recibido, análisis pendiente)
-        try:
-            socketio_manager = current_app.socketio_manager
-            socketio_manager.emit_message_received({
-                "message_id": message_id,
-                "numero_remitente": from_number,
-                "texto_mensaje": message_body
-            })
-        except Exception as e:
-            logger.warning(f"No se pudo emitir evento Socket.IO: {e}")
+        message_id, analysis = register_message(message_body, from_number, message_sid)
 
-        # 4. Responder INMEDIATAMENTE (sin esperar análisis)
+        # 3. Responder INMEDIATAMENTE (sin esperar análisis)
         response = {
             "code": "SUCCESS",
-            "message": "Mensaje recibido y en proceso de análisis",
+            "message": "Mensaje recibido y analizado" if analysis else "Mensaje recibido y en proceso de análisis",
             "data": {
                 "message_id": message_id,
                 "status": "success",
@@ -88,8 +118,8 @@ def webhook_blueprint(message_queue, message_repository):
         Endpoint de prueba para simular mensajes sin usar Twilio.
 
         FLUJO ASÍNCRONO:
-        1. Guarda mensaje
-        2. Encola para procesamiento
+        1. Guarda mensaje (ya analizado si el análisis está en caché)
+        2. Encola para procesamiento si no estaba en caché
         3. Responde inmediatamente
         """
         data = request.get_json()
@@ -97,31 +127,24 @@ def webhook_blueprint(message_queue, message_repository):
         if not data or "texto_mensaje" not in data or "numero_remitente" not in data:
             raise ValidationError("Se requieren 'texto_mensaje' y 'numero_remitente' en el body JSON")
 
-        message = Message(
-            texto_mensaje=data["texto_mensaje"],
-            numero_remitente=data["numero_remitente"],
-            message_sid=data.get("message_sid")
+        message_id, analysis = register_message(
+            data["texto_mensaje"],
+            data["numero_remitente"],
+            data.get("message_sid")
         )
-        message_id = message_repository.save(message)
-
-        message_queue.enqueue(
-            texto_mensaje=data["texto_mensaje"],
-            numero_remitente=data["numero_remitente"],
-            message_id=message_id
-        )
-
-        # 2.5 Emitir evento Socket.IO
-        try:
-            socketio_manager = current_app.socketio_manager
-            socketio_manager.emit_message_received({
-                "message_id": message_id,
-                "numero_remitente": data["numero_remitente"],
-                "texto_mensaje": data["texto_mensaje"]
-            })
-        except Exception as e:
-            logger.warning(f"No se pudo emitir evento Socket.IO: {e}")
 
         # 3. Responder inmediatamente
+        if analysis:
+            return jsonify({
+                "code": "SUCCESS",
+                "message": "Mensaje analizado desde caché",
+                "data": {
+                    "message_id": message_id,
+                    "status": "SUCCESS",
+                    "analysis": analysis
+                }
+            }), 200
+
         return jsonify({
             "code": "SUCCESS",
             "message": "Mensaje encolado para análisis",
@@ -140,11 +163,65 @@ def webhook_blueprint(message_queue, message_repository):
         """
         queue_size = message_queue.get_queue_size()
 
+        data = {
+            "pending_messages": queue_size,
+            "queue_name": message_queue.queue_name,
+            "metrics": message_queue.get_metrics()
+        }
+
+        if retry_scheduler:
+            data["retry_scheduled"] = retry_scheduler.get_retry_count()
+            data["dead_letter"] = retry_scheduler.get_dead_letter_count()
+
+        return jsonify({
+            "code": "SUCCESS",
+            "data": data
+        }), 200
+
+    @blueprint.route("/queue/dead-letter", methods=["GET"])
+    @handle_errors
+    def get_dead_letters():
+        """
+        Lista los mensajes que agotaron sus reintentos, del más reciente al más antiguo.
+        """
+        if not retry_scheduler:
+            raise NotFoundError("La dead letter queue no está habilitada")
+
+        limit = request.args.get("limit", default=50, type=int)
+        offset = request.args.get("offset", default=0, type=int)
+
+        return jsonify({
+            "code": "SUCCESS",
+            "data": {
+                "total": retry_scheduler.get_dead_letter_count(),
+                "items": retry_scheduler.get_dead_letters(limit=limit, offset=offset)
+            }
+        }), 200
+
+    @blueprint.route("/queue/dead-letter/replay", methods=["POST"])
+    @handle_errors
+    def replay_dead_letters():
+        """
+        Reencola en bloque los mensajes de la DLQ (los más antiguos primero).
+        Acepta opcionalmente {"limit": n} en el body JSON.
+        """
+        if not retry_scheduler:
+            raise NotFoundError("La dead letter queue no está habilitada")
+
+        data = request.get_json(silent=True) or {}
+        limit = data.get("limit")
+
+        if limit is not None and (not isinstance(limit, int) or limit <= 0):
+            raise ValidationError("'limit' debe ser un entero positivo")
+
+        replayed = retry_scheduler.replay_dead_letters(limit=limit)
+
         return jsonify({
             "code": "SUCCESS",
+            "message": "Mensajes reencolados desde la dead letter queue",
             "data": {
-                "pending_messages": queue_size,
-                "queue_name": message_queue.queue_name
+                "replayed": replayed,
+                "remaining": retry_scheduler.get_dead_letter_count()
             }
         }), 200
 
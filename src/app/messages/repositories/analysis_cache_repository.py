@@ -0,0 +1,171 @@
+"""
+Repositorio del caché durable de análisis - Guarda en MongoDB los análisis
+por hash del texto normalizado para no volver a pagar Gemini tras expirar
+o perderse el caché de Redis.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne, DESCENDING
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ANALYSIS_FIELDS = ["sentimiento", "tema", "resumen"]
+
+
+class AnalysisCacheRepository:
+    """Repositorio para el caché durable de análisis en MongoDB"""
+
+    def __init__(self, mongo_db, test=False):
+        self.mongo_db = mongo_db
+        self.test = test
+        collection_name = settings.MONGO_COLLECTION_ANALYSIS_CACHE
+
+        if test:
+            collection_name += "_test"
+
+        self.collection = mongo_db[collection_name]
+
+    def get(self, cache_key: str) -> Optional[dict]:
+        """
+        Busca un análisis. El uso se cuenta aparte con AnalysisHitCounter.
+
+        Args:
+            cache_key: Clave de caché del mensaje
+
+        Returns:
+            Dict con sentimiento, tema y resumen, o None si no existe
+        """
+        doc = self.collection.find_one({"_id": cache_key}, {field: 1 for field in ANALYSIS_FIELDS})
+
+        if not doc:
+            return None
+
+        return {field: doc[field] for field in ANALYSIS_FIELDS}
+
+    def save_many(self, entries: List[Tuple[str, dict]]):
+        """
+        Guarda varios análisis con un solo bulk_write no ordenado.
+
+        Args:
+            entries: Lista de (clave de caché, análisis)
+        """
+        if not entries:
+            return
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": cache_key},
+                {
+                    "$set": {**{field: analysis[field] for field in ANALYSIS_FIELDS}, "ultimo_uso": now},
+                    "$inc": {"hits": 1},
+                    "$setOnInsert": {"creado_en": now}
+                },
+                upsert=True
+            )
+            for cache_key, analysis in entries
+        ]
+
+        self.collection.bulk_write(operations, ordered=False)
+
+    def add_hits(self, hits: Dict[str, int]):
+        """
+        Suma aciertos acumulados a las entradas existentes con un solo bulk_write.
+
+        Args:
+            hits: Clave de caché -> aciertos desde el último volcado
+        """
+        if not hits:
+            return
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne({"_id": cache_key}, {"$inc": {"hits": count}, "$set": {"ultimo_uso": now}})
+            for cache_key, count in hits.items()
+        ]
+
+        self.collection.bulk_write(operations, ordered=False)
+
+    def find_most_used(self, limit: int, key_prefix: str = None) -> List[dict]:
+        """
+        Obtiene los análisis más usados.
+
+        Args:
+            limit: Número máximo de entradas
+            key_prefix: Solo claves con este prefijo (por ejemplo, la generación actual)
+
+        Returns:
+            Lista de dicts con _id (clave de caché), sentimiento, tema y resumen
+        """
+        query = {"_id": {"$regex": f"^{re.escape(key_prefix)}"}} if key_prefix else {}
+
+        cursor = self.collection.find(
+            query,
+            {field: 1 for field in ANALYSIS_FIELDS}
+        ).sort([("hits", DESCENDING), ("ultimo_uso", DESCENDING)]).limit(limit)
+
+        return list(cursor)
+
+
+class AnalysisHitCounter:
+    """
+    Cuenta en Redis los aciertos exactos de cada clave de caché (hash
+    `<key>`, un campo por clave) para que `hits` en MongoDB refleje cuántas
+    veces llega cada texto, no solo cuántas veces se cayó de Redis.
+
+    Contar es un HINCRBY por acierto; flush() vuelca periódicamente los
+    conteos al caché durable con $inc (lo hacen los workers, que reciben
+    `repository`).
+    """
+
+    def __init__(self, client, repository: AnalysisCacheRepository = None, key: str = "analysis_cache:hits"):
+        self.client = client
+        self.repository = repository
+        self.key = key
+
+    def record(self, cache_key: str):
+        """
+        Suma un acierto a una clave de caché.
+
+        Args:
+            cache_key: Clave de caché del mensaje
+        """
+        try:
+            self.client.hincrby(self.key, cache_key, 1)
+        except Exception as e:
+            logger.error(f"Error contando acierto de caché: {e}")
+
+    async def record_async(self, cache_key: str):
+        """Igual que record() pero con un cliente de redis.asyncio"""
+        try:
+            await self.client.hincrby(self.key, cache_key, 1)
+        except Exception as e:
+            logger.error(f"Error contando acierto de caché: {e}")
+
+    def flush(self) -> int:
+        """
+        Vuelca los aciertos acumulados al caché durable. Lee y borra el hash
+        en un MULTI; si MongoDB falla, los conteos se devuelven a Redis.
+
+        Returns:
+            Número de claves actualizadas
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        hits = {cache_key: int(count) for cache_key, count in pipe.execute()[0].items()}
+
+        try:
+            self.repository.add_hits(hits)
+        except Exception:
+            pipe = self.client.pipeline(transaction=False)
+            for cache_key, count in hits.items():
+                pipe.hincrby(self.key, cache_key, count)
+            pipe.execute()
+            raise
+
+        return len(hits)
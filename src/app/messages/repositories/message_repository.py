@@ -3,8 +3,11 @@ Repositorio de mensajes - Maneja la persistencia de mensajes en MongoDB.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
 from src.frameworks.db.serializers import serialize_mongo_document
@@ -16,11 +19,18 @@ logger = setup_logger(__name__)
 class MessageRepository:
     """Repositorio para gestionar mensajes en MongoDB"""
 
-    def __init__(self, mongo_db, test=False, socketio_manager=None, dashboard_repository=None):
+    def __init__(self, mongo_db, test=False, socketio_manager=None, dashboard_repository=None,
+                 dashboard_counters=None, stats_broadcaster=None, rollup_repository=None):
         self.mongo_db = mongo_db
         self.test = test
         self.socketio_manager = socketio_manager
         self.dashboard_repository = dashboard_repository
+        # Contadores del dashboard en Redis que se actualizan en cada escritura
+        self.dashboard_counters = dashboard_counters
+        # Agrupa los stats_updated entre procesos (StatsBroadcaster)
+        self.stats_broadcaster = stats_broadcaster
+        # Conteos por hora y día para las tendencias (RollupRepository)
+        self.rollup_repository = rollup_repository
         collection_name = settings.MONGO_COLLECTION_MENSAJES
 
         if test:
@@ -40,10 +50,50 @@ class MessageRepository:
         result = self.collection.insert_one(doc)
         message_id = str(result.inserted_id)
 
+        if self.dashboard_counters and self.dashboard_counters.record_message(message.sentimiento, message.tema):
+            # El total cambió: el broadcaster emite el delta o el snapshot en su próximo turno
+            if self.stats_broadcaster:
+                self.stats_broadcaster.mark_dirty()
+
+        if self.rollup_repository:
+            self.rollup_repository.record([(message.timestamp, message.sentimiento, message.tema, 1)])
+
         logger.info(f"Mensaje guardado: {message_id}")
         return message_id
 
-    def update_analysis(self, message_id: str, sentimiento: str, tema: str, resumen: str, numero_remitente: str = None):
+    def save_analyzed(self, message: Message) -> str:
+        """
+        Guarda un mensaje que ya trae su análisis (por ejemplo, desde caché)
+        y emite los eventos Socket.IO sin pasar por la cola.
+
+        Args:
+            message: Entidad Message con sentimiento, tema y resumen
+
+        Returns:
+            ID del mensaje guardado
+        """
+        message.analizado_en = message.analizado_en or datetime.utcnow()
+        message_id = self.save(message)
+
+        logger.info(f"Análisis ({message.origen_analisis or 'sin origen'}): {message_id} → "
+                    f"{message.sentimiento}/{message.tema}")
+
+        if self.socketio_manager:
+            try:
+                self.socketio_manager.emit_message_received({
+                    "message_id": message_id,
+                    "numero_remitente": message.numero_remitente,
+                    "texto_mensaje": message.texto_mensaje
+                })
+            except Exception as socket_error:
+                logger.warning(f"Error emitiendo eventos Socket.IO: {socket_error}")
+
+        self._emit_analysis_events(message_id, message.sentimiento, message.tema,
+                                   message.resumen, message.numero_remitente)
+        return message_id
+
+    def update_analysis(self, message_id: str, sentimiento: str, tema: str, resumen: str,
+                        numero_remitente: str = None, origen: str = None):
         """
         Actualiza un mensaje con los resultados del análisis de IA.
         También emite eventos Socket.IO al frontend con las estadísticas actualizadas.
@@ -54,21 +104,108 @@ class MessageRepository:
             tema: Tema identificado
             resumen: Resumen generado por la IA
             numero_remitente: Número del remitente (opcional, para eventos Socket.IO)
+            origen: Nivel que produjo el análisis (gemini, cache, lexico o respaldo)
         """
-        self.collection.update_one(
-            {"_id": ObjectId(message_id)},
-            {"$set": {
-                "sentimiento": sentimiento,
-                "tema": tema,
-                "resumen": resumen,
-                "analizado_en": datetime.utcnow()
-            }}
-        )
-
-        logger.info(f"Análisis: {message_id} → {sentimiento}/{tema}")
+        update = {"$set": {
+            "sentimiento": sentimiento,
+            "tema": tema,
+            "resumen": resumen,
+            "origen_analisis": origen,
+            "analizado_en": datetime.utcnow()
+        }}
+
+        if self.dashboard_counters or self.rollup_repository:
+            # Con el documento anterior se descuenta el análisis previo si se reanaliza
+            previous = self.collection.find_one_and_update(
+                {"_id": ObjectId(message_id)},
+                update,
+                projection={"sentimiento": 1, "tema": 1, "timestamp": 1}
+            )
+            if previous is not None:
+                self._record_aggregates([(sentimiento, tema, previous)])
+        else:
+            self.collection.update_one({"_id": ObjectId(message_id)}, update)
+
+        logger.info(f"Análisis ({origen or 'sin origen'}): {message_id} → {sentimiento}/{tema}")
 
         self._emit_analysis_events(message_id, sentimiento, tema, resumen, numero_remitente)
 
+    def bulk_update_analysis(self, results: List[dict]) -> dict:
+        """
+        Actualiza varios mensajes con sus análisis en un solo bulk_write no ordenado.
+        Emite un único evento Socket.IO con todo el lote y una sola actualización de estadísticas.
+
+        Args:
+            results: Lista de dicts con message_id, sentimiento, tema, resumen
+                y opcionalmente numero_remitente y origen
+
+        Returns:
+            Dict con "updated" (resultados guardados) y "failed"
+            (lista de {message_id, error})
+        """
+        analizado_en = datetime.utcnow()
+        operations = []
+        valid = []
+        failed = []
+
+        for result in results:
+            try:
+                object_id = ObjectId(result["message_id"])
+            except (InvalidId, KeyError, TypeError) as e:
+                failed.append({"message_id": result.get("message_id"), "error": f"ID inválido: {e}"})
+                continue
+
+            operations.append(UpdateOne(
+                {"_id": object_id},
+                {"$set": {
+                    "sentimiento": result["sentimiento"],
+                    "tema": result["tema"],
+                    "resumen": result["resumen"],
+                    "origen_analisis": result.get("origen"),
+                    "analizado_en": analizado_en
+                }}
+            ))
+            valid.append(result)
+
+        # Análisis anteriores para descontarlos de los contadores y rollups
+        previous = {}
+        if (self.dashboard_counters or self.rollup_repository) and operations:
+            cursor = self.collection.find(
+                {"_id": {"$in": [ObjectId(result["message_id"]) for result in valid]}},
+                {"sentimiento": 1, "tema": 1, "timestamp": 1}
+            )
+            previous = {str(doc["_id"]): doc for doc in cursor}
+
+        write_errors = {}
+        if operations:
+            try:
+                self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Con ordered=False el resto de operaciones sí se aplicó
+                write_errors = {
+                    error["index"]: error.get("errmsg", "Error de escritura")
+                    for error in e.details.get("writeErrors", [])
+                }
+
+        updated = []
+        for index, result in enumerate(valid):
+            if index in write_errors:
+                failed.append({"message_id": result["message_id"], "error": write_errors[index]})
+            else:
+                updated.append(result)
+
+        logger.info(f"Análisis en lote: {len(updated)} actualizados, {len(failed)} fallidos")
+
+        self._record_aggregates([
+            (result["sentimiento"], result["tema"], previous[result["message_id"]])
+            for result in updated
+            if result["message_id"] in previous
+        ])
+
+        self._emit_batch_analysis_events(updated)
+
+        return {"updated": updated, "failed": failed}
+
     def _emit_analysis_events(self, message_id: str, sentimiento: str, tema: str, resumen: str, numero_remitente: str = None):
         """
         Emite eventos Socket.IO después de actualizar el análisis.
@@ -94,27 +231,85 @@ class MessageRepository:
             })
 
             # 2. Emitir estadísticas actualizadas del dashboard
-            if self.dashboard_repository:
-                try:
-                    # Obtener estadísticas frescas (con read concern majority)
-                    updated_stats = self.dashboard_repository.get_statistics()
-                    distribucion = self.dashboard_repository.get_sentiment_distribution()
-                    temas = self.dashboard_repository.get_top_topics(limit=6)
-
-                    # Combinar en un solo payload
-                    full_stats = {
-                        **updated_stats,
-                        "distribucion_sentimientos": distribucion,
-                        "temas_frecuentes": temas
-                    }
-
-                    self.socketio_manager.emit_stats_updated(full_stats)
-                except Exception as stats_error:
-                    logger.error(f"Error obteniendo/emitiendo stats: {stats_error}", exc_info=True)
+            self._emit_stats_update()
 
         except Exception as socket_error:
             logger.warning(f"Error emitiendo eventos Socket.IO: {socket_error}")
 
+    def _emit_batch_analysis_events(self, results: List[dict]):
+        """
+        Emite un solo evento Socket.IO para un lote de análisis y una sola
+        actualización de estadísticas.
+
+        Args:
+            results: Lista de análisis guardados
+        """
+        if not self.socketio_manager or not results:
+            return
+
+        try:
+            self.socketio_manager.emit_messages_analyzed([
+                {
+                    "message_id": result["message_id"],
+                    "sentimiento": result["sentimiento"],
+                    "tema": result["tema"],
+                    "resumen": result["resumen"],
+                    "numero_remitente": result.get("numero_remitente")
+                }
+                for result in results
+            ])
+
+            self._emit_stats_update()
+
+        except Exception as socket_error:
+            logger.warning(f"Error emitiendo eventos Socket.IO: {socket_error}")
+
+    def _emit_stats_update(self):
+        """
+        Calcula y emite las estadísticas actualizadas del dashboard, o solo
+        las marca como pendientes si hay un broadcaster que agrupa la emisión
+        (de snapshots o, con STATS_DELTA_EVENTS, de los deltas registrados).
+        """
+        if self.stats_broadcaster:
+            self.stats_broadcaster.mark_dirty()
+            return
+
+        if not self.dashboard_repository:
+            return
+
+        try:
+            # Estadísticas, distribución y temas en una sola consulta
+            full_stats = self.dashboard_repository.get_dashboard_snapshot(topics_limit=6)
+
+            self.socketio_manager.emit_stats_updated(full_stats)
+        except Exception as stats_error:
+            logger.error(f"Error obteniendo/emitiendo stats: {stats_error}", exc_info=True)
+
+    def _record_aggregates(self, changes: List[tuple]):
+        """
+        Aplica análisis guardados a los contadores del dashboard y a los
+        rollups, descontando el análisis anterior de cada mensaje.
+
+        Args:
+            changes: Tuplas (sentimiento, tema, documento anterior con
+                sentimiento, tema y timestamp)
+        """
+        if not changes:
+            return
+
+        if self.dashboard_counters:
+            self.dashboard_counters.record_analyses(
+                (sentimiento, tema, previous.get("sentimiento"), previous.get("tema"))
+                for sentimiento, tema, previous in changes
+            )
+
+        if self.rollup_repository:
+            rollup_changes = []
+            for sentimiento, tema, previous in changes:
+                rollup_changes.append((previous.get("timestamp"), sentimiento, tema, 1))
+                rollup_changes.append((previous.get("timestamp"), previous.get("sentimiento"), previous.get("tema"), -1))
+            self.rollup_repository.record(rollup_changes)
+
     def find_recent(self, limit: int = 10) -> List[dict]:
         """
         Obtiene los mensajes más recientes.
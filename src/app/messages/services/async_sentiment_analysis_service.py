@@ -0,0 +1,303 @@
+"""
+Servicio de análisis de sentimiento con Google Gemini para asyncio.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import google.generativeai as genai
+from typing import Dict, Optional
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+from src.frameworks.resilience.rate_limiter import RateLimitExceeded
+from src.frameworks.resilience.circuit_breaker import CircuitOpenError
+from src.app.messages.services.sentiment_analysis_service import (
+    ANALYSIS_SCHEMA,
+    ORIGEN_CACHE,
+    ORIGEN_GEMINI,
+    ORIGEN_LEXICO,
+    ORIGEN_RESPALDO,
+    REQUIRED_FIELDS,
+    TRANSIENT_ERRORS,
+    SentimentAnalysisService,
+    compute_cache_generation,
+    json_generation_config,
+)
+
+logger = setup_logger(__name__)
+
+
+class AsyncSentimentAnalysisService:
+    """
+    Versión asyncio de SentimentAnalysisService para el worker asíncrono.
+
+    Usa el mismo prompt, esquema, validación y claves de caché que el servicio
+    síncrono, pero la llamada a Gemini (generate_content_async) y el caché de
+    Redis (AsyncRedisCache) no bloquean el event loop, así que un solo proceso
+    puede tener cientos de análisis esperando a Gemini a la vez.
+
+    El rate limiter usa un cliente de redis.asyncio (acquire_async), así que
+    esperar capacidad no ocupa hilos del pool. El caché durable de MongoDB es
+    síncrono y se llama en el pool de hilos del loop con asyncio.to_thread.
+    """
+
+    def __init__(self, redis_cache=None, rate_limiter=None, circuit_breaker=None,
+                 fallback_analyzer=None, local_classifier=None, analysis_store=None,
+                 output_metrics=None, hit_counter=None):
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        self.cache_generation = compute_cache_generation()
+        self.json_mode = settings.GEMINI_JSON_MODE
+        self.output_mode = "json" if self.json_mode else "text"
+        # AsyncRedisCache
+        self.cache = redis_cache
+        # RedisRateLimiter con un cliente de redis.asyncio
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        # Función texto -> análisis usada mientras el circuito está abierto
+        self.fallback_analyzer = fallback_analyzer
+        # Clasificador local que resuelve los mensajes obvios sin llamar a Gemini
+        self.local_classifier = local_classifier
+        # Caché durable en MongoDB detrás de Redis (AnalysisCacheRepository)
+        self.analysis_store = analysis_store
+        # OutputMetrics con un cliente de redis.asyncio
+        self.output_metrics = output_metrics
+        # AnalysisHitCounter con un cliente de redis.asyncio
+        self.hit_counter = hit_counter
+        # Análisis en curso por clave de caché: los textos repetidos comparten la llamada
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def analyze_message(self, texto_mensaje: str) -> dict:
+        """
+        Analiza un mensaje de cliente y retorna sentimiento, tema y resumen.
+        Sigue el mismo orden que SentimentAnalysisService.analyze_message:
+        caché, clasificador local y Gemini.
+
+        Args:
+            texto_mensaje: Texto del mensaje a analizar
+
+        Returns:
+            Dict con: sentimiento, tema, resumen y origen (gemini, cache, lexico o respaldo)
+        """
+        cached_result = await self.get_cached_analysis(texto_mensaje)
+        if cached_result:
+            return cached_result
+
+        local_result = self._classify_locally(texto_mensaje)
+        if local_result:
+            return local_result
+
+        # Las corrutinas que piden el mismo texto esperan la misma tarea. shield
+        # evita que el timeout o la cancelación de una de ellas cancele a las demás.
+        cache_key = self._get_cache_key(texto_mensaje)
+        task = self._calls.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._analyze_with_gemini(texto_mensaje))
+            self._calls[cache_key] = task
+            task.add_done_callback(lambda done: self._forget_call(cache_key, done))
+
+        return dict(await asyncio.shield(task))
+
+    async def get_cached_analysis(self, texto_mensaje: str) -> Optional[dict]:
+        """
+        Busca el análisis de un mensaje en Redis y luego en el caché durable
+        de MongoDB, sin llamar a Gemini.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen "cache", o None
+        """
+        cache_key = self._get_cache_key(texto_mensaje)
+        cached_result = await self.cache.get(cache_key) if self.cache else None
+
+        if not cached_result and self.analysis_store:
+            try:
+                cached_result = await asyncio.to_thread(self.analysis_store.get, cache_key)
+            except Exception as e:
+                logger.error(f"Error al consultar el caché durable de análisis: {e}")
+            if cached_result and self.cache:
+                await self.cache.set(cache_key, cached_result, ttl=settings.ANALYSIS_CACHE_TTL)
+
+        if not cached_result:
+            return None
+
+        if self.hit_counter:
+            await self.hit_counter.record_async(cache_key)
+        return {**cached_result, "origen": ORIGEN_CACHE}
+
+    async def _analyze_with_gemini(self, texto_mensaje: str) -> dict:
+        """
+        Analiza un mensaje con Gemini y guarda el resultado en caché.
+
+        Args:
+            texto_mensaje: Texto del mensaje a analizar
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen
+        """
+        prompt = SentimentAnalysisService._build_prompt(texto_mensaje)
+
+        try:
+            response = await self._generate(prompt)
+        except CircuitOpenError:
+            if self.fallback_analyzer:
+                fallback = self.fallback_analyzer(texto_mensaje)
+                return {**{field: fallback[field] for field in REQUIRED_FIELDS}, "origen": ORIGEN_RESPALDO}
+            raise
+
+        response_text = response.text
+        try:
+            if self.json_mode:
+                analysis = json.loads(response_text)
+            else:
+                analysis = json.loads(SentimentAnalysisService._clean_json_response(response_text))
+            SentimentAnalysisService._validate_analysis(analysis)
+        except json.JSONDecodeError as e:
+            await self._record_output(parse_failures=1)
+            logger.error(f"Error al parsear respuesta JSON de Gemini: {e}")
+            logger.error(f"Respuesta original: {response_text}")
+            return {
+                "sentimiento": "neutro",
+                "tema": "Otros",
+                "resumen": "No se pudo analizar el mensaje correctamente",
+                "origen": ORIGEN_GEMINI
+            }
+        except ValueError as e:
+            await self._record_output(parse_failures=1)
+            logger.error(f"Respuesta de Gemini inválida: {e}")
+            raise
+
+        await self._store_analysis(texto_mensaje, analysis)
+
+        return {**analysis, "origen": ORIGEN_GEMINI}
+
+    async def _generate(self, prompt: str):
+        """
+        Llama a Gemini con generate_content_async respetando el circuit breaker
+        y el rate limiter compartido.
+
+        Args:
+            prompt: Prompt a enviar
+
+        Returns:
+            Respuesta de Gemini
+
+        Raises:
+            CircuitOpenError: Si el circuit breaker está abierto
+            RateLimitExceeded: Si no hubo capacidad dentro de GEMINI_RATE_LIMIT_TIMEOUT
+        """
+        if self.circuit_breaker and not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("Circuito de Gemini abierto")
+
+        estimated_tokens = len(prompt) // 4 + settings.GEMINI_OUTPUT_TOKENS_ESTIMATE
+        started_at = None
+
+        try:
+            if self.rate_limiter:
+                acquired = await self.rate_limiter.acquire_async(
+                    estimated_tokens, timeout=settings.GEMINI_RATE_LIMIT_TIMEOUT
+                )
+                if not acquired:
+                    raise RateLimitExceeded("Sin capacidad en el rate limiter de Gemini")
+
+            started_at = time.monotonic()
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=json_generation_config(ANALYSIS_SCHEMA) if self.json_mode else None,
+                request_options={"timeout": settings.GEMINI_REQUEST_TIMEOUT}
+            )
+        except (RateLimitExceeded, asyncio.CancelledError):
+            # La llamada no llegó a completarse: no cuenta como fallo de Gemini
+            if self.circuit_breaker:
+                self.circuit_breaker.release_trial()
+            raise
+        except Exception as e:
+            if self.circuit_breaker:
+                if isinstance(e, TRANSIENT_ERRORS):
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.release_trial()
+            raise
+
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success(time.monotonic() - started_at)
+
+        usage = getattr(response, "usage_metadata", None)
+        if self.rate_limiter:
+            await self.rate_limiter.record_usage_async(estimated_tokens, getattr(usage, "total_token_count", 0))
+
+        await self._record_output(
+            calls=1,
+            output_tokens=getattr(usage, "candidates_token_count", 0),
+            prompt_tokens=getattr(usage, "prompt_token_count", 0)
+        )
+
+        return response
+
+    async def _store_analysis(self, texto_mensaje: str, analysis: dict):
+        """
+        Guarda un análisis de Gemini en Redis y en el caché durable.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+            analysis: Dict con sentimiento, tema y resumen
+        """
+        cache_key = self._get_cache_key(texto_mensaje)
+
+        if self.cache:
+            await self.cache.set(cache_key, analysis, ttl=settings.ANALYSIS_CACHE_TTL)
+
+        if self.analysis_store:
+            try:
+                await asyncio.to_thread(self.analysis_store.save_many, [(cache_key, analysis)])
+            except Exception as e:
+                logger.error(f"Error al guardar en el caché durable de análisis: {e}")
+
+    def _classify_locally(self, texto_mensaje: str) -> Optional[dict]:
+        """
+        Clasifica un mensaje con el clasificador local si la confianza alcanza
+        LEXICON_MIN_CONFIDENCE (es CPU puro, no bloquea en I/O).
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen, o None si hay que escalar a Gemini
+        """
+        if not self.local_classifier:
+            return None
+
+        result = self.local_classifier.classify(texto_mensaje)
+        if result["confianza"] < settings.LEXICON_MIN_CONFIDENCE:
+            return None
+
+        return {**{field: result[field] for field in REQUIRED_FIELDS}, "origen": ORIGEN_LEXICO}
+
+    async def _record_output(self, **counts: int):
+        """Suma contadores a las métricas del modo de salida actual"""
+        if self.output_metrics:
+            await self.output_metrics.record_async(self.output_mode, **counts)
+
+    def _forget_call(self, cache_key: str, task: asyncio.Task):
+        """Quita una tarea terminada de las llamadas en curso"""
+        if self._calls.get(cache_key) is task:
+            del self._calls[cache_key]
+        # Marcar la excepción como leída aunque ya no quede nadie esperando
+        if not task.cancelled():
+            task.exception()
+
+    def _get_cache_key(self, texto_mensaje: str) -> str:
+        """
+        Genera la clave de caché de un mensaje (la misma que el servicio síncrono).
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Clave `sentiment:<generación>:<hash MD5 del mensaje>`
+        """
+        normalized = texto_mensaje.lower().strip()
+        return f"sentiment:{self.cache_generation}:{hashlib.md5(normalized.encode()).hexdigest()}"
@@ -0,0 +1,293 @@
+"""
+Clasificador local de sentimiento y tema basado en reglas y léxico en español.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+from src.frameworks.db.collections import TEMAS
+
+# Frases con carga de sentimiento: (frase, peso). Positivo suma, negativo resta.
+POSITIVE_TERMS = [
+    ("excelente", 2), ("delicioso", 2), ("deliciosa", 2), ("riquisimo", 2), ("buenisimo", 2),
+    ("me encanta", 2), ("me encanto", 2), ("perfecto", 2), ("genial", 2), ("maravilloso", 2),
+    ("fantastico", 2), ("increible", 1.5), ("rico", 1.5), ("rica", 1.5), ("sabroso", 1.5),
+    ("amable", 1.5), ("agradable", 1.5), ("acogedor", 1.5), ("recomendado", 1.5),
+    ("satisfecho", 1.5), ("satisfecha", 1.5), ("feliz", 1.5), ("felicidades", 1.5),
+    ("me gusto", 1.5), ("me gusta", 1.5), ("bueno", 1), ("buena", 1), ("buen", 1),
+    ("limpio", 1), ("limpia", 1), ("rapido", 1), ("rapida", 1), ("atento", 1), ("atenta", 1),
+    ("mejor", 1), ("barato", 1), ("economico", 1), ("comodo", 1), ("tranquilo", 1),
+    ("gracias", 0.5),
+]
+
+NEGATIVE_TERMS = [
+    ("pesimo", 2.5), ("pesima", 2.5), ("horrible", 2.5), ("terrible", 2.5), ("asqueroso", 2.5),
+    ("asquerosa", 2.5), ("cucaracha", 2.5), ("cucarachas", 2.5), ("nunca mas", 2.5),
+    ("sucio", 2), ("sucia", 2), ("sucios", 2), ("sucias", 2), ("malo", 2), ("mala", 2),
+    ("peor", 2), ("grosero", 2), ("grosera", 2), ("decepcionado", 2), ("decepcionada", 2),
+    ("decepcion", 2), ("queja", 2), ("quejas", 2), ("reclamo", 2), ("reclamos", 2),
+    ("reclamar", 2), ("desagradable", 2), ("insecto", 2),
+    ("carisimo", 2), ("mal olor", 2), ("mal", 1.5), ("caro", 1.5), ("costoso", 1.5),
+    ("lento", 1.5), ("lenta", 1.5), ("tardaron", 1.5), ("demora", 1.5), ("quemado", 1.5),
+    ("ruidoso", 1.5), ("mosca", 1.5), ("frio", 1), ("amargo", 1), ("espere", 1),
+]
+
+# Frases que identifican cada tema: (frase, peso)
+TOPIC_TERMS = {
+    "Limpieza": [
+        ("limpieza", 1.5), ("sucio", 1.5), ("sucia", 1.5), ("sucios", 1.5), ("sucias", 1.5),
+        ("suciedad", 1.5), ("bano", 1.5), ("banos", 1.5), ("higiene", 1.5), ("cucaracha", 1.5),
+        ("cucarachas", 1.5), ("aseo", 1.5), ("limpio", 1), ("limpia", 1), ("basura", 1),
+        ("mosca", 1), ("insecto", 1), ("mal olor", 1), ("piso", 0.5), ("mesa", 0.5),
+    ],
+    "Precio": [
+        ("precio", 1.5), ("precios", 1.5), ("caro", 1.5), ("carisimo", 1.5), ("barato", 1.5),
+        ("economico", 1.5), ("costoso", 1.5), ("cobraron", 1.5), ("cobro", 1),
+        ("cuesta", 1), ("dinero", 1), ("pagar", 1), ("pague", 1), ("descuento", 1),
+        ("promocion", 1), ("vale la pena", 1),
+    ],
+    "Servicio al Cliente": [
+        ("servicio", 1.5), ("atencion", 1.5), ("mesero", 1.5), ("mesera", 1.5), ("barista", 1.5),
+        ("cajero", 1.5), ("cajera", 1.5), ("personal", 1.5), ("empleado", 1.5),
+        ("empleada", 1.5), ("atendieron", 1.5), ("atendio", 1.5), ("grosero", 1.5),
+        ("grosera", 1.5), ("amable", 1), ("atento", 1), ("atenta", 1), ("trato", 1),
+        ("demora", 1), ("tardaron", 1), ("espere", 1), ("lento", 0.5), ("rapido", 0.5),
+    ],
+    "Calidad del Producto": [
+        ("cafe", 1), ("capuchino", 1.5), ("cappuccino", 1.5), ("latte", 1.5), ("espresso", 1.5),
+        ("frappe", 1.5), ("sabor", 1.5), ("calidad", 1), ("bebida", 1), ("comida", 1),
+        ("pan", 1), ("pastel", 1), ("postre", 1), ("galleta", 1), ("sandwich", 1),
+        ("chocolate", 1), ("producto", 1), ("delicioso", 1), ("deliciosa", 1), ("rico", 0.5),
+        ("quemado", 1), ("amargo", 1), ("frio", 0.5),
+    ],
+    "Ambiente": [
+        ("ambiente", 1.5), ("musica", 1.5), ("decoracion", 1.5), ("acogedor", 1.5),
+        ("ruido", 1.5), ("ruidoso", 1.5), ("terraza", 1.5), ("lugar", 1), ("local", 1),
+        ("comodo", 1), ("tranquilo", 1), ("wifi", 1), ("sillas", 1), ("aire acondicionado", 1),
+        ("calor", 1),
+    ],
+}
+
+# Palabras que invierten el sentimiento de lo que sigue dentro de NEGATION_WINDOW
+# palabras de la misma cláusula (la puntuación corta la ventana)
+NEGATIONS = {"no", "nunca", "jamas", "ni", "tampoco", "sin", "nada"}
+NEGATION_WINDOW = 3
+
+# Puntuación que separa cláusulas; se conserva como token de límite
+BOUNDARIES = set(",.;:!?¿¡")
+
+# Confianza máxima cuando una negación invirtió algún término: las negaciones
+# ("sin quejas", "no está mal") son ambiguas para el léxico y se escalan a Gemini
+NEGATED_MAX_CONFIDENCE = 0.5
+
+RESUMEN_SENTIMIENTO = {
+    "positivo": "El cliente expresa satisfacción con",
+    "negativo": "El cliente expresa una queja sobre",
+    "neutro": "El cliente hace un comentario sobre",
+}
+
+RESUMEN_TEMA = {
+    "Servicio al Cliente": "el servicio al cliente",
+    "Calidad del Producto": "la calidad del producto",
+    "Precio": "el precio",
+    "Limpieza": "la limpieza del local",
+    "Ambiente": "el ambiente del local",
+    "Otros": "un tema general",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[,.;:!?¿¡]")
+_END = "$"
+
+
+def normalize_tokens(texto: str) -> List[str]:
+    """
+    Normaliza un texto a tokens en minúsculas sin acentos. La puntuación
+    que separa cláusulas se conserva como tokens propios (ver BOUNDARIES).
+
+    Args:
+        texto: Texto a normalizar
+
+    Returns:
+        Lista de tokens
+    """
+    decomposed = unicodedata.normalize("NFKD", texto.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(without_accents)
+
+
+def build_trie(terms: List[Tuple[str, float]]) -> Dict:
+    """
+    Compila una lista de frases en un trie de tokens.
+
+    Args:
+        terms: Lista de (frase, peso)
+
+    Returns:
+        Trie como diccionarios anidados; la hoja `$` guarda el peso
+    """
+    trie = {}
+    for phrase, weight in terms:
+        node = trie
+        for token in normalize_tokens(phrase):
+            node = node.setdefault(token, {})
+        node[_END] = weight
+    return trie
+
+
+def match_trie(trie: Dict, tokens: List[str]) -> List[Tuple[int, int, float]]:
+    """
+    Busca las frases del trie en los tokens, tomando la coincidencia más larga
+    en cada posición.
+
+    Args:
+        trie: Trie compilado con build_trie
+        tokens: Tokens normalizados
+
+    Returns:
+        Lista de (inicio, fin, peso)
+    """
+    matches = []
+    i = 0
+
+    while i < len(tokens):
+        node = trie
+        best = None
+        j = i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if _END in node:
+                best = (i, j, node[_END])
+
+        if best:
+            matches.append(best)
+            i = best[1]
+        else:
+            i += 1
+
+    return matches
+
+
+class LexiconClassifier:
+    """
+    Clasificador local de primer nivel: resuelve los mensajes obvios
+    ("gracias, excelente café", "el baño estaba sucio") sin llamar a Gemini
+    y devuelve una confianza para decidir si hace falta escalar.
+
+    La confianza combina qué tan claro es el sentimiento (margen entre
+    positivo y negativo) y qué tan claro es el tema (peso del tema ganador
+    frente a los demás).
+    """
+
+    def __init__(self):
+        self.sentiment_trie = build_trie(
+            [(phrase, weight) for phrase, weight in POSITIVE_TERMS]
+            + [(phrase, -weight) for phrase, weight in NEGATIVE_TERMS]
+        )
+        self.topic_tries = {
+            tema: build_trie(terms)
+            for tema, terms in TOPIC_TERMS.items()
+            if tema in TEMAS
+        }
+
+    def classify(self, texto_mensaje: str) -> dict:
+        """
+        Clasifica un mensaje.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y confianza (0 a 1)
+        """
+        tokens = normalize_tokens(texto_mensaje)
+
+        sentimiento, sentiment_confidence = self._classify_sentiment(tokens)
+        tema, topic_confidence = self._classify_topic(tokens)
+
+        return {
+            "sentimiento": sentimiento,
+            "tema": tema,
+            "resumen": f"{RESUMEN_SENTIMIENTO[sentimiento]} {RESUMEN_TEMA[tema]}",
+            "confianza": round(min(sentiment_confidence, topic_confidence), 2)
+        }
+
+    def _classify_sentiment(self, tokens: List[str]) -> Tuple[str, float]:
+        """
+        Suma los pesos de sentimiento invirtiendo los que siguen a una negación
+        en la misma cláusula. Si alguno se invirtió, la confianza queda por
+        debajo de NEGATED_MAX_CONFIDENCE.
+
+        Returns:
+            Tupla (sentimiento, confianza)
+        """
+        positive = 0.0
+        negative = 0.0
+        negated = False
+
+        for start, _, weight in match_trie(self.sentiment_trie, tokens):
+            if self._is_negated(tokens, start):
+                weight = -weight
+                negated = True
+
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+
+        total = positive + negative
+        if total == 0:
+            return "neutro", 0.3
+
+        margin = abs(positive - negative) / total
+        strength = min(1.0, max(positive, negative) / 2)
+
+        if margin < 0.3:
+            return "neutro", 0.4
+
+        sentimiento = "positivo" if positive > negative else "negativo"
+        confidence = margin * strength
+        if negated:
+            confidence = min(confidence, NEGATED_MAX_CONFIDENCE)
+        return sentimiento, confidence
+
+    @staticmethod
+    def _is_negated(tokens: List[str], start: int) -> bool:
+        """
+        Indica si hay una negación en las NEGATION_WINDOW palabras anteriores
+        a `start`, sin cruzar un límite de cláusula.
+
+        Args:
+            tokens: Tokens normalizados
+            start: Posición del término
+
+        Returns:
+            True si el término está negado
+        """
+        words = 0
+        for token in reversed(tokens[:start]):
+            if token in BOUNDARIES or words == NEGATION_WINDOW:
+                return False
+            if token in NEGATIONS:
+                return True
+            words += 1
+        return False
+
+    def _classify_topic(self, tokens: List[str]) -> Tuple[str, float]:
+        """
+        Elige el tema con mayor peso acumulado.
+
+        Returns:
+            Tupla (tema, confianza)
+        """
+        scores = {
+            tema: sum(weight for _, _, weight in match_trie(trie, tokens))
+            for tema, trie in self.topic_tries.items()
+        }
+        total = sum(scores.values())
+
+        if total == 0:
+            return "Otros", 0.3
+
+        tema, best = max(scores.items(), key=lambda item: item[1])
+        return tema, (best / total) * min(1.0, best)
@@ -0,0 +1,81 @@
+"""
+Métricas de las respuestas de Gemini por modo de salida (texto libre o JSON).
+"""
+
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+OUTPUT_MODES = ["text", "json"]
+
+
+class OutputMetrics:
+    """
+    Contadores compartidos en Redis por modo de salida, en el hash
+    `<prefix>:<modo>`:
+
+    - calls: llamadas a Gemini
+    - parse_failures: respuestas que no se pudieron parsear o validar
+    - invalid_items: elementos inválidos dentro de respuestas de lote
+    - output_tokens / prompt_tokens: tokens informados en usage_metadata
+    """
+
+    def __init__(self, client, prefix: str = "gemini:output"):
+        self.client = client
+        self.prefix = prefix
+
+    def record(self, mode: str, **counts: int):
+        """
+        Suma contadores al modo indicado.
+
+        Args:
+            mode: "text" o "json"
+            counts: Campo -> cantidad a sumar
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for field, amount in counts.items():
+                if amount:
+                    pipe.hincrby(f"{self.prefix}:{mode}", field, int(amount))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error registrando métricas de salida de Gemini: {e}")
+
+    async def record_async(self, mode: str, **counts: int):
+        """Igual que record() pero con un cliente de redis.asyncio"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for field, amount in counts.items():
+                if amount:
+                    pipe.hincrby(f"{self.prefix}:{mode}", field, int(amount))
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error registrando métricas de salida de Gemini: {e}")
+
+    @staticmethod
+    def read(client, prefix: str = "gemini:output") -> dict:
+        """
+        Lee los contadores de cada modo con la tasa de fallos de parseo y los
+        tokens de salida promedio por llamada.
+
+        Args:
+            client: Cliente Redis
+            prefix: Prefijo de los hashes
+
+        Returns:
+            Dict modo -> métricas
+        """
+        metrics = {}
+        for mode in OUTPUT_MODES:
+            counts = {field: int(value) for field, value in client.hgetall(f"{prefix}:{mode}").items()}
+            calls = counts.get("calls", 0)
+            if not calls:
+                continue
+
+            metrics[mode] = {
+                **counts,
+                "parse_failure_rate": round(counts.get("parse_failures", 0) / calls, 4),
+                "output_tokens_per_call": round(counts.get("output_tokens", 0) / calls, 1)
+            }
+
+        return metrics
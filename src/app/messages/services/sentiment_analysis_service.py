@@ -5,87 +5,613 @@ Servicio de análisis de sentimiento usando Google Gemini.
 import json
 import hashlib
 import re
+import time
 import google.generativeai as genai
-from typing import Optional
+from google.api_core import exceptions as google_exceptions
+from typing import List, Optional
 from src.config.settings import settings
+from src.frameworks.db.collections import SENTIMIENTOS, TEMAS
 from src.frameworks.logging.logger import setup_logger
+from src.frameworks.resilience.rate_limiter import RateLimitExceeded
+from src.frameworks.resilience.circuit_breaker import CircuitOpenError
 
 logger = setup_logger(__name__)
 
+REQUIRED_FIELDS = ["sentimiento", "tema", "resumen"]
+
+# Esquemas de salida para el modo JSON de Gemini (GEMINI_JSON_MODE)
+ANALYSIS_PROPERTIES = {
+    "sentimiento": {"type": "STRING", "format": "enum", "enum": SENTIMIENTOS},
+    "tema": {"type": "STRING", "format": "enum", "enum": TEMAS},
+    "resumen": {"type": "STRING"}
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": ANALYSIS_PROPERTIES,
+    "required": REQUIRED_FIELDS
+}
+
+BATCH_ANALYSIS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"indice": {"type": "INTEGER"}, **ANALYSIS_PROPERTIES},
+        "required": ["indice"] + REQUIRED_FIELDS
+    }
+}
+
+# Nivel que produjo cada análisis (se guarda en origen_analisis)
+ORIGEN_GEMINI = "gemini"
+ORIGEN_CACHE = "cache"
+ORIGEN_CACHE_SIMILAR = "cache_similar"
+ORIGEN_LEXICO = "lexico"
+ORIGEN_RESPALDO = "respaldo"
+
+# Errores de Gemini que indican cuota agotada o sobrecarga del proveedor
+OVERLOAD_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+# Errores que indican que Gemini no está disponible y cuentan para el circuit
+# breaker. Los errores de la petición (InvalidArgument, PermissionDenied, etc.)
+# no dicen nada del estado del servicio.
+TRANSIENT_ERRORS = OVERLOAD_ERRORS + (
+    google_exceptions.ServerError,
+    google_exceptions.RetryError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+def neutral_fallback_analysis(texto_mensaje: str) -> dict:
+    """
+    Análisis de respaldo cuando Gemini no está disponible: marca el mensaje
+    como neutro para que llegue al dashboard sin esperar al proveedor.
+
+    Args:
+        texto_mensaje: Texto del mensaje
+
+    Returns:
+        Dict con sentimiento, tema y resumen
+    """
+    return {
+        "sentimiento": "neutro",
+        "tema": "Otros",
+        "resumen": "Análisis automático no disponible, clasificado como neutro"
+    }
+
+
+def json_generation_config(response_schema: dict):
+    """
+    Configuración de generación para que Gemini responda JSON restringido a un esquema.
+
+    Args:
+        response_schema: ANALYSIS_SCHEMA o BATCH_ANALYSIS_SCHEMA
+
+    Returns:
+        GenerationConfig de Gemini
+    """
+    return genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=response_schema
+    )
+
+
+def compute_cache_generation() -> str:
+    """
+    Calcula la generación del caché de análisis: un hash del modelo, de las
+    plantillas de prompt y de ANALYSIS_CACHE_VERSION. Cambiar cualquiera de
+    ellos deja de usar los análisis cacheados con la combinación anterior.
+
+    Returns:
+        Hash corto de la combinación actual
+    """
+    fingerprint = "\n".join([
+        settings.GEMINI_MODEL,
+        settings.ANALYSIS_CACHE_VERSION,
+        SentimentAnalysisService._build_prompt("{texto_mensaje}"),
+        SentimentAnalysisService._build_batch_prompt(["{texto_mensaje}"]),
+    ])
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:10]
+
 
 class SentimentAnalysisService:
     """Servicio para analizar sentimiento de mensajes usando Google Gemini"""
 
-    def __init__(self, redis_cache=None):
+    def __init__(self, redis_cache=None, rate_limiter=None, concurrency_limiter=None,
+                 circuit_breaker=None, fallback_analyzer=None, local_classifier=None,
+                 similarity_cache=None, single_flight=None, analysis_store=None, output_metrics=None,
+                 hit_counter=None):
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        # Con JSON mode Gemini devuelve JSON restringido al esquema de análisis
+        self.json_mode = settings.GEMINI_JSON_MODE
+        self.output_mode = "json" if self.json_mode else "text"
+        # Llamadas, fallos de parseo y tokens de salida por modo (OutputMetrics)
+        self.output_metrics = output_metrics
+        self.cache_generation = compute_cache_generation()
         self.cache = redis_cache
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breaker = circuit_breaker
+        # Función texto -> análisis usada mientras el circuito está abierto
+        self.fallback_analyzer = fallback_analyzer
+        # Clasificador local que resuelve los mensajes obvios sin llamar a Gemini
+        self.local_classifier = local_classifier
+        # Caché por huella SimHash para mensajes casi idénticos
+        self.similarity_cache = similarity_cache
+        # Deduplica llamadas concurrentes a Gemini para el mismo texto
+        self.single_flight = single_flight
+        # Caché durable en MongoDB detrás de Redis (AnalysisCacheRepository)
+        self.analysis_store = analysis_store
+        # Cuenta los aciertos exactos para rankear el caché durable (AnalysisHitCounter)
+        self.hit_counter = hit_counter
 
     def analyze_message(self, texto_mensaje: str) -> dict:
         """
         Analiza un mensaje de cliente y retorna sentimiento, tema y resumen.
 
         Si hay caché habilitado, primero busca si ya se analizó un mensaje idéntico.
+        Luego, si hay clasificador local, lo usa cuando su confianza alcanza
+        LEXICON_MIN_CONFIDENCE; solo los mensajes ambiguos llegan a Gemini.
+        Con el circuit breaker abierto usa el analizador de respaldo si hay uno
+        configurado o lanza CircuitOpenError sin llamar a Gemini.
 
         Args:
             texto_mensaje: Texto del mensaje a analizar
 
         Returns:
-            Dict con: sentimiento, tema, resumen
+            Dict con: sentimiento, tema, resumen y origen (gemini, cache, lexico o respaldo)
 
         Example:
             {
                 "sentimiento": "positivo",
                 "tema": "Calidad del Producto",
-                "resumen": "El cliente está satisfecho con el sabor del café"
+                "resumen": "El cliente está satisfecho con el sabor del café",
+                "origen": "gemini"
             }
         """
         # Si hay caché, verificar si ya se analizó este mensaje
-        if self.cache:
+        cached_result = self.get_cached_analysis(texto_mensaje)
+        if cached_result:
+            return cached_result
+
+        local_result = self._classify_locally(texto_mensaje)
+        if local_result:
+            return local_result
+
+        # Con single flight, una sola llamada a Gemini por texto aunque lleguen muchos iguales a la vez
+        if self.single_flight and self.cache:
             cache_key = self._get_cache_key(texto_mensaje)
-            cached_result = self.cache.get(cache_key)
-            if cached_result:
-                return cached_result
+            return self.single_flight.do(
+                cache_key,
+                compute=lambda: self._analyze_with_gemini(texto_mensaje),
+                lookup=lambda: self._get_exact_cached_analysis(cache_key)
+            )
 
+        return self._analyze_with_gemini(texto_mensaje)
+
+    def _analyze_with_gemini(self, texto_mensaje: str) -> dict:
+        """
+        Analiza un mensaje con Gemini y guarda el resultado en caché.
+
+        Args:
+            texto_mensaje: Texto del mensaje a analizar
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen
+        """
         prompt = self._build_prompt(texto_mensaje)
 
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text
-
-            # Limpiar respuesta (Gemini a veces añade markdown)
-            cleaned_text = self._clean_json_response(response_text)
+            response = self._generate(prompt, response_schema=ANALYSIS_SCHEMA)
+        except CircuitOpenError:
+            if self.fallback_analyzer:
+                fallback = self.fallback_analyzer(texto_mensaje)
+                return {**{field: fallback[field] for field in REQUIRED_FIELDS}, "origen": ORIGEN_RESPALDO}
+            raise
 
-            # Parsear el JSON de la respuesta
-            analysis = json.loads(cleaned_text)
+        response_text = None
+        try:
+            response_text = response.text
 
-            # Validar que tenga los campos requeridos
-            required_fields = ["sentimiento", "tema", "resumen"]
-            for field in required_fields:
-                if field not in analysis:
-                    raise ValueError(f"Campo requerido '{field}' no encontrado en la respuesta")
+            # Parsear y validar el JSON de la respuesta
+            analysis = self._parse_response(response_text)
+            self._validate_analysis(analysis)
 
             # Guardar en caché si está habilitado
-            if self.cache:
-                cache_key = self._get_cache_key(texto_mensaje)
-                self.cache.set(cache_key, analysis, ttl=86400)
+            self._store_analyses([(texto_mensaje, analysis)])
 
-            return analysis
+            return {**analysis, "origen": ORIGEN_GEMINI}
 
         except json.JSONDecodeError as e:
+            self._record_output(parse_failures=1)
             logger.error(f"Error al parsear respuesta JSON de Gemini: {e}")
             logger.error(f"Respuesta original: {response_text}")
             # Retornar valores por defecto si falla el parsing
             return {
                 "sentimiento": "neutro",
                 "tema": "Otros",
-                "resumen": "No se pudo analizar el mensaje correctamente"
+                "resumen": "No se pudo analizar el mensaje correctamente",
+                "origen": ORIGEN_GEMINI
             }
+        except ValueError as e:
+            self._record_output(parse_failures=1)
+            logger.error(f"Respuesta de Gemini inválida: {e}")
+            raise
         except Exception as e:
             logger.error(f"Error al analizar mensaje con Gemini: {e}")
             raise
 
-    def _clean_json_response(self, text: str) -> str:
+    def analyze_batch(self, textos: List[str]) -> List[Optional[dict]]:
+        """
+        Analiza varios mensajes empaquetando hasta ANALYSIS_BATCH_SIZE en un solo prompt.
+
+        Los mensajes ya cacheados o resueltos con confianza por el clasificador
+        local no se envían a Gemini. Los elementos que no
+        vengan en la respuesta o no pasen la validación se reintentan uno a uno
+        con analyze_message.
+
+        Args:
+            textos: Lista de textos a analizar
+
+        Returns:
+            Lista alineada con `textos`: dict con sentimiento, tema, resumen y
+            origen, o None si el mensaje no pudo analizarse
+        """
+        results: List[Optional[dict]] = [None] * len(textos)
+        pending = []
+
+        for index, texto in enumerate(textos):
+            cached_result = self.get_cached_analysis(texto)
+            if cached_result:
+                results[index] = cached_result
+                continue
+
+            local_result = self._classify_locally(texto)
+            if local_result:
+                results[index] = local_result
+            else:
+                pending.append(index)
+
+        batch_size = max(1, settings.ANALYSIS_BATCH_SIZE)
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            failed = self._analyze_chunk([textos[i] for i in chunk], chunk, results)
+
+            # Solo los elementos fallidos vuelven al análisis individual
+            for index in failed:
+                try:
+                    results[index] = self.analyze_message(textos[index])
+                except CircuitOpenError:
+                    # Los análisis ya obtenidos quedaron en caché y se recuperan al reintentar
+                    raise
+                except Exception as e:
+                    logger.error(f"Error en análisis individual del elemento {index} del lote: {e}")
+
+        return results
+
+    def _analyze_chunk(self, textos: List[str], indices: List[int], results: List[Optional[dict]]) -> List[int]:
+        """
+        Envía un lote de mensajes a Gemini en un solo prompt y guarda los
+        resultados válidos en `results`.
+
+        Args:
+            textos: Textos del lote
+            indices: Posición de cada texto en la lista original
+            results: Lista de resultados a completar
+
+        Returns:
+            Índices originales que no obtuvieron un análisis válido
+        """
+        if len(textos) == 1:
+            return indices
+
+        prompt = self._build_batch_prompt(textos)
+
+        try:
+            response = self._generate(prompt, expected_outputs=len(textos), response_schema=BATCH_ANALYSIS_SCHEMA)
+        except Exception as e:
+            logger.error(f"Error al analizar lote de {len(textos)} mensajes con Gemini: {e}")
+            return indices
+
+        try:
+            items = self._parse_response(response.text)
+            if not isinstance(items, list):
+                raise ValueError("La respuesta del lote no es un arreglo JSON")
+        except Exception as e:
+            self._record_output(parse_failures=1)
+            logger.error(f"Error al analizar lote de {len(textos)} mensajes con Gemini: {e}")
+            return indices
+
+        failed = set(indices)
+        stored = []
+        for item in items:
+            try:
+                position = int(item["indice"])
+                if not 0 <= position < len(indices):
+                    raise ValueError(f"Índice fuera de rango: {position}")
+
+                analysis = {field: item[field] for field in REQUIRED_FIELDS if field in item}
+                self._validate_analysis(analysis)
+            except (KeyError, TypeError, ValueError) as e:
+                self._record_output(invalid_items=1)
+                logger.warning(f"Elemento inválido en respuesta de lote: {e}")
+                continue
+
+            index = indices[position]
+            results[index] = {**analysis, "origen": ORIGEN_GEMINI}
+            failed.discard(index)
+            stored.append((textos[position], analysis))
+
+        self._store_analyses(stored)
+
+        return sorted(failed)
+
+    def get_cached_analysis(self, texto_mensaje: str) -> Optional[dict]:
+        """
+        Busca el análisis de un mensaje en caché sin llamar a Gemini: primero
+        por texto exacto en Redis, luego en el caché durable de MongoDB y,
+        si está habilitado, por similitud.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen ("cache" o
+            "cache_similar"), o None si no está cacheado
+        """
+        cache_key = self._get_cache_key(texto_mensaje)
+        cached_result = self.cache.get(cache_key) if self.cache else None
+        if not cached_result:
+            cached_result = self._get_stored_analysis(cache_key)
+
+        if cached_result:
+            if self.similarity_cache:
+                self.similarity_cache.record("exact")
+            if self.hit_counter:
+                self.hit_counter.record(cache_key)
+            return {**cached_result, "origen": ORIGEN_CACHE}
+
+        if not self.similarity_cache:
+            return None
+
+        near_result = self.similarity_cache.get(texto_mensaje)
+        if not near_result:
+            self.similarity_cache.record("miss")
+            return None
+
+        analysis, distance = near_result
+        self.similarity_cache.record("near")
+        logger.debug(f"Acierto por similitud a distancia {distance}")
+        return {**analysis, "origen": ORIGEN_CACHE_SIMILAR}
+
+    def _get_exact_cached_analysis(self, cache_key: str) -> Optional[dict]:
+        """
+        Busca un análisis por clave exacta sin registrar estadísticas
+        (lo usa single flight mientras espera a otro proceso).
+
+        Args:
+            cache_key: Clave de caché del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen "cache", o None
+        """
+        cached_result = self.cache.get(cache_key)
+        return {**cached_result, "origen": ORIGEN_CACHE} if cached_result else None
+
+    def _get_stored_analysis(self, cache_key: str) -> Optional[dict]:
+        """
+        Busca un análisis en el caché durable de MongoDB y, si existe, lo
+        vuelve a cargar en Redis.
+
+        Args:
+            cache_key: Clave de caché del mensaje
+
+        Returns:
+            Dict con sentimiento, tema y resumen, o None
+        """
+        if not self.analysis_store:
+            return None
+
+        try:
+            analysis = self.analysis_store.get(cache_key)
+        except Exception as e:
+            logger.error(f"Error al consultar el caché durable de análisis: {e}")
+            return None
+
+        if analysis and self.cache:
+            self.cache.set(cache_key, analysis, ttl=settings.ANALYSIS_CACHE_TTL)
+
+        return analysis
+
+    def _store_analyses(self, entries: List[tuple]):
+        """
+        Guarda análisis de Gemini en los cachés habilitados.
+
+        Args:
+            entries: Lista de (texto del mensaje, dict con sentimiento, tema y resumen)
+        """
+        if not entries:
+            return
+
+        keyed = [(self._get_cache_key(texto), analysis) for texto, analysis in entries]
+
+        if self.cache:
+            for cache_key, analysis in keyed:
+                self.cache.set(cache_key, analysis, ttl=settings.ANALYSIS_CACHE_TTL)
+
+        if self.similarity_cache:
+            for texto, analysis in entries:
+                self.similarity_cache.set(texto, analysis)
+
+        if self.analysis_store:
+            try:
+                self.analysis_store.save_many(keyed)
+            except Exception as e:
+                logger.error(f"Error al guardar en el caché durable de análisis: {e}")
+
+    def _classify_locally(self, texto_mensaje: str) -> Optional[dict]:
+        """
+        Clasifica un mensaje con el clasificador local si la confianza alcanza
+        LEXICON_MIN_CONFIDENCE.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+
+        Returns:
+            Dict con sentimiento, tema, resumen y origen, o None si hay que escalar a Gemini
+        """
+        if not self.local_classifier:
+            return None
+
+        result = self.local_classifier.classify(texto_mensaje)
+        if result["confianza"] < settings.LEXICON_MIN_CONFIDENCE:
+            return None
+
+        return {**{field: result[field] for field in REQUIRED_FIELDS}, "origen": ORIGEN_LEXICO}
+
+    def _generate(self, prompt: str, expected_outputs: int = 1, response_schema: dict = None):
+        """
+        Llama a Gemini respetando el rate limiter compartido y el límite de
+        concurrencia adaptativo del proceso.
+
+        Args:
+            prompt: Prompt a enviar
+            expected_outputs: Número de análisis que se esperan en la respuesta
+            response_schema: Esquema de la respuesta (solo se usa con JSON mode)
+
+        Returns:
+            Respuesta de Gemini
+
+        Raises:
+            CircuitOpenError: Si el circuit breaker está abierto
+            RateLimitExceeded: Si no hubo capacidad dentro de GEMINI_RATE_LIMIT_TIMEOUT
+        """
+        if self.circuit_breaker and not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("Circuito de Gemini abierto")
+
+        estimated_tokens = self._estimate_tokens(prompt, expected_outputs)
+
+        try:
+            if self.rate_limiter and not self.rate_limiter.acquire(estimated_tokens, timeout=settings.GEMINI_RATE_LIMIT_TIMEOUT):
+                raise RateLimitExceeded("Sin capacidad en el rate limiter de Gemini")
+
+            if self.concurrency_limiter and not self.concurrency_limiter.acquire(timeout=settings.GEMINI_RATE_LIMIT_TIMEOUT):
+                raise RateLimitExceeded("Sin slots de concurrencia para Gemini")
+        except RateLimitExceeded:
+            if self.circuit_breaker:
+                self.circuit_breaker.release_trial()
+            raise
+
+        started_at = time.monotonic()
+        overloaded = False
+
+        try:
+            generation_config = None
+            if self.json_mode and response_schema:
+                generation_config = json_generation_config(response_schema)
+
+            response = self.model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": settings.GEMINI_REQUEST_TIMEOUT}
+            )
+        except Exception as e:
+            overloaded = isinstance(e, OVERLOAD_ERRORS)
+            if self.circuit_breaker:
+                if isinstance(e, TRANSIENT_ERRORS):
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.release_trial()
+            raise
+        finally:
+            latency = time.monotonic() - started_at
+            if self.concurrency_limiter:
+                self.concurrency_limiter.release(latency, overloaded)
+
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success(latency)
+
+        usage = getattr(response, "usage_metadata", None)
+        if self.rate_limiter:
+            self.rate_limiter.record_usage(estimated_tokens, getattr(usage, "total_token_count", 0))
+
+        self._record_output(
+            calls=1,
+            output_tokens=getattr(usage, "candidates_token_count", 0),
+            prompt_tokens=getattr(usage, "prompt_token_count", 0)
+        )
+
+        return response
+
+    def _record_output(self, **counts: int):
+        """Suma contadores a las métricas del modo de salida actual"""
+        if self.output_metrics:
+            self.output_metrics.record(self.output_mode, **counts)
+
+    def _estimate_tokens(self, prompt: str, expected_outputs: int = 1) -> int:
+        """
+        Estima los tokens de una llamada (~4 caracteres por token más la respuesta).
+
+        Args:
+            prompt: Prompt a enviar
+            expected_outputs: Número de análisis que se esperan en la respuesta
+
+        Returns:
+            Tokens estimados
+        """
+        return len(prompt) // 4 + settings.GEMINI_OUTPUT_TOKENS_ESTIMATE * expected_outputs
+
+    def _parse_response(self, text: str):
+        """
+        Parsea la respuesta de Gemini. Con JSON mode la respuesta ya es JSON
+        y se parsea directamente; en modo texto antes se limpia el markdown.
+
+        Args:
+            text: Texto de respuesta de Gemini
+
+        Returns:
+            Objeto o arreglo JSON parseado
+
+        Raises:
+            json.JSONDecodeError: Si la respuesta no es JSON válido
+        """
+        if self.json_mode:
+            return json.loads(text)
+        return json.loads(self._clean_json_response(text))
+
+    @staticmethod
+    def _validate_analysis(analysis: dict):
+        """
+        Valida que un análisis tenga los campos requeridos y valores permitidos.
+
+        Args:
+            analysis: Análisis a validar
+
+        Raises:
+            ValueError: Si falta algún campo requerido o un valor no es válido
+        """
+        if not isinstance(analysis, dict):
+            raise ValueError("La respuesta no es un objeto JSON")
+
+        for field in REQUIRED_FIELDS:
+            if field not in analysis:
+                raise ValueError(f"Campo requerido '{field}' no encontrado en la respuesta")
+
+        if analysis["sentimiento"] not in SENTIMIENTOS:
+            raise ValueError(f"Sentimiento no válido: {analysis['sentimiento']}")
+        if analysis["tema"] not in TEMAS:
+            raise ValueError(f"Tema no válido: {analysis['tema']}")
+        if not isinstance(analysis["resumen"], str):
+            raise ValueError("El resumen no es texto")
+
+    @staticmethod
+    def _clean_json_response(text: str) -> str:
         """
         Limpia la respuesta de Gemini removiendo markdown y espacios extra.
 
@@ -110,14 +636,15 @@ class SentimentAnalysisService:
             texto_mensaje: Texto del mensaje
 
         Returns:
-            Hash MD5 del mensaje para usar como clave
+            Clave `sentiment:<generación>:<hash MD5 del mensaje>`
         """
         # Normalizar el texto (lowercase, sin espacios extra)
         normalized = texto_mensaje.lower().strip()
-        # Generar hash MD5
-        return f"sentiment:{hashlib.md5(normalized.encode()).hexdigest()}"
+        # Generar hash MD5 dentro del namespace de la generación de prompt y modelo
+        return f"sentiment:{self.cache_generation}:{hashlib.md5(normalized.encode()).hexdigest()}"
 
-    def _build_prompt(self, texto_mensaje: str) -> str:
+    @staticmethod
+    def _build_prompt(texto_mensaje: str) -> str:
         """
         Construye el prompt para Claude con instrucciones específicas.
 
@@ -146,3 +673,43 @@ Mensaje del cliente:
 "{texto_mensaje}"
 
 Responde SOLO con el objeto JSON, sin formato markdown ni texto adicional:"""
+
+    @staticmethod
+    def _build_batch_prompt(textos: List[str]) -> str:
+        """
+        Construye un prompt que analiza varios mensajes en una sola llamada.
+
+        Args:
+            textos: Mensajes de los clientes
+
+        Returns:
+            Prompt formateado
+        """
+        mensajes = "\n".join(
+            f"{index}. {json.dumps(texto, ensure_ascii=False)}"
+            for index, texto in enumerate(textos)
+        )
+
+        return f"""Eres un asistente experto en análisis de sentimiento para "Café de El Salvador", una cadena de cafeterías.
+
+Analiza cada uno de los siguientes mensajes de clientes y devuelve ÚNICAMENTE un arreglo JSON (sin markdown, sin explicaciones adicionales) con un objeto por mensaje con la siguiente estructura:
+
+[
+  {{
+    "indice": número del mensaje,
+    "sentimiento": "positivo" | "negativo" | "neutro",
+    "tema": "Servicio al Cliente" | "Calidad del Producto" | "Precio" | "Limpieza" | "Ambiente" | "Otros",
+    "resumen": "Breve resumen en una oración de 10-15 palabras"
+  }}
+]
+
+Criterios:
+- sentimiento: "positivo" si el cliente está satisfecho, "negativo" si está insatisfecho, "neutro" si es neutral o pregunta
+- tema: Categoriza el mensaje en uno de los temas predefinidos
+- resumen: Resume la esencia del mensaje en una oración concisa
+- Analiza cada mensaje de forma independiente e incluye todos los índices
+
+Mensajes de los clientes:
+{mensajes}
+
+Responde SOLO con el arreglo JSON, sin formato markdown ni texto adicional:"""
@@ -11,15 +11,115 @@ class Settings:
     MONGO_URI = os.getenv('MONGO_URI')
     MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'whatsapp_sentiment')
     MONGO_COLLECTION_MENSAJES = os.getenv('MONGO_COLLECTION_MENSAJES', 'mensajes')
+    MONGO_COLLECTION_ANALYSIS_CACHE = os.getenv('MONGO_COLLECTION_ANALYSIS_CACHE', 'analysis_cache')
+    MONGO_COLLECTION_ROLLUPS = os.getenv('MONGO_COLLECTION_ROLLUPS', 'mensajes_rollup')  # conteos por hora y día
 
     # Redis
     REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
 
+    # Cola de mensajes
+    QUEUE_BACKEND = os.getenv('QUEUE_BACKEND', 'list')  # list | stream
+    QUEUE_STREAM_NAME = os.getenv('QUEUE_STREAM_NAME', 'message_stream')
+    QUEUE_STREAM_GROUP = os.getenv('QUEUE_STREAM_GROUP', 'sentiment_workers')
+    QUEUE_RELIABLE = os.getenv('QUEUE_RELIABLE', 'False').lower() == 'true'  # at-least-once con ack
+    QUEUE_VISIBILITY_TIMEOUT = int(os.getenv('QUEUE_VISIBILITY_TIMEOUT', 300))  # segundos de lease
+    QUEUE_REAPER_INTERVAL = int(os.getenv('QUEUE_REAPER_INTERVAL', 30))  # segundos entre revisiones
+
+    # Reintentos y dead letter queue
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 5))  # intentos antes de ir a la DLQ
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 2))  # segundos del primer reintento
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 300))  # tope del backoff exponencial
+    RETRY_POLL_INTERVAL = int(os.getenv('RETRY_POLL_INTERVAL', 1))  # segundos entre revisiones
+
     # Google Gemini
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+    GEMINI_RPM = int(os.getenv('GEMINI_RPM', 0))  # requests por minuto compartidas (0 = sin límite)
+    GEMINI_TPM = int(os.getenv('GEMINI_TPM', 0))  # tokens por minuto compartidos (0 = sin límite)
+    GEMINI_RATE_LIMIT_TIMEOUT = float(os.getenv('GEMINI_RATE_LIMIT_TIMEOUT', 60))  # segundos de espera máxima
+    GEMINI_OUTPUT_TOKENS_ESTIMATE = int(os.getenv('GEMINI_OUTPUT_TOKENS_ESTIMATE', 80))  # tokens por análisis
+    GEMINI_ADAPTIVE_CONCURRENCY = os.getenv('GEMINI_ADAPTIVE_CONCURRENCY', 'False').lower() == 'true'
+    GEMINI_CONCURRENCY_MIN = int(os.getenv('GEMINI_CONCURRENCY_MIN', 1))
+    GEMINI_CONCURRENCY_MAX = int(os.getenv('GEMINI_CONCURRENCY_MAX', 16))
+    GEMINI_LATENCY_THRESHOLD = float(os.getenv('GEMINI_LATENCY_THRESHOLD', 10))  # segundos
+    GEMINI_REQUEST_TIMEOUT = float(os.getenv('GEMINI_REQUEST_TIMEOUT', 30))  # segundos por llamada
+    GEMINI_JSON_MODE = os.getenv('GEMINI_JSON_MODE', 'False').lower() == 'true'  # salida JSON con esquema
+
+    # Circuit breaker de Gemini
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))  # fallos seguidos
+    CIRCUIT_BREAKER_LATENCY_THRESHOLD = float(os.getenv('CIRCUIT_BREAKER_LATENCY_THRESHOLD', 15))  # segundos
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv('CIRCUIT_BREAKER_RESET_TIMEOUT', 30))  # segundos abierto
+    CIRCUIT_BREAKER_FALLBACK = os.getenv('CIRCUIT_BREAKER_FALLBACK', 'defer')  # defer | neutral | lexicon
+
+    # Clasificador léxico local (primer nivel antes de Gemini)
+    LEXICON_ENABLED = os.getenv('LEXICON_ENABLED', 'False').lower() == 'true'
+    LEXICON_MIN_CONFIDENCE = float(os.getenv('LEXICON_MIN_CONFIDENCE', 0.8))  # 0 a 1, por debajo escala a Gemini
+
+    # Caché de análisis
+    ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', 86400))  # segundos en Redis
+    ANALYSIS_CACHE_STORE_ENABLED = os.getenv('ANALYSIS_CACHE_STORE_ENABLED', 'False').lower() == 'true'  # L3 en MongoDB
+    ANALYSIS_CACHE_WARMUP_SIZE = int(os.getenv('ANALYSIS_CACHE_WARMUP_SIZE', 10000))  # entradas a precargar en Redis
+    ANALYSIS_CACHE_HITS_FLUSH_INTERVAL = int(os.getenv('ANALYSIS_CACHE_HITS_FLUSH_INTERVAL', 60))  # segundos entre volcados de aciertos a MongoDB
+    ANALYSIS_CACHE_VERSION = os.getenv('ANALYSIS_CACHE_VERSION', '1')  # cambiarlo invalida todo el caché de análisis
+    CACHE_GENERATION_SWEEP_INTERVAL = int(os.getenv('CACHE_GENERATION_SWEEP_INTERVAL', 5))  # segundos entre pasos de SCAN
+
+    # Codec de valores en Redis (caché de análisis y payloads de la cola)
+    CODEC_FORMAT = os.getenv('CODEC_FORMAT', 'json')  # json | msgpack
+    CODEC_COMPRESSION = os.getenv('CODEC_COMPRESSION', 'False').lower() == 'true'  # zstd, requiere zstandard
+    CODEC_COMPRESSION_MIN_BYTES = int(os.getenv('CODEC_COMPRESSION_MIN_BYTES', 64))  # textos más cortos no se comprimen
+
+    # Caché L1 en memoria de cada proceso delante de Redis
+    CACHE_L1_ENABLED = os.getenv('CACHE_L1_ENABLED', 'False').lower() == 'true'
+    CACHE_L1_MAX_ITEMS = int(os.getenv('CACHE_L1_MAX_ITEMS', 10000))  # entradas por proceso
+    CACHE_L1_MAX_TTL = int(os.getenv('CACHE_L1_MAX_TTL', 300))  # segundos máximos de una copia local
+
+    # Single flight: una sola llamada a Gemini por texto entre llamadas concurrentes
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'False').lower() == 'true'
+    SINGLE_FLIGHT_LOCK_TTL = float(os.getenv('SINGLE_FLIGHT_LOCK_TTL', 45))  # segundos, mayor que una llamada a Gemini
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', 30))  # segundos esperando a otro proceso
+
+    # Caché por similitud (SimHash + LSH por bandas)
+    SIMILARITY_CACHE_ENABLED = os.getenv('SIMILARITY_CACHE_ENABLED', 'False').lower() == 'true'
+    SIMILARITY_CACHE_MAX_DISTANCE = int(os.getenv('SIMILARITY_CACHE_MAX_DISTANCE', 3))  # bits de 64
+    SIMILARITY_CACHE_BANDS = int(os.getenv('SIMILARITY_CACHE_BANDS', 4))  # debe ser mayor que la distancia
+
+    # Contadores del dashboard en Redis (en lugar de agregar en MongoDB en cada lectura)
+    DASHBOARD_COUNTERS_ENABLED = os.getenv('DASHBOARD_COUNTERS_ENABLED', 'False').lower() == 'true'
+    DASHBOARD_COUNTERS_RECONCILE_INTERVAL = int(os.getenv('DASHBOARD_COUNTERS_RECONCILE_INTERVAL', 300))  # segundos
+    STATS_BROADCAST_INTERVAL_MS = int(os.getenv('STATS_BROADCAST_INTERVAL_MS', 0))  # 0 = emitir en cada análisis
+    STATS_DELTA_EVENTS = os.getenv('STATS_DELTA_EVENTS', 'False').lower() == 'true'  # stats_delta en lugar de stats_updated (con STATS_BROADCAST_INTERVAL_MS)
+    ROLLUPS_ENABLED = os.getenv('ROLLUPS_ENABLED', 'False').lower() == 'true'  # conteos por hora/día para /api/tendencias
+    TRENDS_MAX_BUCKETS = int(os.getenv('TRENDS_MAX_BUCKETS', 1500))  # buckets máximos por consulta de tendencias
+
+    # Worker
+    WORKER_ID = os.getenv('WORKER_ID')  # por defecto hostname:pid
+    WORKER_MODE = os.getenv('WORKER_MODE', 'sequential')  # sequential | threads | batch
+    WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', 4))  # mensajes en vuelo por proceso
+    WORKER_SHUTDOWN_TIMEOUT = int(os.getenv('WORKER_SHUTDOWN_TIMEOUT', 30))  # segundos para drenar
+
+    # Worker asyncio (async_worker.py)
+    ASYNC_WORKER_CONCURRENCY = int(os.getenv('ASYNC_WORKER_CONCURRENCY', 200))  # análisis en vuelo por proceso
+    ASYNC_TASK_TIMEOUT = float(os.getenv('ASYNC_TASK_TIMEOUT', 90))  # segundos máximos por análisis
+    ASYNC_IO_THREADS = int(os.getenv('ASYNC_IO_THREADS', 16))  # hilos para MongoDB y la cola
+
+    # Supervisor de workers (supervisor.py)
+    SUPERVISOR_MIN_WORKERS = int(os.getenv('SUPERVISOR_MIN_WORKERS', 1))
+    SUPERVISOR_MAX_WORKERS = int(os.getenv('SUPERVISOR_MAX_WORKERS', os.cpu_count() or 1))
+    SUPERVISOR_CHECK_INTERVAL = int(os.getenv('SUPERVISOR_CHECK_INTERVAL', 5))  # segundos entre revisiones
+    SUPERVISOR_SCALE_UP_QUEUE = int(os.getenv('SUPERVISOR_SCALE_UP_QUEUE', 50))  # cola mínima para escalar
+    SUPERVISOR_SCALE_DOWN_QUEUE = int(os.getenv('SUPERVISOR_SCALE_DOWN_QUEUE', 5))  # cola máxima para reducir
+    SUPERVISOR_SCALE_UP_CHECKS = int(os.getenv('SUPERVISOR_SCALE_UP_CHECKS', 2))  # revisiones seguidas
+    SUPERVISOR_SCALE_DOWN_CHECKS = int(os.getenv('SUPERVISOR_SCALE_DOWN_CHECKS', 6))  # revisiones seguidas
+    SUPERVISOR_TARGET_DRAIN_SECONDS = int(os.getenv('SUPERVISOR_TARGET_DRAIN_SECONDS', 30))
+    SUPERVISOR_COOLDOWN = int(os.getenv('SUPERVISOR_COOLDOWN', 30))  # segundos entre cambios
+
+    # Análisis por lotes
+    ANALYSIS_BATCH_SIZE = int(os.getenv('ANALYSIS_BATCH_SIZE', 10))  # mensajes por prompt
+    ANALYSIS_BATCH_WAIT_MS = int(os.getenv('ANALYSIS_BATCH_WAIT_MS', 200))  # espera máxima para llenar un lote
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 50))  # análisis por bulk_write en MongoDB
+    WRITE_FLUSH_MS = int(os.getenv('WRITE_FLUSH_MS', 500))  # espera máxima antes de guardar el buffer
 
     # Flask
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
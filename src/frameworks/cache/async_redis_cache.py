@@ -0,0 +1,69 @@
+"""
+Cliente Redis asíncrono para cachear datos desde código asyncio.
+"""
+
+import redis.asyncio as aioredis
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+from src.frameworks.serialization.codec import encode, decode
+
+logger = setup_logger(__name__)
+
+
+class AsyncRedisCache:
+    """
+    Versión asyncio de RedisCache: mismas claves y mismo codec, así que
+    comparte los valores cacheados con los procesos síncronos.
+    """
+
+    def __init__(self):
+        self.client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True
+        )
+        # Los valores cacheados se guardan con el codec (binario si CODEC_FORMAT=msgpack)
+        self.binary_client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD
+        )
+
+    async def get(self, key: str):
+        """
+        Obtiene un valor del caché.
+
+        Args:
+            key: Clave a buscar
+
+        Returns:
+            Valor deserializado o None si no existe
+        """
+        try:
+            value = await self.binary_client.get(key)
+            if value:
+                return decode(value)
+            return None
+        except Exception as e:
+            logger.error(f"Error al obtener del cache: {e}")
+            return None
+
+    async def set(self, key: str, value: dict, ttl: int = 3600):
+        """
+        Guarda un valor en el caché.
+
+        Args:
+            key: Clave
+            value: Valor a guardar (dict)
+            ttl: Tiempo de vida en segundos (default: 1 hora)
+        """
+        try:
+            await self.binary_client.setex(key, ttl, encode(value))
+        except Exception as e:
+            logger.error(f"Error al guardar en cache: {e}")
+
+    async def close(self):
+        """Cierra las conexiones de ambos clientes"""
+        await self.client.aclose()
+        await self.binary_client.aclose()
@@ -0,0 +1,24 @@
+"""
+Selección del caché de análisis.
+"""
+
+from src.config.settings import settings
+from src.frameworks.cache.redis_cache import RedisCache
+from src.frameworks.cache.tiered_cache import TieredCache
+
+
+def create_cache():
+    """
+    Crea el caché según CACHE_L1_ENABLED.
+
+    Returns:
+        TieredCache (L1 en memoria + Redis) si CACHE_L1_ENABLED es true, RedisCache en otro caso
+    """
+    redis_cache = RedisCache()
+    if settings.CACHE_L1_ENABLED:
+        return TieredCache(
+            redis_cache,
+            max_items=settings.CACHE_L1_MAX_ITEMS,
+            max_ttl=settings.CACHE_L1_MAX_TTL
+        )
+    return redis_cache
@@ -0,0 +1,172 @@
+"""
+Generaciones del caché de análisis: cada combinación de prompt y modelo
+escribe sus claves bajo su propio namespace y las generaciones viejas se
+borran de a poco con SCAN.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Set
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Claves con un segmento menos que `<prefix>:<generación>:<hash>` son de antes de las generaciones
+LEGACY_GENERATION = "legacy"
+
+
+class CacheGenerations:
+    """
+    Administra las generaciones de claves `<prefix>:<generación>:<hash>`.
+
+    - Cada proceso anuncia su generación con un heartbeat
+      (`<prefix>_generations:active:<gen>` con TTL).
+    - Una generación registrada sin heartbeat está obsoleta: sweep_step()
+      recorre `<prefix>:*` con SCAN por tandas, borra con UNLINK sus claves
+      y, al completar la pasada, publica el conteo de claves por generación.
+    - Solo un proceso a la vez recorre el keyspace (lock con TTL).
+    """
+
+    def __init__(self, client, generation: str, prefix: str = "sentiment",
+                 heartbeat_ttl: int = 120, scan_count: int = 1000, step_budget: float = 0.2):
+        self.client = client
+        self.generation = generation
+        self.prefix = prefix
+        self.meta_prefix = f"{prefix}_generations"
+        self.heartbeat_ttl = heartbeat_ttl
+        self.scan_count = scan_count
+        self.step_budget = step_budget
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._cursor = 0
+        self._counts: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self._heartbeat_thread = None
+
+    def heartbeat(self):
+        """Registra la generación de este proceso como activa"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(f"{self.meta_prefix}:known", self.generation)
+        pipe.set(f"{self.meta_prefix}:active:{self.generation}", self.owner, ex=self.heartbeat_ttl)
+        pipe.execute()
+
+    def start_heartbeat(self, interval: float = None) -> threading.Thread:
+        """
+        Envía heartbeats en un hilo daemon (para procesos sin hilo de mantenimiento).
+
+        Args:
+            interval: Segundos entre heartbeats (por defecto un tercio del TTL)
+        """
+        interval = interval or self.heartbeat_ttl / 3
+
+        def run():
+            while True:
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.error(f"Error en heartbeat de generación de caché: {e}")
+                time.sleep(interval)
+
+        self._heartbeat_thread = threading.Thread(target=run, name="cache-generation-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        return self._heartbeat_thread
+
+    def get_active_generations(self) -> Set[str]:
+        """Generaciones con heartbeat vigente"""
+        prefix = f"{self.meta_prefix}:active:"
+        return {key[len(prefix):] for key in self.client.scan_iter(match=f"{prefix}*", count=100)}
+
+    def get_stale_generations(self) -> Set[str]:
+        """Generaciones registradas sin ningún proceso que las use"""
+        known = self.client.smembers(f"{self.meta_prefix}:known")
+        return (set(known) | {LEGACY_GENERATION}) - self.get_active_generations()
+
+    def sweep_step(self) -> int:
+        """
+        Avanza la pasada de SCAN durante `step_budget` segundos borrando
+        las claves de generaciones obsoletas.
+
+        Returns:
+            Número de claves borradas en este paso
+        """
+        lock_key = f"{self.meta_prefix}:sweeper"
+        holder = self.client.set(lock_key, self.owner, nx=True, ex=60)
+        if not holder:
+            if self.client.get(lock_key) != self.owner:
+                return 0
+            self.client.expire(lock_key, 60)
+
+        if self._cursor == 0 and not self._counts:
+            self._stale = self.get_stale_generations()
+
+        deleted = 0
+        deadline = time.monotonic() + self.step_budget
+
+        while True:
+            self._cursor, keys = self.client.scan(self._cursor, match=f"{self.prefix}:*", count=self.scan_count)
+
+            doomed = []
+            for key in keys:
+                generation = self._generation_of(key)
+                if generation in self._stale:
+                    doomed.append(key)
+                else:
+                    self._counts[generation] = self._counts.get(generation, 0) + 1
+
+            if doomed:
+                deleted += self.client.unlink(*doomed)
+
+            if self._cursor == 0:
+                self._finish_pass()
+                self.client.delete(lock_key)
+                break
+
+            if time.monotonic() >= deadline:
+                break
+
+        if deleted:
+            logger.info(f"{deleted} claves de caché de generaciones obsoletas eliminadas")
+
+        return deleted
+
+    def get_counts(self) -> dict:
+        """
+        Obtiene el último conteo de claves por generación.
+
+        Returns:
+            Dict con la generación actual, conteos, obsoletas y fecha del conteo
+        """
+        counts = self.client.get(f"{self.meta_prefix}:counts")
+        data = json.loads(counts) if counts else {"counts": {}, "updated_at": None}
+
+        return {
+            "current": self.generation,
+            "active": sorted(self.get_active_generations()),
+            "stale": sorted(self.get_stale_generations() - {LEGACY_GENERATION}),
+            **data
+        }
+
+    def _finish_pass(self):
+        """Publica los conteos de la pasada y olvida las generaciones ya vaciadas"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(f"{self.meta_prefix}:counts", json.dumps({
+            "counts": self._counts,
+            "updated_at": datetime.utcnow().isoformat()
+        }))
+
+        # Una generación pudo volver a activarse durante la pasada
+        still_stale = self._stale - self.get_active_generations() - {LEGACY_GENERATION}
+        if still_stale:
+            pipe.srem(f"{self.meta_prefix}:known", *still_stale)
+        pipe.execute()
+
+        self._counts = {}
+        self._stale = set()
+
+    def _generation_of(self, key: str) -> str:
+        """Extrae la generación de `<prefix>:<generación>:<hash>`"""
+        parts = key.split(":")
+        return parts[1] if len(parts) >= 3 else LEGACY_GENERATION
@@ -2,10 +2,10 @@
 Cliente Redis para cachear datos.
 """
 
-import json
 import redis
 from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
+from src.frameworks.serialization.codec import encode, decode
 
 logger = setup_logger(__name__)
 
@@ -20,7 +20,12 @@ class RedisCache:
             password=settings.REDIS_PASSWORD,
             decode_responses=True  # Decodifica automáticamente a strings
         )
-        pass
+        # Los valores cacheados se guardan con el codec (binario si CODEC_FORMAT=msgpack)
+        self.binary_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD
+        )
 
     def get(self, key: str):
         """
@@ -33,14 +38,36 @@ class RedisCache:
             Valor deserializado o None si no existe
         """
         try:
-            value = self.client.get(key)
+            value = self.binary_client.get(key)
             if value:
-                return json.loads(value)
+                return decode(value)
             return None
         except Exception as e:
             logger.error(f"Error al obtener del cache: {e}")
             return None
 
+    def get_with_ttl(self, key: str):
+        """
+        Obtiene un valor del caché junto con su tiempo de vida restante.
+
+        Args:
+            key: Clave a buscar
+
+        Returns:
+            Tupla (valor deserializado o None, segundos restantes o None si no expira)
+        """
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.ttl(key)
+            value, ttl = pipe.execute()
+            if value:
+                return decode(value), (ttl if ttl >= 0 else None)
+            return None, None
+        except Exception as e:
+            logger.error(f"Error al obtener del cache: {e}")
+            return None, None
+
     def set(self, key: str, value: dict, ttl: int = 3600):
         """
         Guarda un valor en el caché.
@@ -51,14 +78,35 @@ class RedisCache:
             ttl: Tiempo de vida en segundos (default: 1 hora)
         """
         try:
-            self.client.setex(
+            self.binary_client.setex(
                 key,
                 ttl,
-                json.dumps(value)
+                encode(value)
             )
         except Exception as e:
             logger.error(f"Error al guardar en cache: {e}")
 
+    def set_many(self, items: dict, ttl: int = 3600) -> int:
+        """
+        Guarda varios valores en un solo pipeline.
+
+        Args:
+            items: Dict clave -> valor (dict)
+            ttl: Tiempo de vida en segundos (default: 1 hora)
+
+        Returns:
+            Número de valores guardados
+        """
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, encode(value))
+            pipe.execute()
+            return len(items)
+        except Exception as e:
+            logger.error(f"Error al guardar en cache: {e}")
+            return 0
+
     def delete(self, key: str):
         """Elimina una clave del caché"""
         try:
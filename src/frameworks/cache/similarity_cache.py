@@ -0,0 +1,223 @@
+"""
+Caché por similitud: encuentra análisis de mensajes casi idénticos usando
+huellas SimHash y buckets LSH por bandas en Redis.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FINGERPRINT_BITS = 64
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_REPEATED_RE = re.compile(r"(.)\1{2,}")
+
+
+def normalize_text(texto: str) -> str:
+    """
+    Normaliza un mensaje para compararlo: minúsculas, sin acentos, sin
+    puntuación ni emoji y con las letras repetidas colapsadas
+    ("Excelente café!! 👍" y "excelenteee cafe" quedan iguales).
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Texto normalizado con palabras separadas por un espacio
+    """
+    decomposed = unicodedata.normalize("NFKD", texto.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    words = _NON_ALNUM_RE.sub(" ", without_accents)
+    return _REPEATED_RE.sub(r"\1", words).strip()
+
+
+def _features(normalized: str) -> List[str]:
+    """
+    Rasgos para la huella: palabras y trigramas de caracteres. Los trigramas
+    hacen que los mensajes cortos no dependan de una sola palabra.
+    """
+    words = normalized.split()
+    padded = f" {normalized} "
+    trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return [f"w:{word}" for word in words] + [f"c:{gram}" for gram in trigrams]
+
+
+def simhash(texto: str) -> int:
+    """
+    Calcula la huella SimHash de 64 bits de un mensaje. Mensajes parecidos
+    tienen huellas a poca distancia de Hamming.
+
+    Args:
+        texto: Texto original
+
+    Returns:
+        Huella como entero
+    """
+    weights = [0] * FINGERPRINT_BITS
+
+    for feature in _features(normalize_text(texto)):
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Número de bits distintos entre dos huellas"""
+    return bin(a ^ b).count("1")
+
+
+def band_values(fingerprint: int, bands: int) -> List[int]:
+    """
+    Divide una huella en `bands` bandas. Dos huellas a distancia menor que
+    `bands` comparten al menos una banda completa, así que basta buscar
+    candidatos en los buckets de cada banda.
+
+    Args:
+        fingerprint: Huella SimHash
+        bands: Número de bandas
+
+    Returns:
+        Valor de cada banda
+    """
+    width = FINGERPRINT_BITS // bands
+    mask = (1 << width) - 1
+    return [(fingerprint >> (band * width)) & mask for band in range(bands)]
+
+
+class SimilarityCache:
+    """
+    Caché de análisis indexado por huella SimHash.
+
+    Cada análisis se guarda en `<prefix>:fp:<huella>` y la huella se agrega a
+    un set de Redis por banda (`<prefix>:band:<i>:<valor>`). Una búsqueda junta
+    los candidatos de sus buckets y devuelve el más cercano si está a
+    `max_distance` bits o menos.
+
+    También lleva en `<prefix>:stats` los contadores de aciertos exactos,
+    aciertos por similitud y fallos del caché de análisis.
+    """
+
+    def __init__(self, client, prefix: str = "simcache", max_distance: int = 3,
+                 bands: int = 4, ttl: int = 86400):
+        self.client = client
+        self.prefix = prefix
+        self.max_distance = max_distance
+        # Con más bandas que la distancia máxima no se pierde ningún vecino
+        self.bands = max(bands, max_distance + 1)
+        self.ttl = ttl
+        self.stats_key = f"{prefix}:stats"
+
+    def get(self, texto: str) -> Optional[Tuple[dict, int]]:
+        """
+        Busca el análisis de un mensaje parecido.
+
+        Args:
+            texto: Texto del mensaje
+
+        Returns:
+            Tupla (análisis, distancia) o None si no hay vecino dentro del umbral
+        """
+        fingerprint = simhash(texto)
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for band, value in enumerate(band_values(fingerprint, self.bands)):
+                pipe.smembers(self._band_key(band, value))
+            buckets = pipe.execute()
+
+            candidates = {int(member, 16) for bucket in buckets for member in bucket}
+            nearest = sorted(
+                (distance, candidate)
+                for candidate in candidates
+                if (distance := hamming_distance(fingerprint, candidate)) <= self.max_distance
+            )
+
+            for distance, candidate in nearest:
+                value = self.client.get(self._fingerprint_key(candidate))
+                if value:
+                    return json.loads(value), distance
+                # El análisis expiró: quitar la huella de sus buckets
+                self._remove_from_buckets(candidate)
+
+            return None
+        except Exception as e:
+            logger.error(f"Error al buscar en caché por similitud: {e}")
+            return None
+
+    def set(self, texto: str, analysis: dict):
+        """
+        Guarda un análisis indexado por la huella del mensaje.
+
+        Args:
+            texto: Texto del mensaje
+            analysis: Análisis a guardar
+        """
+        fingerprint = simhash(texto)
+        member = f"{fingerprint:016x}"
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(self._fingerprint_key(fingerprint), self.ttl, json.dumps(analysis))
+            for band, value in enumerate(band_values(fingerprint, self.bands)):
+                band_key = self._band_key(band, value)
+                pipe.sadd(band_key, member)
+                pipe.expire(band_key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error al guardar en caché por similitud: {e}")
+
+    def record(self, outcome: str):
+        """
+        Cuenta el resultado de una búsqueda en el caché de análisis.
+
+        Args:
+            outcome: "exact", "near" o "miss"
+        """
+        try:
+            self.client.hincrby(self.stats_key, outcome, 1)
+        except Exception as e:
+            logger.error(f"Error registrando estadística de caché: {e}")
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene los contadores y las proporciones de aciertos.
+
+        Returns:
+            Dict con exact, near, miss, total, exact_ratio y near_ratio
+        """
+        counts = self.client.hgetall(self.stats_key)
+        exact = int(counts.get("exact", 0))
+        near = int(counts.get("near", 0))
+        miss = int(counts.get("miss", 0))
+        total = exact + near + miss
+
+        return {
+            "exact": exact,
+            "near": near,
+            "miss": miss,
+            "total": total,
+            "exact_ratio": round(exact / total, 4) if total else 0.0,
+            "near_ratio": round(near / total, 4) if total else 0.0,
+            "max_distance": self.max_distance
+        }
+
+    def _remove_from_buckets(self, fingerprint: int):
+        """Quita una huella de los sets de sus bandas"""
+        member = f"{fingerprint:016x}"
+        pipe = self.client.pipeline(transaction=False)
+        for band, value in enumerate(band_values(fingerprint, self.bands)):
+            pipe.srem(self._band_key(band, value), member)
+        pipe.execute()
+
+    def _fingerprint_key(self, fingerprint: int) -> str:
+        return f"{self.prefix}:fp:{fingerprint:016x}"
+
+    def _band_key(self, band: int, value: int) -> str:
+        return f"{self.prefix}:band:{band}:{value:x}"
@@ -0,0 +1,130 @@
+"""
+Single flight: evita que llamadas concurrentes con la misma clave repitan
+el mismo cálculo costoso.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Optional
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Borra el lock solo si sigue siendo del mismo dueño
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Deduplica cálculos concurrentes por clave en dos niveles:
+
+    - Dentro del proceso, las llamadas simultáneas con la misma clave
+      comparten un Future: solo la primera ejecuta el cálculo.
+    - Entre procesos, un lock de Redis (`<prefix>:<clave>`, SET NX con TTL)
+      elige un solo líder. Los demás consultan el caché con `lookup` hasta que
+      aparezca el resultado. Si el líder termina sin dejar resultado (o muere
+      y el lock expira) otro proceso toma el lock, y si se agota
+      `wait_timeout` se calcula sin coordinar.
+
+    Si Redis falla se calcula directamente.
+    """
+
+    def __init__(self, client, prefix: str = "singleflight", lock_ttl: float = 45,
+                 wait_timeout: float = 30, poll_interval: float = 0.1, max_poll_interval: float = 1.0):
+        self.client = client
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, compute: Callable[[], dict], lookup: Callable[[], Optional[dict]]) -> dict:
+        """
+        Obtiene el resultado de `compute` para `key` ejecutándolo una sola vez
+        entre todas las llamadas concurrentes.
+
+        Args:
+            key: Clave del cálculo (por ejemplo, la clave de caché)
+            compute: Función que hace el cálculo y guarda el resultado en caché
+            lookup: Función que busca el resultado en caché (None si no está)
+
+        Returns:
+            Resultado del cálculo (una copia por llamada)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return dict(future.result())
+
+        try:
+            result = self._do_distributed(key, compute, lookup)
+            future.set_result(result)
+            return dict(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _do_distributed(self, key: str, compute: Callable[[], dict],
+                        lookup: Callable[[], Optional[dict]]) -> dict:
+        """
+        Coordina el cálculo entre procesos con un lock de Redis.
+
+        Returns:
+            Resultado calculado por este proceso o leído del caché
+        """
+        lock_key = f"{self.prefix}:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        interval = self.poll_interval
+
+        while True:
+            try:
+                acquired = self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                logger.error(f"Error en lock de single flight, se calcula sin coordinar: {e}")
+                return compute()
+
+            if acquired:
+                try:
+                    # Otro líder pudo terminar entre el fallo de caché y el lock
+                    return lookup() or compute()
+                finally:
+                    self._release_lock(lock_key, token)
+
+            # Otro proceso está calculando: esperar a que deje el resultado en caché
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Tiempo de espera agotado en single flight para {key}, se calcula sin coordinar")
+                return compute()
+
+            time.sleep(min(interval, remaining))
+            interval = min(self.max_poll_interval, interval * 2)
+
+            result = lookup()
+            if result:
+                return result
+
+    def _release_lock(self, lock_key: str, token: str):
+        """Libera el lock si sigue siendo de este proceso"""
+        try:
+            self._release(keys=[lock_key], args=[token])
+        except Exception as e:
+            logger.error(f"Error liberando lock de single flight: {e}")
@@ -0,0 +1,255 @@
+"""
+Caché de dos niveles: LRU en memoria del proceso (L1) delante de Redis (L2).
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LocalTTLCache:
+    """
+    Caché en memoria con tamaño máximo, expulsión LRU y TTL por entrada.
+    Es seguro entre hilos.
+    """
+
+    def __init__(self, max_items: int = 10000):
+        self.max_items = max(1, max_items)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        Obtiene un valor si existe y no expiró.
+
+        Args:
+            key: Clave a buscar
+
+        Returns:
+            Valor o None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float = None):
+        """
+        Guarda un valor, expulsando el menos usado si se supera el tamaño.
+
+        Args:
+            key: Clave
+            value: Valor a guardar
+            ttl: Segundos de vida (None = sin expiración)
+        """
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """Elimina una clave"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    Caché con la misma interfaz que RedisCache (get/set/delete) y un nivel
+    L1 en memoria del proceso.
+
+    - get: busca en L1 y, si no está, en Redis; lo encontrado en Redis se
+      copia a L1 con el TTL que le queda en Redis (acotado por `max_ttl`).
+    - set/delete: escriben en Redis y publican la clave en el canal
+      `channel` para que los demás procesos (web y workers) descarten su copia.
+
+    `max_ttl` limita cuánto puede durar una copia en L1 si se pierde un
+    mensaje de invalidación. Cada proceso publica sus contadores de aciertos
+    y fallos por nivel en `cache:stats:<proceso>`.
+    """
+
+    STATS_PREFIX = "cache:stats"
+
+    def __init__(self, remote, max_items: int = 10000, max_ttl: float = 300,
+                 channel: str = "cache:invalidate", stats_interval: float = 30):
+        self.remote = remote
+        self.client = remote.client
+        self.local = LocalTTLCache(max_items)
+        self.max_ttl = max_ttl
+        self.channel = channel
+        self.stats_interval = stats_interval
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+        self._stats_lock = threading.Lock()
+        self._stats_published_at = 0.0
+        self._subscriber = None
+        self._subscribe()
+
+    def get(self, key: str):
+        """
+        Obtiene un valor del caché.
+
+        Args:
+            key: Clave a buscar
+
+        Returns:
+            Valor deserializado o None si no existe
+        """
+        value = self.local.get(key)
+        if value is not None:
+            self._count("l1_hits")
+            return value
+
+        self._count("l1_misses")
+        value, ttl = self.remote.get_with_ttl(key)
+
+        if value is None:
+            self._count("l2_misses")
+            return None
+
+        self._count("l2_hits")
+        self.local.set(key, value, min(ttl, self.max_ttl) if ttl is not None else self.max_ttl)
+        return value
+
+    def set(self, key: str, value: dict, ttl: int = 3600):
+        """
+        Guarda un valor en Redis y en L1, e invalida las copias de otros procesos.
+
+        Args:
+            key: Clave
+            value: Valor a guardar (dict)
+            ttl: Tiempo de vida en segundos (default: 1 hora)
+        """
+        self.remote.set(key, value, ttl)
+        self.local.set(key, value, min(ttl, self.max_ttl))
+        self._publish_invalidation(key)
+
+    def delete(self, key: str):
+        """Elimina una clave del caché en todos los procesos"""
+        self.remote.delete(key)
+        self.local.delete(key)
+        self._publish_invalidation(key)
+
+    def flush_all(self):
+        """Limpia todo el caché (usar con precaución)"""
+        self.remote.flush_all()
+        self.local.clear()
+        self._publish_invalidation("*")
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene los contadores de este proceso.
+
+        Returns:
+            Dict con aciertos y fallos de L1 y L2 y el tamaño de L1
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        l1_total = stats["l1_hits"] + stats["l1_misses"]
+        l2_total = stats["l2_hits"] + stats["l2_misses"]
+
+        return {
+            **stats,
+            "l1_hit_ratio": round(stats["l1_hits"] / l1_total, 4) if l1_total else 0.0,
+            "l2_hit_ratio": round(stats["l2_hits"] / l2_total, 4) if l2_total else 0.0,
+            "l1_size": len(self.local),
+            "updated_at": datetime.utcnow().isoformat()
+        }
+
+    def close(self):
+        """Detiene el hilo de invalidación"""
+        if self._subscriber:
+            self._subscriber.stop()
+            self._subscriber = None
+
+    @classmethod
+    def read_stats(cls, client) -> dict:
+        """
+        Lee los contadores publicados por cada proceso.
+
+        Args:
+            client: Cliente Redis
+
+        Returns:
+            Dict proceso -> contadores
+        """
+        stats = {}
+        for key in client.scan_iter(match=f"{cls.STATS_PREFIX}:*", count=100):
+            value = client.get(key)
+            if value:
+                stats[key[len(cls.STATS_PREFIX) + 1:]] = json.loads(value)
+        return stats
+
+    def _count(self, counter: str):
+        """Incrementa un contador y publica los contadores cada `stats_interval` segundos"""
+        with self._stats_lock:
+            self.stats[counter] += 1
+            now = time.monotonic()
+            if now - self._stats_published_at < self.stats_interval:
+                return
+            self._stats_published_at = now
+
+        try:
+            self.client.setex(f"{self.STATS_PREFIX}:{self.instance_id}",
+                              int(self.stats_interval * 3), json.dumps(self.get_stats()))
+        except Exception as e:
+            logger.error(f"Error publicando estadísticas del caché: {e}")
+
+    def _publish_invalidation(self, key: str):
+        """Avisa a los demás procesos que descarten su copia de `key`"""
+        try:
+            self.client.publish(self.channel, json.dumps({"key": key, "origin": self.instance_id}))
+        except Exception as e:
+            logger.error(f"Error publicando invalidación de caché: {e}")
+
+    def _handle_invalidation(self, message: dict):
+        """Descarta la copia local de la clave invalidada por otro proceso"""
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+
+        if data.get("origin") == self.instance_id:
+            return
+
+        if data.get("key") == "*":
+            self.local.clear()
+        else:
+            self.local.delete(data.get("key"))
+
+    def _subscribe(self):
+        """Escucha el canal de invalidación en un hilo daemon"""
+        try:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._handle_invalidation})
+            self._subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            # Sin invalidación las copias de L1 viven como máximo max_ttl segundos
+            logger.error(f"No se pudo suscribir al canal de invalidación de caché: {e}")
@@ -7,6 +7,13 @@ from pymongo.database import Database
 from pymongo import ASCENDING, DESCENDING
 
 
+# Valores permitidos para el análisis de la IA
+SENTIMIENTOS = ["positivo", "negativo", "neutro"]
+TEMAS = ["Servicio al Cliente", "Calidad del Producto", "Precio", "Limpieza", "Ambiente", "Otros"]
+
+# Nivel que produjo cada análisis
+ORIGENES_ANALISIS = ["gemini", "cache", "cache_similar", "lexico", "respaldo"]
+
 MENSAJES_SCHEMA = {
     "$jsonSchema": {
         "bsonType": "object",
@@ -30,12 +37,12 @@ MENSAJES_SCHEMA = {
             },
             "sentimiento": {
                 "bsonType": ["string", "null"],
-                "enum": ["positivo", "negativo", "neutro", None],
+                "enum": SENTIMIENTOS + [None],
                 "description": "Sentimiento detectado por la IA tras el análisis"
             },
             "tema": {
                 "bsonType": ["string", "null"],
-                "enum": ["Servicio al Cliente", "Calidad del Producto", "Precio", "Limpieza", "Ambiente", "Otros", None],
+                "enum": TEMAS + [None],
                 "description": "Tema o categoría principal identificada en el mensaje"
             },
             "resumen": {
@@ -45,6 +52,11 @@ MENSAJES_SCHEMA = {
             "analizado_en": {
                 "bsonType": ["date", "null"],
                 "description": "Fecha y hora en que el mensaje fue analizado por la IA"
+            },
+            "origen_analisis": {
+                "bsonType": ["string", "null"],
+                "enum": ORIGENES_ANALISIS + [None],
+                "description": "Nivel que produjo el análisis (Gemini, caché, léxico local o respaldo)"
             }
         }
     }
@@ -88,6 +100,67 @@ MENSAJES_INDEXES = [
     },
 ]
 
+ANALYSIS_CACHE_INDEXES = [
+    # Índice para el warm-up (análisis más usados)
+    {
+        "keys": [("hits", DESCENDING), ("ultimo_uso", DESCENDING)],
+        "options": {"name": "hits_ultimo_uso_desc"}
+    },
+]
+
+
+ROLLUP_INDEXES = [
+    # Un documento por bucket: las escrituras hacen upsert con $inc sobre esta clave
+    {
+        "keys": [("granularidad", ASCENDING), ("inicio", ASCENDING), ("tema", ASCENDING), ("sentimiento", ASCENDING)],
+        "options": {"name": "granularidad_inicio_tema_sentimiento_unique", "unique": True}
+    },
+]
+
+# Granularidades de los rollups
+GRANULARIDADES = ["hora", "dia"]
+
+
+def create_rollup_indexes(db: Database, collection_name: str = "mensajes_rollup"):
+    """
+    Crea los índices de la colección de rollups.
+
+    Args:
+        db: Instancia de la base de datos MongoDB
+        collection_name: Nombre de la colección (default: "mensajes_rollup")
+    """
+    collection = db[collection_name]
+
+    for index_config in ROLLUP_INDEXES:
+        try:
+            collection.create_index(
+                index_config["keys"],
+                **index_config.get("options", {})
+            )
+        except Exception as e:
+            print(f"    Error creando índice en '{collection_name}': {str(e)}")
+
+
+def create_analysis_cache_indexes(db: Database, collection_name: str = "analysis_cache"):
+    """
+    Crea los índices del caché durable de análisis.
+
+    Args:
+        db: Instancia de la base de datos MongoDB
+        collection_name: Nombre de la colección (default: "analysis_cache")
+    """
+    collection = db[collection_name]
+
+    for index_config in ANALYSIS_CACHE_INDEXES:
+        try:
+            collection.create_index(
+                index_config["keys"],
+                **index_config.get("options", {})
+            )
+        except Exception as e:
+            print(f"    Error creando índice en '{collection_name}': {str(e)}")
+
+
 def create_collections_and_indexes(db: Database, collection_name: str = "mensajes"):
     """
     Crea la colección con validación de esquema e índices.
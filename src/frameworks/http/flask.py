@@ -79,10 +79,14 @@ def create_flask_app(blueprints: list):
             "version": "1.0.0",
             "endpoints": {
                 "health": "/health",
+                "health_gemini": "/api/health/gemini",
+                "health_cache": "/api/health/cache",
                 "webhook": "/webhook/whatsapp",
+                "dashboard": "/api/dashboard",
                 "estadisticas": "/api/estadisticas",
                 "distribucion": "/api/sentimientos",
                 "temas": "/api/temas",
+                "tendencias": "/api/tendencias",
                 "mensajes": "/api/mensajes-recientes",
                 "sentimientos_tema": "/api/sentimientos-por-tema"
             }
@@ -0,0 +1,19 @@
+"""
+Selección del backend de la cola de mensajes.
+"""
+
+from src.config.settings import settings
+from src.frameworks.queue.message_queue import MessageQueue
+from src.frameworks.queue.stream_queue import StreamMessageQueue
+
+
+def create_message_queue():
+    """
+    Crea la cola de mensajes según QUEUE_BACKEND.
+
+    Returns:
+        StreamMessageQueue si QUEUE_BACKEND es "stream", MessageQueue en otro caso
+    """
+    if settings.QUEUE_BACKEND == "stream":
+        return StreamMessageQueue()
+    return MessageQueue()
@@ -2,14 +2,90 @@
 Servicio de cola de mensajes con Redis.
 """
 
-import json
+import os
+import socket
+import threading
+import time
 import redis
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
+from src.frameworks.serialization.codec import encode, decode
 
 logger = setup_logger(__name__)
 
+# Devuelve a la cola las entradas con lease vencido de una lista de procesamiento.
+# Las entradas sin lease (el worker murió entre BLMOVE y ZADD) reciben uno nuevo.
+# Si la lista y los leases quedan vacíos, el worker sale del registro.
+# KEYS: procesamiento, leases, cola, registro de workers.
+# ARGV: ahora, vencimiento de los leases nuevos, id del worker.
+REAP_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, -1)
+for _, raw in ipairs(items) do
+    if not redis.call('ZSCORE', KEYS[2], raw) then
+        redis.call('ZADD', KEYS[2], ARGV[2], raw)
+    end
+end
+
+local requeued = 0
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, raw in ipairs(expired) do
+    if redis.call('LREM', KEYS[1], 1, raw) > 0 then
+        redis.call('RPUSH', KEYS[3], raw)
+        requeued = requeued + 1
+    end
+    redis.call('ZREM', KEYS[2], raw)
+end
+
+if redis.call('LLEN', KEYS[1]) == 0 and redis.call('ZCARD', KEYS[2]) == 0 then
+    redis.call('SREM', KEYS[4], ARGV[3])
+end
+return requeued
+"""
+
+# Mueve a la cola los reintentos vencidos de un sorted set en un solo paso.
+# Los reintentos se guardan en JSON, que decode() lee con cualquier CODEC_FORMAT.
+# KEYS: reintentos, cola, contador de encolados. ARGV: ahora, máximo a mover.
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    redis.call('LPUSH', KEYS[2], raw)
+end
+if #due > 0 then
+    redis.call('INCRBY', KEYS[3], #due)
+end
+return #due
+"""
+
+# Mueve a la cola hasta ARGV[1] mensajes de la DLQ (los más antiguos primero)
+# sin los campos del intento fallido. Si una entrada no es JSON válido vuelve a su
+# lugar y se detiene (los scripts no se deshacen si fallan a mitad de camino).
+# KEYS: DLQ, cola, contador de encolados. ARGV: máximo a mover.
+REPLAY_SCRIPT = """
+local moved = 0
+while moved < tonumber(ARGV[1]) do
+    local raw = redis.call('RPOP', KEYS[1])
+    if not raw then
+        break
+    end
+    local ok, data = pcall(cjson.decode, raw)
+    if not ok or type(data) ~= 'table' then
+        redis.call('RPUSH', KEYS[1], raw)
+        break
+    end
+    data['intentos'] = nil
+    data['ultimo_error'] = nil
+    data['fallido_en'] = nil
+    redis.call('LPUSH', KEYS[2], cjson.encode(data))
+    moved = moved + 1
+end
+if moved > 0 then
+    redis.call('INCRBY', KEYS[3], moved)
+end
+return moved
+"""
+
 
 class MessageQueue:
     """Servicio para encolar y procesar mensajes de forma asíncrona"""
@@ -21,7 +97,32 @@ class MessageQueue:
             password=settings.REDIS_PASSWORD,
             decode_responses=True
         )
+        # Los payloads de la cola se guardan con el codec (binario si CODEC_FORMAT=msgpack)
+        self.binary_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD
+        )
         self.queue_name = "message_queue"
+        self.enqueued_counter_name = f"{self.queue_name}:stats:enqueued"
+
+        # Modo at-least-once: cada worker mueve los mensajes a su propia
+        # lista de procesamiento y los elimina al confirmar con ack()
+        self.reliable = settings.QUEUE_RELIABLE
+        self.visibility_timeout = settings.QUEUE_VISIBILITY_TIMEOUT
+        self.worker_id = settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+        self.processing_name = f"{self.queue_name}:processing:{self.worker_id}"
+        self.leases_name = f"{self.queue_name}:leases:{self.worker_id}"
+        # Workers con lista de procesamiento: el reaper y las métricas recorren
+        # este set en lugar de hacer SCAN sobre todo el keyspace
+        self.workers_name = f"{self.queue_name}:workers"
+        self._registered = False
+        self._adopted_unregistered = False
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._reap_script = self.binary_client.register_script(REAP_SCRIPT)
+        self._promote_script = self.binary_client.register_script(PROMOTE_SCRIPT)
+        self._replay_script = self.binary_client.register_script(REPLAY_SCRIPT)
 
     def enqueue(self, texto_mensaje: str, numero_remitente: str, message_id: str) -> bool:
         """
@@ -32,42 +133,94 @@ class MessageQueue:
             numero_remitente: Número del remitente
             message_id: ID del mensaje en MongoDB
 
+        Returns:
+            True si se encoló exitosamente
+        """
+        message_data = {
+            "texto_mensaje": texto_mensaje,
+            "numero_remitente": numero_remitente,
+            "message_id": message_id
+        }
+
+        return self.requeue(message_data)
+
+    def requeue(self, message_data: Dict) -> bool:
+        """
+        Encola un mensaje ya armado conservando todos sus campos
+        (por ejemplo, el número de intentos de un reintento).
+
+        Args:
+            message_data: Diccionario con los datos del mensaje
+
         Returns:
             True si se encoló exitosamente
         """
         try:
-            message_data = {
-                "texto_mensaje": texto_mensaje,
-                "numero_remitente": numero_remitente,
-                "message_id": message_id
-            }
-
-            # Agregar a la cola (LPUSH = añadir al inicio)
-            self.client.lpush(self.queue_name, json.dumps(message_data))
+            # Agregar a la cola (LPUSH = añadir al inicio) y contar el encolado
+            pipe = self.binary_client.pipeline()
+            pipe.lpush(self.queue_name, encode(message_data))
+            pipe.incr(self.enqueued_counter_name)
+            pipe.execute()
             return True
 
         except Exception as e:
             logger.error(f"Error al encolar mensaje: {e}")
             return False
 
-    def dequeue(self, timeout: int = 0) -> Optional[Dict]:
+    def promote_retries(self, retry_name: str, now: float, limit: int) -> int:
+        """
+        Mueve a la cola, en un script atómico, los reintentos cuya hora ya llegó.
+
+        Args:
+            retry_name: Sorted set de reintentos (score = momento del intento)
+            now: Timestamp actual
+            limit: Máximo de mensajes a mover
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        return self._promote_script(
+            keys=[retry_name, self.queue_name, self.enqueued_counter_name],
+            args=[now, limit]
+        )
+
+    def replay_dead_letters(self, dead_letter_name: str, limit: int) -> int:
+        """
+        Mueve a la cola, en un script atómico, mensajes de la DLQ con el
+        contador de intentos reiniciado.
+
+        Args:
+            dead_letter_name: Lista de la DLQ
+            limit: Máximo de mensajes a mover
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        return self._replay_script(
+            keys=[dead_letter_name, self.queue_name, self.enqueued_counter_name],
+            args=[limit]
+        )
+
+    def dequeue(self, timeout: float = 0) -> Optional[Dict]:
         """
         Saca un mensaje de la cola (bloqueante).
 
         Args:
-            timeout: Segundos a esperar (0 = esperar indefinidamente)
+            timeout: Segundos a esperar, admite fracciones (0 = esperar indefinidamente)
 
         Returns:
             Diccionario con datos del mensaje o None
         """
         try:
+            if self.reliable:
+                return self._dequeue_reliable(timeout)
+
             # BRPOP = bloquear hasta que haya un elemento (desde el final)
-            result = self.client.brpop(self.queue_name, timeout=timeout)
+            result = self.binary_client.brpop(self.queue_name, timeout=timeout)
 
             if result:
-                queue_name, message_json = result
-                message_data = json.loads(message_json)
-                return message_data
+                queue_name, message_raw = result
+                return decode(message_raw)
 
             return None
 
@@ -75,6 +228,194 @@ class MessageQueue:
             logger.error(f"Error al sacar mensaje de cola: {e}")
             return None
 
+    def dequeue_many(self, max_items: int, timeout: float = 0) -> List[Dict]:
+        """
+        Saca hasta `max_items` mensajes de la cola en un solo round trip.
+        Bloquea solo hasta que haya al menos un mensaje.
+
+        Args:
+            max_items: Número máximo de mensajes a sacar
+            timeout: Segundos a esperar, admite fracciones (0 = esperar indefinidamente)
+
+        Returns:
+            Lista de diccionarios con datos de los mensajes (vacía si no hubo ninguno)
+        """
+        try:
+            if self.reliable:
+                return self._dequeue_many_reliable(max_items, timeout)
+
+            # BLMPOP = BRPOP de varios elementos a la vez (Redis 7+)
+            result = self.binary_client.blmpop(timeout, 1, self.queue_name, direction="RIGHT", count=max_items)
+
+            if not result:
+                return []
+
+            _, messages_raw = result
+            return [decode(message_raw) for message_raw in messages_raw]
+
+        except Exception as e:
+            logger.error(f"Error al sacar mensajes de cola: {e}")
+            return []
+
+    def _dequeue_many_reliable(self, max_items: int, timeout: float) -> List[Dict]:
+        """
+        Versión confiable de dequeue_many: bloquea con BLMOVE por el primer
+        mensaje y mueve el resto con LMOVE en un pipeline.
+
+        Args:
+            max_items: Número máximo de mensajes a sacar
+            timeout: Segundos a esperar (0 = esperar indefinidamente)
+
+        Returns:
+            Lista de diccionarios con datos de los mensajes
+        """
+        self._register()
+        first = self.binary_client.blmove(
+            self.queue_name, self.processing_name, timeout, src="RIGHT", dest="LEFT"
+        )
+        if not first:
+            return []
+
+        messages_raw = [first]
+        if max_items > 1:
+            pipe = self.binary_client.pipeline(transaction=False)
+            for _ in range(max_items - 1):
+                pipe.lmove(self.queue_name, self.processing_name, src="RIGHT", dest="LEFT")
+            messages_raw.extend(m for m in pipe.execute() if m)
+
+        deadline = time.time() + self.visibility_timeout
+        pipe = self.binary_client.pipeline(transaction=False)
+        pipe.zadd(self.leases_name, {message_raw: deadline for message_raw in messages_raw})
+        # El reaper pudo sacar al worker del registro mientras su lista estaba vacía
+        pipe.sadd(self.workers_name, self.worker_id)
+        pipe.execute()
+
+        messages = []
+        with self._in_flight_lock:
+            for message_raw in messages_raw:
+                message_data = decode(message_raw)
+                self._in_flight[message_data.get("message_id")] = message_raw
+                messages.append(message_data)
+
+        return messages
+
+    def _dequeue_reliable(self, timeout: float) -> Optional[Dict]:
+        """
+        Mueve atómicamente un mensaje a la lista de procesamiento del worker
+        y le asigna un lease de QUEUE_VISIBILITY_TIMEOUT segundos.
+
+        Args:
+            timeout: Segundos a esperar (0 = esperar indefinidamente)
+
+        Returns:
+            Diccionario con datos del mensaje o None
+        """
+        self._register()
+        # BLMOVE = igual que BRPOP pero deja una copia en la lista de procesamiento
+        message_raw = self.binary_client.blmove(
+            self.queue_name, self.processing_name, timeout, src="RIGHT", dest="LEFT"
+        )
+        if not message_raw:
+            return None
+
+        pipe = self.binary_client.pipeline(transaction=False)
+        pipe.zadd(self.leases_name, {message_raw: time.time() + self.visibility_timeout})
+        # El reaper pudo sacar al worker del registro mientras su lista estaba vacía
+        pipe.sadd(self.workers_name, self.worker_id)
+        pipe.execute()
+        message_data = decode(message_raw)
+
+        with self._in_flight_lock:
+            self._in_flight[message_data.get("message_id")] = message_raw
+
+        return message_data
+
+    def _register(self):
+        """Anota al worker en el registro antes de su primer BLMOVE"""
+        if not self._registered:
+            self.client.sadd(self.workers_name, self.worker_id)
+            self._registered = True
+
+    def _adopt_unregistered(self):
+        """
+        Registra una sola vez por proceso las listas de procesamiento creadas
+        antes de que existiera el registro (un SCAN al arrancar, no en cada pasada).
+        """
+        if self._adopted_unregistered:
+            return
+
+        prefix = f"{self.queue_name}:processing:"
+        worker_ids = [name[len(prefix):] for name in self.client.scan_iter(match=f"{prefix}*", count=1000)]
+        if worker_ids:
+            self.client.sadd(self.workers_name, *worker_ids)
+        self._adopted_unregistered = True
+
+    def ack(self, message_data: Dict) -> bool:
+        """
+        Confirma que un mensaje fue procesado y lo elimina de la lista de procesamiento.
+        Sin QUEUE_RELIABLE no hace nada (BRPOP ya lo sacó de la cola).
+
+        Args:
+            message_data: Mensaje devuelto por dequeue()
+
+        Returns:
+            True si se confirmó exitosamente
+        """
+        if not self.reliable:
+            return True
+
+        with self._in_flight_lock:
+            message_raw = self._in_flight.pop(message_data.get("message_id"), None)
+
+        if message_raw is None:
+            logger.warning(f"ack de mensaje desconocido: {message_data.get('message_id')}")
+            return False
+
+        try:
+            pipe = self.binary_client.pipeline()
+            pipe.lrem(self.processing_name, 1, message_raw)
+            pipe.zrem(self.leases_name, message_raw)
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error al confirmar mensaje: {e}")
+            return False
+
+    def reap_expired(self) -> int:
+        """
+        Devuelve a la cola los mensajes cuyo lease venció en las listas de
+        procesamiento de cualquier worker (caídos o redeployados).
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        if not self.reliable:
+            return 0
+
+        requeued = 0
+        try:
+            self._adopt_unregistered()
+            now = time.time()
+            for worker_id in self.client.smembers(self.workers_name):
+                requeued += self._reap_script(
+                    keys=[
+                        f"{self.queue_name}:processing:{worker_id}",
+                        f"{self.queue_name}:leases:{worker_id}",
+                        self.queue_name,
+                        self.workers_name
+                    ],
+                    args=[now, now + self.visibility_timeout, worker_id]
+                )
+
+            if requeued:
+                logger.warning(f"{requeued} mensajes con lease vencido reencolados")
+
+        except Exception as e:
+            logger.error(f"Error al reencolar mensajes vencidos: {e}")
+
+        return requeued
+
     def get_queue_size(self) -> int:
         """
         Obtiene el número de mensajes en la cola.
@@ -88,6 +429,44 @@ class MessageQueue:
             logger.error(f"Error al obtener tamaño de cola: {e}")
             return 0
 
+    def get_enqueued_count(self) -> int:
+        """
+        Obtiene el total histórico de mensajes encolados (incluye reintentos).
+
+        Returns:
+            Número de mensajes encolados desde que existe el contador
+        """
+        try:
+            return int(self.client.get(self.enqueued_counter_name) or 0)
+        except Exception as e:
+            logger.error(f"Error al obtener contador de encolados: {e}")
+            return 0
+
+    def get_metrics(self) -> dict:
+        """
+        Obtiene métricas de la cola.
+
+        Returns:
+            Dict con el backend y, en modo confiable, los mensajes en procesamiento
+        """
+        metrics = {"backend": "list", "reliable": self.reliable}
+
+        if not self.reliable:
+            return metrics
+
+        try:
+            worker_ids = sorted(self.client.smembers(self.workers_name))
+            pipe = self.client.pipeline(transaction=False)
+            for worker_id in worker_ids:
+                pipe.llen(f"{self.queue_name}:processing:{worker_id}")
+            processing = dict(zip(worker_ids, pipe.execute()))
+            metrics["in_processing"] = sum(processing.values())
+            metrics["workers"] = processing
+        except Exception as e:
+            logger.error(f"Error al obtener métricas de cola: {e}")
+
+        return metrics
+
     def clear_queue(self):
         """Limpia toda la cola (útil para testing)"""
         try:
@@ -0,0 +1,159 @@
+"""
+Reintentos diferidos con backoff exponencial y dead letter queue.
+"""
+
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, List
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Mensajes de la DLQ que se mueven por script (acota cuánto bloquea Redis cada llamada)
+REPLAY_BATCH_SIZE = 100
+
+
+class RetryScheduler:
+    """
+    Programa reintentos de mensajes fallidos en un sorted set de Redis
+    (score = momento del siguiente intento) y mueve a una dead letter queue
+    los que agotan RETRY_MAX_ATTEMPTS intentos.
+
+    Funciona con cualquier backend de cola que implemente requeue(),
+    promote_retries() y replay_dead_letters() (movimientos en un script atómico).
+    """
+
+    def __init__(self, message_queue):
+        self.message_queue = message_queue
+        self.client = message_queue.client
+        self.retry_name = f"{message_queue.queue_name}:retry"
+        self.dead_letter_name = f"{message_queue.queue_name}:dead"
+        self.max_attempts = settings.RETRY_MAX_ATTEMPTS
+        self.base_delay = settings.RETRY_BASE_DELAY
+        self.max_delay = settings.RETRY_MAX_DELAY
+
+    def schedule_retry(self, message_data: Dict, error: Exception) -> bool:
+        """
+        Programa el siguiente intento de un mensaje o lo manda a la DLQ.
+
+        Args:
+            message_data: Mensaje que falló
+            error: Excepción que causó el fallo
+
+        Returns:
+            True si se programó un reintento, False si se envió a la DLQ
+        """
+        attempts = message_data.get("intentos", 0) + 1
+        payload = {**message_data, "intentos": attempts, "ultimo_error": str(error)[:500]}
+
+        if attempts >= self.max_attempts:
+            payload["fallido_en"] = datetime.utcnow().isoformat()
+            self.client.lpush(self.dead_letter_name, json.dumps(payload))
+            logger.error(f"Mensaje {message_data.get('message_id')} enviado a la DLQ tras {attempts} intentos")
+            return False
+
+        delay = self.compute_delay(attempts)
+        self.client.zadd(self.retry_name, {json.dumps(payload): time.time() + delay})
+        logger.warning(f"Reintento {attempts}/{self.max_attempts - 1} de {message_data.get('message_id')} "
+                       f"programado en {delay:.1f}s")
+        return True
+
+    def defer(self, message_data: Dict, delay: float):
+        """
+        Posterga un mensaje sin contarlo como intento fallido (por ejemplo,
+        mientras el circuito de Gemini está abierto).
+
+        Args:
+            message_data: Mensaje a postergar
+            delay: Segundos de espera aproximados
+        """
+        # Jitter para que los mensajes postergados no vuelvan todos juntos
+        run_at = time.time() + delay + random.uniform(0, delay / 2)
+        self.client.zadd(self.retry_name, {json.dumps(message_data): run_at})
+
+    def compute_delay(self, attempts: int) -> float:
+        """
+        Calcula la espera antes del siguiente intento (backoff exponencial con jitter).
+
+        La mitad de la espera es fija y la otra mitad aleatoria, así los
+        mensajes que fallaron juntos (por ejemplo, en una ráfaga de 429) no
+        vuelven a Gemini al mismo tiempo.
+
+        Args:
+            attempts: Número de intentos fallidos hasta ahora
+
+        Returns:
+            Segundos de espera
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def promote_due(self, limit: int = 100) -> int:
+        """
+        Devuelve a la cola los reintentos cuya hora ya llegó. Sacarlos del
+        sorted set y encolarlos es un solo script, así un proceso que muere a
+        mitad de camino no pierde mensajes.
+
+        Args:
+            limit: Máximo de mensajes a mover en esta llamada
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        promoted = self.message_queue.promote_retries(self.retry_name, time.time(), limit)
+
+        if promoted:
+            logger.info(f"{promoted} reintentos devueltos a la cola")
+
+        return promoted
+
+    def get_retry_count(self) -> int:
+        """Número de mensajes esperando reintento"""
+        return self.client.zcard(self.retry_name)
+
+    def get_dead_letter_count(self) -> int:
+        """Número de mensajes en la DLQ"""
+        return self.client.llen(self.dead_letter_name)
+
+    def get_dead_letters(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """
+        Obtiene mensajes de la DLQ, del más reciente al más antiguo.
+
+        Args:
+            limit: Número máximo de mensajes
+            offset: Posición inicial
+
+        Returns:
+            Lista de mensajes fallidos con su último error
+        """
+        items = self.client.lrange(self.dead_letter_name, offset, offset + limit - 1)
+        return [json.loads(item) for item in items]
+
+    def replay_dead_letters(self, limit: int = None) -> int:
+        """
+        Reencola mensajes de la DLQ (los más antiguos primero) con el contador
+        de intentos reiniciado. Cada tanda sale de la DLQ y entra a la cola en
+        un solo script, así no se pierden mensajes si el proceso muere.
+
+        Args:
+            limit: Máximo de mensajes a reencolar (None = todos)
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        replayed = 0
+
+        while limit is None or replayed < limit:
+            batch = REPLAY_BATCH_SIZE if limit is None else min(REPLAY_BATCH_SIZE, limit - replayed)
+            moved = self.message_queue.replay_dead_letters(self.dead_letter_name, batch)
+            replayed += moved
+            if moved < batch:
+                break
+
+        if replayed:
+            logger.warning(f"{replayed} mensajes reencolados desde la DLQ")
+
+        return replayed
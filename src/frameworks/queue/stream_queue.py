@@ -0,0 +1,379 @@
+"""
+Servicio de cola de mensajes con Redis Streams y consumer groups.
+"""
+
+import os
+import socket
+import threading
+import redis
+from typing import Optional, Dict, List
+from src.config.settings import settings
+from src.frameworks.logging.logger import setup_logger
+from src.frameworks.serialization.codec import encode, decode
+
+logger = setup_logger(__name__)
+
+# Mueve al stream los reintentos vencidos de un sorted set en un solo paso.
+# Los reintentos se guardan en JSON, que decode() lee con cualquier CODEC_FORMAT.
+# KEYS: reintentos, stream, contador de encolados. ARGV: ahora, máximo a mover.
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[1], raw)
+    redis.call('XADD', KEYS[2], '*', 'data', raw)
+end
+if #due > 0 then
+    redis.call('INCRBY', KEYS[3], #due)
+end
+return #due
+"""
+
+# Mueve al stream hasta ARGV[1] mensajes de la DLQ (los más antiguos primero)
+# sin los campos del intento fallido. Si una entrada no es JSON válido vuelve a su
+# lugar y se detiene (los scripts no se deshacen si fallan a mitad de camino).
+# KEYS: DLQ, stream, contador de encolados. ARGV: máximo a mover.
+REPLAY_SCRIPT = """
+local moved = 0
+while moved < tonumber(ARGV[1]) do
+    local raw = redis.call('RPOP', KEYS[1])
+    if not raw then
+        break
+    end
+    local ok, data = pcall(cjson.decode, raw)
+    if not ok or type(data) ~= 'table' then
+        redis.call('RPUSH', KEYS[1], raw)
+        break
+    end
+    data['intentos'] = nil
+    data['ultimo_error'] = nil
+    data['fallido_en'] = nil
+    redis.call('XADD', KEYS[2], '*', 'data', cjson.encode(data))
+    moved = moved + 1
+end
+if moved > 0 then
+    redis.call('INCRBY', KEYS[3], moved)
+end
+return moved
+"""
+
+
+class StreamMessageQueue:
+    """
+    Cola de mensajes sobre un Redis Stream con la misma interfaz que MessageQueue.
+
+    Cada worker es un consumidor del grupo QUEUE_STREAM_GROUP: los mensajes
+    leídos quedan pendientes para ese consumidor hasta que se confirman con
+    ack(), y reap_expired() reencola con XAUTOCLAIM los que llevan más de
+    QUEUE_VISIBILITY_TIMEOUT segundos sin confirmar.
+    """
+
+    def __init__(self):
+        self.client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True
+        )
+        # El campo data de cada entrada se guarda con el codec (binario si CODEC_FORMAT=msgpack)
+        self.binary_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD
+        )
+        self.queue_name = settings.QUEUE_STREAM_NAME
+        self.group_name = settings.QUEUE_STREAM_GROUP
+        self.enqueued_counter_name = f"{self.queue_name}:stats:enqueued"
+        self.consumer_name = settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_timeout = settings.QUEUE_VISIBILITY_TIMEOUT
+
+        # Los streams siempre confirman con ack
+        self.reliable = True
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._promote_script = self.binary_client.register_script(PROMOTE_SCRIPT)
+        self._replay_script = self.binary_client.register_script(REPLAY_SCRIPT)
+
+        self._ensure_group()
+
+    def _ensure_group(self):
+        """Crea el stream y el consumer group si todavía no existen"""
+        try:
+            self.client.xgroup_create(self.queue_name, self.group_name, id="0", mkstream=True)
+            logger.info(f"Consumer group '{self.group_name}' creado en '{self.queue_name}'")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def enqueue(self, texto_mensaje: str, numero_remitente: str, message_id: str) -> bool:
+        """
+        Encola un mensaje para procesamiento asíncrono.
+
+        Args:
+            texto_mensaje: Texto del mensaje
+            numero_remitente: Número del remitente
+            message_id: ID del mensaje en MongoDB
+
+        Returns:
+            True si se encoló exitosamente
+        """
+        message_data = {
+            "texto_mensaje": texto_mensaje,
+            "numero_remitente": numero_remitente,
+            "message_id": message_id
+        }
+
+        return self.requeue(message_data)
+
+    def requeue(self, message_data: Dict) -> bool:
+        """
+        Encola un mensaje ya armado conservando todos sus campos
+        (por ejemplo, el número de intentos de un reintento).
+
+        Args:
+            message_data: Diccionario con los datos del mensaje
+
+        Returns:
+            True si se encoló exitosamente
+        """
+        try:
+            pipe = self.binary_client.pipeline()
+            pipe.xadd(self.queue_name, {"data": encode(message_data)})
+            pipe.incr(self.enqueued_counter_name)
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error al encolar mensaje: {e}")
+            return False
+
+    def promote_retries(self, retry_name: str, now: float, limit: int) -> int:
+        """
+        Mueve al stream, en un script atómico, los reintentos cuya hora ya llegó.
+
+        Args:
+            retry_name: Sorted set de reintentos (score = momento del intento)
+            now: Timestamp actual
+            limit: Máximo de mensajes a mover
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        return self._promote_script(
+            keys=[retry_name, self.queue_name, self.enqueued_counter_name],
+            args=[now, limit]
+        )
+
+    def replay_dead_letters(self, dead_letter_name: str, limit: int) -> int:
+        """
+        Mueve al stream, en un script atómico, mensajes de la DLQ con el
+        contador de intentos reiniciado.
+
+        Args:
+            dead_letter_name: Lista de la DLQ
+            limit: Máximo de mensajes a mover
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        return self._replay_script(
+            keys=[dead_letter_name, self.queue_name, self.enqueued_counter_name],
+            args=[limit]
+        )
+
+    def dequeue(self, timeout: float = 0) -> Optional[Dict]:
+        """
+        Lee un mensaje nuevo del stream para este consumidor (bloqueante).
+
+        Args:
+            timeout: Segundos a esperar, admite fracciones (0 = esperar indefinidamente)
+
+        Returns:
+            Diccionario con datos del mensaje o None
+        """
+        messages = self.dequeue_many(1, timeout)
+        return messages[0] if messages else None
+
+    def dequeue_many(self, max_items: int, timeout: float = 0) -> List[Dict]:
+        """
+        Lee hasta `max_items` mensajes nuevos del stream en un solo XREADGROUP.
+        Bloquea solo hasta que haya al menos un mensaje.
+
+        Args:
+            max_items: Número máximo de mensajes a leer
+            timeout: Segundos a esperar, admite fracciones (0 = esperar indefinidamente)
+
+        Returns:
+            Lista de diccionarios con datos de los mensajes (vacía si no hubo ninguno)
+        """
+        try:
+            # En XREADGROUP, BLOCK 0 espera indefinidamente
+            block_ms = max(1, int(timeout * 1000)) if timeout > 0 else 0
+
+            result = self.binary_client.xreadgroup(
+                self.group_name,
+                self.consumer_name,
+                {self.queue_name: ">"},
+                count=max_items,
+                block=block_ms
+            )
+
+            if not result:
+                return []
+
+            _, entries = result[0]
+            messages = []
+
+            with self._in_flight_lock:
+                for entry_id, fields in entries:
+                    message_data = decode(fields[b"data"])
+                    self._in_flight[message_data.get("message_id")] = entry_id
+                    messages.append(message_data)
+
+            return messages
+
+        except Exception as e:
+            logger.error(f"Error al sacar mensajes de cola: {e}")
+            return []
+
+    def ack(self, message_data: Dict) -> bool:
+        """
+        Confirma un mensaje procesado y lo elimina del stream.
+
+        Args:
+            message_data: Mensaje devuelto por dequeue()
+
+        Returns:
+            True si se confirmó exitosamente
+        """
+        with self._in_flight_lock:
+            entry_id = self._in_flight.pop(message_data.get("message_id"), None)
+
+        if entry_id is None:
+            logger.warning(f"ack de mensaje desconocido: {message_data.get('message_id')}")
+            return False
+
+        try:
+            pipe = self.binary_client.pipeline()
+            pipe.xack(self.queue_name, self.group_name, entry_id)
+            # Eliminar la entrada para que XLEN refleje solo lo no procesado
+            pipe.xdel(self.queue_name, entry_id)
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error al confirmar mensaje: {e}")
+            return False
+
+    def reap_expired(self) -> int:
+        """
+        Reencola los mensajes pendientes de cualquier consumidor que llevan más
+        de QUEUE_VISIBILITY_TIMEOUT segundos sin confirmarse.
+
+        Returns:
+            Número de mensajes reencolados
+        """
+        requeued = 0
+        start_id = "0-0"
+
+        try:
+            while True:
+                # Cliente binario: el campo data se copia tal cual, sea JSON o msgpack
+                response = self.binary_client.xautoclaim(
+                    self.queue_name,
+                    self.group_name,
+                    self.consumer_name,
+                    min_idle_time=self.visibility_timeout * 1000,
+                    start_id=start_id,
+                    count=100
+                )
+                # Redis 7 agrega un tercer elemento con los IDs eliminados
+                next_id, claimed = response[0], response[1]
+
+                for entry_id, fields in claimed:
+                    pipe = self.binary_client.pipeline()
+                    if fields and b"data" in fields:
+                        pipe.xadd(self.queue_name, {"data": fields[b"data"]})
+                        requeued += 1
+                    pipe.xack(self.queue_name, self.group_name, entry_id)
+                    pipe.xdel(self.queue_name, entry_id)
+                    pipe.execute()
+
+                if next_id == b"0-0":
+                    break
+                start_id = next_id
+
+            if requeued:
+                logger.warning(f"{requeued} mensajes con lease vencido reencolados")
+
+        except Exception as e:
+            logger.error(f"Error al reencolar mensajes vencidos: {e}")
+
+        return requeued
+
+    def get_queue_size(self) -> int:
+        """
+        Obtiene el número de mensajes en el stream (sin leer y pendientes de ack).
+
+        Returns:
+            Número de mensajes pendientes
+        """
+        try:
+            return self.client.xlen(self.queue_name)
+        except Exception as e:
+            logger.error(f"Error al obtener tamaño de cola: {e}")
+            return 0
+
+    def get_enqueued_count(self) -> int:
+        """
+        Obtiene el total histórico de mensajes encolados (incluye reintentos).
+
+        Returns:
+            Número de mensajes encolados desde que existe el contador
+        """
+        try:
+            return int(self.client.get(self.enqueued_counter_name) or 0)
+        except Exception as e:
+            logger.error(f"Error al obtener contador de encolados: {e}")
+            return 0
+
+    def get_metrics(self) -> dict:
+        """
+        Obtiene métricas del consumer group.
+
+        Returns:
+            Dict con lag del grupo, pendientes de ack y pendientes por consumidor
+        """
+        try:
+            group = next(
+                (g for g in self.client.xinfo_groups(self.queue_name) if g["name"] == self.group_name),
+                {}
+            )
+            consumers = self.client.xinfo_consumers(self.queue_name, self.group_name)
+
+            return {
+                "backend": "stream",
+                "group": self.group_name,
+                "lag": group.get("lag"),
+                "pending_ack": group.get("pending", 0),
+                "consumers": [
+                    {
+                        "name": consumer["name"],
+                        "pending": consumer["pending"],
+                        "idle_ms": consumer["idle"]
+                    }
+                    for consumer in consumers
+                ]
+            }
+
+        except Exception as e:
+            logger.error(f"Error al obtener métricas del stream: {e}")
+            return {"backend": "stream"}
+
+    def clear_queue(self):
+        """Limpia todo el stream (útil para testing)"""
+        try:
+            self.client.delete(self.queue_name)
+            self._ensure_group()
+            logger.warning("Cola de mensajes limpiada")
+        except Exception as e:
+            logger.error(f"Error al limpiar cola: {e}")
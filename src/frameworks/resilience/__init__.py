@@ -0,0 +1,3 @@
+"""
+Framework de resiliencia para llamadas a servicios externos.
+"""
@@ -0,0 +1,81 @@
+"""
+Límite de concurrencia adaptativo (AIMD) para llamadas a servicios externos.
+"""
+
+import threading
+import time
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limita las llamadas simultáneas dentro de un proceso y ajusta el límite
+    con AIMD: suma 1 por cada ventana completa de llamadas exitosas y lo
+    multiplica por `decrease_factor` ante un 429 o una latencia mayor a
+    `latency_threshold`. Las reducciones se aplican como máximo una vez por
+    `latency_threshold` segundos para que una ráfaga de errores cuente como
+    una sola señal.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int,
+                 latency_threshold: float, decrease_factor: float = 0.5):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_threshold = latency_threshold
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._last_decrease_at = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Límite actual de llamadas simultáneas"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Llamadas en curso"""
+        return self._in_flight
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Espera un slot libre.
+
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            True si se obtuvo el slot, False si venció el timeout
+        """
+        with self._condition:
+            acquired = self._condition.wait_for(lambda: self._in_flight < int(self._limit), timeout=timeout)
+            if acquired:
+                self._in_flight += 1
+            return acquired
+
+    def release(self, latency: float, overloaded: bool = False):
+        """
+        Libera el slot y ajusta el límite según el resultado de la llamada.
+
+        Args:
+            latency: Segundos que tardó la llamada
+            overloaded: True si el proveedor respondió con 429 o similar
+        """
+        with self._condition:
+            self._in_flight -= 1
+
+            if overloaded or latency > self.latency_threshold:
+                now = time.monotonic()
+                if now - self._last_decrease_at >= self.latency_threshold:
+                    previous = self.limit
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease_at = now
+                    logger.warning(f"Concurrencia reducida {previous} -> {self.limit} "
+                                   f"({'sobrecarga' if overloaded else f'latencia {latency:.1f}s'})")
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+            self._condition.notify_all()
@@ -0,0 +1,191 @@
+"""
+Circuit breaker para llamadas a servicios externos.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto y la llamada se rechazó sin intentarla"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con estados closed, open y half_open.
+
+    - closed: las llamadas pasan; `failure_threshold` fallos seguidos abren el
+      circuito. Una llamada más lenta que `latency_threshold` cuenta como fallo.
+    - open: las llamadas se rechazan con CircuitOpenError durante `reset_timeout`
+      segundos.
+    - half_open: se deja pasar una llamada de prueba; si sale bien el circuito
+      se cierra y si falla vuelve a abrirse.
+
+    Si se pasa `state_client`, el estado se publica en la clave de Redis
+    `circuit_breaker:<name>:<instance_id>` (una por proceso, con TTL de
+    `state_ttl` segundos) para exponerlo en el endpoint de health. Se publica
+    en cada transición y en cada heartbeat(), así que la clave de un proceso
+    que murió sin llamar a unpublish() expira sola.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, latency_threshold: float,
+                 reset_timeout: float, state_client=None, instance_id: str = None,
+                 state_ttl: int = 60):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.state_client = state_client
+        self.state_ttl = state_ttl
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._publish()
+
+    def allow_request(self) -> bool:
+        """
+        Indica si una llamada puede intentarse y reserva la prueba en half_open.
+
+        Returns:
+            True si la llamada puede hacerse
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+
+            return True
+
+    def release_trial(self):
+        """Libera la prueba de half_open reservada por una llamada que no llegó a hacerse"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self, latency: float):
+        """
+        Registra una llamada completada. Si fue demasiado lenta cuenta como fallo.
+
+        Args:
+            latency: Segundos que tardó la llamada
+        """
+        if latency > self.latency_threshold:
+            logger.warning(f"Llamada lenta a {self.name}: {latency:.1f}s")
+            self.record_failure()
+            return
+
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        """Registra una llamada fallida y abre el circuito si corresponde"""
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures += 1
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+                self.opened_at = time.monotonic()
+
+    def heartbeat(self):
+        """
+        Vuelve a publicar el estado para renovar el TTL. Si el circuito está
+        abierto y ya pasó `reset_timeout`, pasa a half_open aunque el proceso
+        no haya recibido llamadas, para no reportarlo abierto indefinidamente.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(self.HALF_OPEN)
+            else:
+                self._publish()
+
+    def get_state(self) -> dict:
+        """
+        Obtiene el estado actual del circuito en este proceso.
+
+        Returns:
+            Dict con estado, fallos consecutivos y umbrales
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "latency_threshold": self.latency_threshold,
+            "reset_timeout": self.reset_timeout,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+
+    def _transition(self, new_state: str):
+        """Cambia de estado (debe llamarse con el lock tomado)"""
+        logger.warning(f"Circuit breaker '{self.name}': {self.state} -> {new_state}")
+        self.state = new_state
+        self._publish()
+
+    def _publish(self):
+        """Publica el estado en Redis para el endpoint de health"""
+        if not self.state_client:
+            return
+
+        try:
+            self.state_client.setex(self._state_key(self.name, self.instance_id), self.state_ttl,
+                                    json.dumps(self.get_state()))
+        except Exception as e:
+            logger.error(f"Error publicando estado del circuit breaker: {e}")
+
+    def unpublish(self):
+        """Elimina el estado de este proceso de Redis (al detener el proceso)"""
+        if not self.state_client:
+            return
+
+        try:
+            self.state_client.delete(self._state_key(self.name, self.instance_id))
+        except Exception as e:
+            logger.error(f"Error eliminando estado del circuit breaker: {e}")
+
+    @staticmethod
+    def read_states(client, name: str) -> dict:
+        """
+        Lee el estado publicado por cada proceso vivo para un circuito.
+
+        Args:
+            client: Cliente Redis
+            name: Nombre del circuito
+
+        Returns:
+            Dict proceso -> estado
+        """
+        prefix = CircuitBreaker._state_key(name, "")
+        states = {}
+        for key in client.scan_iter(match=f"{prefix}*", count=100):
+            value = client.get(key)
+            if value:
+                states[key[len(prefix):]] = json.loads(value)
+        return states
+
+    @staticmethod
+    def _state_key(name: str, instance_id: str) -> str:
+        """Clave de Redis con el estado de un proceso"""
+        return f"circuit_breaker:{name}:{instance_id}"
@@ -0,0 +1,211 @@
+"""
+Rate limiter distribuido (token bucket) compartido entre procesos vía Redis.
+"""
+
+import asyncio
+import time
+from typing import List, Tuple
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Revisa todos los buckets y descuenta de todos solo si alcanzan.
+# KEYS: un hash por bucket. ARGV: por bucket (capacidad, tokens por ms, costo).
+# Retorna 0 si se adquirió o los milisegundos a esperar.
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local wait = 0
+local levels = {}
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = math.min(tonumber(ARGV[(i - 1) * 3 + 3]), capacity)
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) / rate))
+    end
+end
+
+if wait > 0 then
+    return wait
+end
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = math.min(tonumber(ARGV[(i - 1) * 3 + 3]), capacity)
+    redis.call('HSET', key, 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate) * 2)
+end
+
+return 0
+"""
+
+
+class RateLimitExceeded(Exception):
+    """No se obtuvo capacidad del rate limiter dentro del tiempo de espera"""
+
+
+class RedisRateLimiter:
+    """
+    Token bucket distribuido para requests por minuto y tokens por minuto.
+
+    Todos los procesos que usan el mismo `name` comparten los buckets, así
+    el límite se respeta aunque se escalen los workers. Si Redis no responde
+    se deja pasar la llamada (fail-open) para no detener el procesamiento.
+
+    Con un cliente de redis.asyncio se usan los métodos `*_async`, que esperan
+    con asyncio.sleep en lugar de bloquear un hilo.
+    """
+
+    def __init__(self, client, name: str, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.client = client
+        self.requests_key = f"ratelimit:{name}:rpm"
+        self.tokens_key = f"ratelimit:{name}:tpm"
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Intenta consumir una request y `tokens` tokens de los buckets.
+
+        Args:
+            tokens: Tokens estimados de la llamada
+
+        Returns:
+            0 si se adquirió, o los segundos a esperar antes de reintentar
+        """
+        keys, args = self._bucket_args(tokens)
+        if not keys:
+            return 0
+
+        try:
+            return self._script(keys=keys, args=args) / 1000
+        except Exception as e:
+            logger.error(f"Error en rate limiter, se permite la llamada: {e}")
+            return 0
+
+    async def try_acquire_async(self, tokens: int) -> float:
+        """Igual que try_acquire() pero con un cliente de redis.asyncio"""
+        keys, args = self._bucket_args(tokens)
+        if not keys:
+            return 0
+
+        try:
+            return await self._script(keys=keys, args=args) / 1000
+        except Exception as e:
+            logger.error(f"Error en rate limiter, se permite la llamada: {e}")
+            return 0
+
+    def acquire(self, tokens: int, timeout: float = None) -> bool:
+        """
+        Espera hasta obtener capacidad en los buckets.
+
+        Args:
+            tokens: Tokens estimados de la llamada
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            True si se adquirió, False si venció el timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int, timeout: float = None) -> bool:
+        """
+        Igual que acquire() pero con un cliente de redis.asyncio: la espera
+        entre intentos no ocupa ningún hilo.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = await self.try_acquire_async(tokens)
+            if wait == 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            await asyncio.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Corrige el bucket de tokens con el consumo real reportado por el modelo.
+
+        Args:
+            estimated_tokens: Tokens descontados al adquirir
+            actual_tokens: Tokens que realmente consumió la llamada
+        """
+        if self.tokens_per_minute <= 0 or not actual_tokens:
+            return
+
+        difference = actual_tokens - estimated_tokens
+        if difference == 0:
+            return
+
+        try:
+            # Un saldo negativo simplemente retrasa las siguientes llamadas
+            self.client.hincrbyfloat(self.tokens_key, "tokens", -difference)
+        except Exception as e:
+            logger.error(f"Error corrigiendo consumo de tokens: {e}")
+
+    async def record_usage_async(self, estimated_tokens: int, actual_tokens: int):
+        """Igual que record_usage() pero con un cliente de redis.asyncio"""
+        if self.tokens_per_minute <= 0 or not actual_tokens:
+            return
+
+        difference = actual_tokens - estimated_tokens
+        if difference == 0:
+            return
+
+        try:
+            await self.client.hincrbyfloat(self.tokens_key, "tokens", -difference)
+        except Exception as e:
+            logger.error(f"Error corrigiendo consumo de tokens: {e}")
+
+    def _bucket_args(self, tokens: int) -> Tuple[List[str], list]:
+        """
+        Arma las claves y argumentos del script para los buckets configurados.
+
+        Args:
+            tokens: Tokens estimados de la llamada
+
+        Returns:
+            Tupla (claves, argumentos); sin claves si no hay límites configurados
+        """
+        keys = []
+        args = []
+
+        if self.requests_per_minute > 0:
+            keys.append(self.requests_key)
+            args.extend([self.requests_per_minute, self.requests_per_minute / 60000, 1])
+
+        if self.tokens_per_minute > 0:
+            keys.append(self.tokens_key)
+            args.extend([self.tokens_per_minute, self.tokens_per_minute / 60000, tokens])
+
+        return keys, args
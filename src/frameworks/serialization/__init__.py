@@ -0,0 +1,3 @@
+"""
+Framework de serialización - Codec compacto para caché y cola.
+"""
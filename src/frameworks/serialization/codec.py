@@ -0,0 +1,124 @@
+"""
+Codec compacto para análisis cacheados y mensajes de la cola.
+
+Formato: un byte de versión seguido del contenido.
+- JSON heredado: empieza con "{" (las entradas guardadas antes del codec).
+- Versión 1: msgpack con claves cortas, sentimiento/tema/origen como índice
+  de los enums de MENSAJES_SCHEMA y, opcionalmente, textos largos
+  comprimidos con zstd (se guardan como binario de msgpack para
+  distinguirlos de los textos sin comprimir).
+
+Los enums solo pueden crecer agregando valores al final: el índice de
+cada valor se guarda en Redis.
+"""
+
+import json
+import msgpack
+from src.config.settings import settings
+from src.frameworks.db.collections import SENTIMIENTOS, TEMAS, ORIGENES_ANALISIS
+
+try:
+    import zstandard
+except ImportError:  # La compresión es opcional
+    zstandard = None
+
+VERSION_MSGPACK = 1
+_JSON_PREFIX = ord("{")
+
+# Nombre de campo -> clave corta
+FIELD_CODES = {
+    "sentimiento": "s",
+    "tema": "t",
+    "resumen": "r",
+    "origen": "o",
+    "texto_mensaje": "x",
+    "numero_remitente": "n",
+    "message_id": "m",
+    "intentos": "i",
+    "ultimo_error": "e",
+}
+FIELD_NAMES = {code: name for name, code in FIELD_CODES.items()}
+
+# Campos cuyo valor se guarda como índice del enum
+ENUM_FIELDS = {
+    "sentimiento": SENTIMIENTOS,
+    "tema": TEMAS,
+    "origen": ORIGENES_ANALISIS,
+}
+ENUM_INDEXES = {field: {value: i for i, value in enumerate(values)} for field, values in ENUM_FIELDS.items()}
+
+# Campos de texto libre que pueden comprimirse
+TEXT_FIELDS = {"resumen", "texto_mensaje", "ultimo_error"}
+
+_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def encode(data: dict) -> bytes:
+    """
+    Serializa un dict según CODEC_FORMAT.
+
+    Args:
+        data: Diccionario a serializar
+
+    Returns:
+        Bytes listos para guardar en Redis
+    """
+    if settings.CODEC_FORMAT != "msgpack":
+        return json.dumps(data).encode()
+
+    compress = settings.CODEC_COMPRESSION and _compressor is not None
+    packed = {}
+
+    for field, value in data.items():
+        if field in ENUM_INDEXES and value in ENUM_INDEXES[field]:
+            value = ENUM_INDEXES[field][value]
+        elif (compress and field in TEXT_FIELDS and isinstance(value, str)
+              and len(value) >= settings.CODEC_COMPRESSION_MIN_BYTES):
+            value = _compressor.compress(value.encode())
+        packed[FIELD_CODES.get(field, field)] = value
+
+    return bytes([VERSION_MSGPACK]) + msgpack.packb(packed, use_bin_type=True)
+
+
+def decode(raw) -> dict:
+    """
+    Deserializa un valor guardado con encode() o JSON heredado.
+
+    Args:
+        raw: Bytes o string leído de Redis
+
+    Returns:
+        Diccionario original
+
+    Raises:
+        ValueError: Si la versión no se reconoce
+    """
+    if isinstance(raw, str):
+        return json.loads(raw)
+
+    if not raw:
+        raise ValueError("Valor vacío")
+
+    version = raw[0]
+
+    if version == _JSON_PREFIX:
+        return json.loads(raw)
+
+    if version != VERSION_MSGPACK:
+        raise ValueError(f"Versión de codec desconocida: {version}")
+
+    data = {}
+    for code, value in msgpack.unpackb(raw[1:], raw=False).items():
+        field = FIELD_NAMES.get(code, code)
+
+        if field in ENUM_FIELDS and isinstance(value, int):
+            value = ENUM_FIELDS[field][value]
+        elif isinstance(value, bytes):
+            if _decompressor is None:
+                raise ValueError("Valor comprimido con zstd pero el paquete zstandard no está instalado")
+            value = _decompressor.decompress(value).decode()
+
+        data[field] = value
+
+    return data
@@ -3,6 +3,7 @@ Gestor de Socket.IO para comunicación en tiempo real.
 Maneja eventos de WebSocket para notificar al frontend sobre cambios.
 """
 
+from typing import List
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from src.frameworks.logging.logger import setup_logger
 
@@ -16,11 +17,17 @@ class SocketIOManager:
     Eventos emitidos:
     - 'message_received': Cuando llega un nuevo mensaje al webhook
     - 'message_analyzed': Cuando el worker termina de analizar un mensaje
+    - 'messages_analyzed': Cuando el worker guarda un lote de análisis
     - 'stats_updated': Cuando las estadísticas del dashboard cambian
+    - 'stats_delta': Solo los conteos que cambiaron, con la versión de los contadores
+    - 'stats_snapshot': Conteos completos con su versión (al unirse al dashboard
+      o cuando el cliente envía 'resync' porque detectó un salto de versión)
     """
 
     def __init__(self, socketio: SocketIO):
         self.socketio = socketio
+        # Función sin argumentos que devuelve los conteos con versión (o None)
+        self.stats_snapshot_provider = None
         self._register_handlers()
 
     def _register_handlers(self):
@@ -41,12 +48,32 @@ class SocketIOManager:
             """Cliente se une al room del dashboard para recibir actualizaciones"""
             join_room('dashboard')
             emit('joined', {'room': 'dashboard'})
+            self._emit_stats_snapshot()
 
         @self.socketio.on('leave_dashboard')
         def handle_leave_dashboard():
             """Cliente sale del room del dashboard"""
             leave_room('dashboard')
 
+        @self.socketio.on('resync')
+        def handle_resync():
+            """El cliente perdió algún stats_delta: se le envían los conteos completos"""
+            self._emit_stats_snapshot()
+
+    def _emit_stats_snapshot(self):
+        """Envía los conteos completos con su versión al cliente que hizo la petición"""
+        if not self.stats_snapshot_provider:
+            return
+
+        try:
+            snapshot = self.stats_snapshot_provider()
+        except Exception as e:
+            logger.error(f"Error obteniendo snapshot de estadísticas: {e}")
+            return
+
+        if snapshot:
+            emit('stats_snapshot', snapshot)
+
     def emit_message_received(self, message_data: dict):
         """
         Notifica que se recibió un nuevo mensaje (sin analizar aún).
@@ -84,6 +111,31 @@ class SocketIOManager:
             room='dashboard'
         )
 
+    def emit_messages_analyzed(self, analyses: list):
+        """
+        Notifica que se completó el análisis de un lote de mensajes.
+
+        Args:
+            analyses: Lista de dicts con message_id, sentimiento, tema, resumen
+        """
+        self.socketio.emit(
+            'messages_analyzed',
+            {
+                'messages': [
+                    {
+                        'message_id': analysis.get('message_id'),
+                        'sentimiento': analysis.get('sentimiento'),
+                        'tema': analysis.get('tema'),
+                        'resumen': analysis.get('resumen'),
+                        'status': 'analyzed'
+                    }
+                    for analysis in analyses
+                ],
+                'count': len(analyses)
+            },
+            room='dashboard'
+        )
+
     def emit_stats_updated(self, stats: dict):
         """
         Notifica que las estadísticas del dashboard fueron actualizadas.
@@ -97,6 +149,33 @@ class SocketIOManager:
             room='dashboard'
         )
 
+    def emit_stats_deltas(self, deltas: List[dict]):
+        """
+        Emite varios stats_delta en orden de versión. Los emite un solo
+        proceso a la vez (ver StatsBroadcaster), así llegan en orden.
+
+        Args:
+            deltas: Lista de deltas ordenada por versión
+        """
+        for delta in deltas:
+            self.emit_stats_delta(delta)
+
+    def emit_stats_delta(self, delta: dict):
+        """
+        Notifica solo los conteos que cambiaron. El cliente descarta los
+        deltas con versión menor o igual a la suya (ya incluidos en su
+        snapshot) y, si la versión salta más de uno, envía 'resync'.
+
+        Args:
+            delta: Dict con version y cambios (por ejemplo,
+                {"version": 8, "cambios": {"sentimientos": {"positivo": 1}}})
+        """
+        self.socketio.emit(
+            'stats_delta',
+            delta,
+            room='dashboard'
+        )
+
     def emit_error(self, error_data: dict):
         """
         Notifica un error al frontend.
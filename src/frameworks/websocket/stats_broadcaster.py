@@ -0,0 +1,103 @@
+"""
+Emisión agrupada de estadísticas del dashboard entre todos los procesos.
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Callable
+from src.frameworks.logging.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Intervalo de los workers con STATS_BROADCAST_INTERVAL_MS=0: solo emiten lo que
+# marcan otros procesos (el webhook), porque sus propios análisis se emiten al momento
+DEFERRED_INTERVAL_MS = 1000
+
+# Toma el turno de emisión si hay cambios pendientes y nadie emitió en el intervalo
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if not redis.call('SET', KEYS[2], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+
+class StatsBroadcaster:
+    """
+    Agrupa las actualizaciones de estadísticas del dashboard.
+
+    Cada escritura solo marca las estadísticas como sucias
+    (`<prefix>:dirty` en Redis). Los procesos que corren el hilo del
+    broadcaster revisan la marca cada medio intervalo. El primero que consigue el
+    turno (`<prefix>:turn`, SET NX con TTL de `interval_ms`) borra la marca,
+    calcula un snapshot y lo emite. Así sale como máximo un `stats_updated`
+    por intervalo en todo el cluster, sin importar cuántos mensajes se
+    analicen.
+
+    Los cambios que llegan mientras se calcula el snapshot vuelven a marcar
+    la bandera y salen en el siguiente intervalo.
+    """
+
+    def __init__(self, client, snapshot: Callable[[], dict], emit: Callable[[dict], None],
+                 interval_ms: int = 1000, prefix: str = "dashboard:stats"):
+        self.client = client
+        self.snapshot = snapshot
+        self.emit = emit
+        self.interval_ms = interval_ms
+        self.dirty_key = f"{prefix}:dirty"
+        self.turn_key = f"{prefix}:turn"
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._claim = client.register_script(CLAIM_SCRIPT)
+        self._thread = None
+
+    def mark_dirty(self):
+        """Marca que las estadísticas cambiaron"""
+        try:
+            self.client.set(self.dirty_key, 1)
+        except Exception as e:
+            logger.error(f"Error marcando estadísticas del dashboard como pendientes: {e}")
+
+    def broadcast_if_due(self) -> bool:
+        """
+        Emite un snapshot si hay cambios pendientes y este proceso obtiene el turno.
+
+        Returns:
+            True si este proceso emitió
+        """
+        if not self._claim(keys=[self.dirty_key, self.turn_key], args=[self.owner, self.interval_ms]):
+            return False
+
+        try:
+            self.emit(self.snapshot())
+            return True
+        except Exception:
+            # Volver a marcar para que otro proceso (o el siguiente turno) lo intente
+            self.mark_dirty()
+            raise
+
+    def start(self) -> threading.Thread:
+        """
+        Revisa la marca en un hilo daemon cada medio intervalo.
+
+        Returns:
+            Hilo del broadcaster
+        """
+        poll_interval = self.interval_ms / 2000
+
+        def run():
+            while True:
+                try:
+                    self.broadcast_if_due()
+                except Exception as e:
+                    logger.error(f"Error emitiendo estadísticas del dashboard: {e}", exc_info=True)
+                time.sleep(poll_interval)
+
+        self._thread = threading.Thread(target=run, name="stats-broadcaster", daemon=True)
+        self._thread.start()
+        return self._thread
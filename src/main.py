@@ -1,23 +1,32 @@
 from src.frameworks.http.flask import create_flask_app
 from src.frameworks.db.mongo import create_mongo_client
 from src.frameworks.db.redis import create_redis_client
-from src.frameworks.cache.redis_cache import RedisCache
-from src.frameworks.queue.message_queue import MessageQueue
+from src.frameworks.cache.factory import create_cache
+from src.frameworks.cache.similarity_cache import SimilarityCache
+from src.frameworks.cache.generations import CacheGenerations
+from src.frameworks.queue.factory import create_message_queue
+from src.frameworks.queue.retry_scheduler import RetryScheduler
 from src.frameworks.websocket.socketio_manager import SocketIOManager
-from src.frameworks.db.collections import create_collections_and_indexes
+from src.frameworks.websocket.stats_broadcaster import StatsBroadcaster, DEFERRED_INTERVAL_MS
+from src.frameworks.db.collections import create_collections_and_indexes, create_analysis_cache_indexes, create_rollup_indexes
 from src.config.settings import settings
 from src.frameworks.logging.logger import setup_logger
 
 # Importar blueprints
 from src.app.dashboard.http.dashboard_blueprint import dashboard_blueprint
 from src.app.messages.http.webhook_blueprint import webhook_blueprint
+from src.app.health.http.health_blueprint import health_blueprint
 
 # Importar repositorios
 from src.app.messages.repositories.message_repository import MessageRepository
+from src.app.messages.repositories.analysis_cache_repository import AnalysisCacheRepository, AnalysisHitCounter
 from src.app.dashboard.repositories.dashboard_repository import DashboardRepository
+from src.app.dashboard.repositories.dashboard_counters import DashboardCounters
+from src.app.dashboard.repositories.rollup_repository import RollupRepository
 
 # Importar servicios
-from src.app.messages.services.sentiment_analysis_service import SentimentAnalysisService
+from src.app.messages.services.sentiment_analysis_service import SentimentAnalysisService, compute_cache_generation
+from src.app.messages.services.output_metrics import OutputMetrics
 
 # Importar usecases
 from src.app.dashboard.usecases.manage_dashboard_usecase import DashboardUsecase
@@ -38,28 +47,67 @@ create_collections_and_indexes(
     mongo_db,
     collection_name=settings.MONGO_COLLECTION_MENSAJES
 )
+if settings.ANALYSIS_CACHE_STORE_ENABLED:
+    create_analysis_cache_indexes(mongo_db, settings.MONGO_COLLECTION_ANALYSIS_CACHE)
+if settings.ROLLUPS_ENABLED:
+    create_rollup_indexes(mongo_db, settings.MONGO_COLLECTION_ROLLUPS)
 
 # Crear cliente de caché Redis
-redis_cache = RedisCache()
+redis_cache = create_cache()
+
+# Namespace de las claves de análisis según prompt y modelo (la limpieza la hacen los workers)
+cache_generation = compute_cache_generation()
+cache_generations = CacheGenerations(redis_cache.client, cache_generation)
+cache_generations.start_heartbeat()
+
+similarity_cache = None
+if settings.SIMILARITY_CACHE_ENABLED:
+    similarity_cache = SimilarityCache(
+        redis_cache.client,
+        prefix=f"simcache:{cache_generation}",
+        max_distance=settings.SIMILARITY_CACHE_MAX_DISTANCE,
+        bands=settings.SIMILARITY_CACHE_BANDS
+    )
 
 # Crear cola de mensajes
-message_queue = MessageQueue()
+message_queue = create_message_queue()
+retry_scheduler = RetryScheduler(message_queue)
 
 # Crear repositorios
-message_repository = MessageRepository(mongo_db)
-dashboard_repository = DashboardRepository(mongo_db)
+dashboard_counters = None
+if settings.DASHBOARD_COUNTERS_ENABLED:
+    dashboard_counters = DashboardCounters(
+        redis_client,
+        log_deltas=settings.STATS_DELTA_EVENTS and settings.STATS_BROADCAST_INTERVAL_MS > 0
+    )
+dashboard_repository = DashboardRepository(mongo_db, counters=dashboard_counters)
+analysis_cache_repository = AnalysisCacheRepository(mongo_db) if settings.ANALYSIS_CACHE_STORE_ENABLED else None
+rollup_repository = RollupRepository(mongo_db) if settings.ROLLUPS_ENABLED else None
+message_repository = MessageRepository(
+    mongo_db,
+    dashboard_repository=dashboard_repository,
+    dashboard_counters=dashboard_counters,
+    rollup_repository=rollup_repository
+)
 
 # Crear servicios
-sentiment_analysis_service = SentimentAnalysisService(redis_cache=redis_cache)
+sentiment_analysis_service = SentimentAnalysisService(
+    redis_cache=redis_cache,
+    similarity_cache=similarity_cache,
+    analysis_store=analysis_cache_repository,
+    output_metrics=OutputMetrics(redis_client),
+    hit_counter=AnalysisHitCounter(redis_client) if analysis_cache_repository else None
+)
 
 # Casos de uso
 message_usecase = MessageUsecase(message_repository, sentiment_analysis_service)
-dashboard_usecase = DashboardUsecase(dashboard_repository)
+dashboard_usecase = DashboardUsecase(dashboard_repository, rollup_repository)
 
 # Configurar blueprints
 blueprints = [
-    webhook_blueprint(message_queue, message_repository),
-    dashboard_blueprint(dashboard_usecase)
+    webhook_blueprint(message_queue, message_repository, retry_scheduler, sentiment_analysis_service),
+    dashboard_blueprint(dashboard_usecase),
+    health_blueprint(redis_client, similarity_cache, redis_cache, cache_generations)
 ]
 
 # Crear aplicación Flask con Socket.IO
@@ -68,6 +116,22 @@ app, socketio = create_flask_app(blueprints)
 # Crear gestor de Socket.IO (global para que worker.py pueda acceder)
 socketio_manager = SocketIOManager(socketio)
 
+# El repositorio emite los eventos de los mensajes que el webhook resuelve desde caché
+message_repository.socketio_manager = socketio_manager
+
+# Conteos con versión para los clientes que siguen los eventos stats_delta
+if dashboard_counters:
+    socketio_manager.stats_snapshot_provider = dashboard_repository.get_versioned_counts
+
+# La API solo marca las estadísticas como pendientes y emiten los workers: el webhook
+# responde sin calcular el dashboard (el broadcaster de la API nunca emite)
+message_repository.stats_broadcaster = StatsBroadcaster(
+    redis_client,
+    snapshot=lambda: dashboard_repository.get_dashboard_snapshot(topics_limit=6),
+    emit=socketio_manager.emit_stats_updated,
+    interval_ms=settings.STATS_BROADCAST_INTERVAL_MS or DEFERRED_INTERVAL_MS
+)
+
 # Exponer socketio y socketio_manager como atributos de app para acceso global
 app.socketio = socketio
 app.socketio_manager = socketio_manager
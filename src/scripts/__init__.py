@@ -0,0 +1,3 @@
+"""
+Scripts de mantenimiento y evaluación.
+"""
@@ -0,0 +1,40 @@
+"""
+Recalcula la colección de rollups (conteos por hora y por día) desde `mensajes`.
+
+Pensado para la primera activación de ROLLUPS_ENABLED y para corregir rangos
+después de una caída. Reemplaza los buckets de los días recalculados, así que
+se puede ejecutar varias veces sobre el mismo rango. Requiere MongoDB 5.0+
+($dateTrunc).
+
+Uso:
+    python -m src.scripts.backfill_rollups --desde 2025-01-01 --hasta 2025-02-01
+"""
+
+import argparse
+from src.config.settings import settings
+from src.frameworks.db.mongo import create_mongo_client
+from src.frameworks.db.collections import create_rollup_indexes
+from src.app.dashboard.repositories.rollup_repository import RollupRepository
+from src.utils.datetime_utils import parse_local_date
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula los rollups de mensajes por hora y por día")
+    parser.add_argument("--desde", type=parse_local_date, default=None,
+                        help="Fecha local ISO 8601 desde la que recalcular (default: todo el historial)")
+    parser.add_argument("--hasta", type=parse_local_date, default=None,
+                        help="Fecha local ISO 8601 hasta la que recalcular, exclusiva (default: sin límite)")
+    args = parser.parse_args()
+
+    mongo_client = create_mongo_client()
+    mongo_db = mongo_client[settings.MONGO_DB_NAME]
+    create_rollup_indexes(mongo_db, settings.MONGO_COLLECTION_ROLLUPS)
+
+    repository = RollupRepository(mongo_db)
+    repository.rebuild(mongo_db[settings.MONGO_COLLECTION_MENSAJES], desde=args.desde, hasta=args.hasta)
+
+    print(f"Rollups recalculados en '{settings.MONGO_COLLECTION_ROLLUPS}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Evaluación offline del caché por similitud contra los mensajes guardados.
+
+Recorre los mensajes ya analizados en orden de llegada como si pasaran por
+el caché y, para cada umbral de distancia, reporta cuántos habrían sido
+aciertos exactos o por similitud y en qué proporción el análisis reutilizado
+coincide con el real (mismo sentimiento y tema).
+
+Uso:
+    python -m src.scripts.evaluate_similarity_cache --limit 20000 --max-distance 10
+"""
+
+import argparse
+from collections import defaultdict
+from src.config.settings import settings
+from src.frameworks.db.mongo import create_mongo_client
+from src.frameworks.cache.similarity_cache import simhash, hamming_distance, band_values
+
+
+def load_messages(limit: int) -> list:
+    """
+    Carga los mensajes analizados más recientes, ordenados del más antiguo al más nuevo.
+
+    Args:
+        limit: Máximo de mensajes
+
+    Returns:
+        Lista de documentos con texto_mensaje, sentimiento y tema
+    """
+    client = create_mongo_client()
+    collection = client[settings.MONGO_DB_NAME][settings.MONGO_COLLECTION_MENSAJES]
+
+    docs = list(collection.find(
+        {"sentimiento": {"$ne": None}, "texto_mensaje": {"$type": "string"}},
+        {"texto_mensaje": 1, "sentimiento": 1, "tema": 1, "timestamp": 1}
+    ).sort("timestamp", -1).limit(limit))
+
+    docs.reverse()
+    return docs
+
+
+def simulate(docs: list, max_distance: int) -> list:
+    """
+    Simula el caché sobre la secuencia de mensajes.
+
+    Args:
+        docs: Mensajes en orden de llegada
+        max_distance: Distancia máxima a evaluar
+
+    Returns:
+        Lista de (tipo, distancia, coincide) por mensaje: tipo es "exact",
+        "near" o "miss"; distancia es la del vecino más cercano anterior
+    """
+    bands = max_distance + 1
+    buckets = defaultdict(list)
+    exact = {}
+    outcomes = []
+
+    for doc in docs:
+        texto = doc["texto_mensaje"]
+        label = (doc.get("sentimiento"), doc.get("tema"))
+        exact_key = texto.lower().strip()
+
+        if exact_key in exact:
+            outcomes.append(("exact", 0, exact[exact_key] == label))
+            continue
+
+        fingerprint = simhash(texto)
+        values = band_values(fingerprint, bands)
+
+        best = None
+        for band, value in enumerate(values):
+            for candidate, candidate_label in buckets[(band, value)]:
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= max_distance and (best is None or distance < best[0]):
+                    best = (distance, candidate_label)
+
+        if best:
+            outcomes.append(("near", best[0], best[1] == label))
+        else:
+            outcomes.append(("miss", None, False))
+
+        exact[exact_key] = label
+        for band, value in enumerate(values):
+            buckets[(band, value)].append((fingerprint, label))
+
+    return outcomes
+
+
+def report(outcomes: list, max_distance: int):
+    """Imprime la tabla de aciertos y precisión por umbral"""
+    total = len(outcomes)
+    exact = [o for o in outcomes if o[0] == "exact"]
+    exact_agree = sum(1 for o in exact if o[2])
+
+    print(f"Mensajes evaluados: {total}")
+    print(f"Aciertos exactos: {len(exact)} ({len(exact) / total:.1%}), "
+          f"coinciden {exact_agree / len(exact):.1%}" if exact else "Aciertos exactos: 0")
+    print()
+    print(f"{'umbral':>6} {'por similitud':>14} {'% total':>8} {'coinciden':>10} {'ahorro total':>13}")
+
+    for threshold in range(max_distance + 1):
+        near = [o for o in outcomes if o[0] == "near" and o[1] <= threshold]
+        agree = sum(1 for o in near if o[2])
+        precision = f"{agree / len(near):.1%}" if near else "-"
+        saved = (len(exact) + len(near)) / total
+
+        print(f"{threshold:>6} {len(near):>14} {len(near) / total:>8.1%} {precision:>10} {saved:>13.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evalúa umbrales del caché por similitud")
+    parser.add_argument("--limit", type=int, default=20000, help="Mensajes a evaluar")
+    parser.add_argument("--max-distance", type=int, default=10, help="Umbral máximo a evaluar (bits)")
+    args = parser.parse_args()
+
+    docs = load_messages(args.limit)
+    if not docs:
+        print("No hay mensajes analizados para evaluar")
+        return
+
+    report(simulate(docs, args.max_distance), args.max_distance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Precarga en Redis los análisis más usados del caché durable de MongoDB.
+
+Pensado para ejecutarse al desplegar o después de reiniciar/limpiar Redis,
+para que los mensajes frecuentes no vuelvan a pasar por Gemini.
+
+Uso:
+    python -m src.scripts.warm_analysis_cache --limit 10000
+"""
+
+import argparse
+from src.config.settings import settings
+from src.frameworks.db.mongo import create_mongo_client
+from src.frameworks.db.collections import create_analysis_cache_indexes
+from src.frameworks.cache.redis_cache import RedisCache
+from src.app.messages.repositories.analysis_cache_repository import AnalysisCacheRepository, AnalysisHitCounter
+from src.app.messages.services.sentiment_analysis_service import compute_cache_generation
+
+CHUNK_SIZE = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precarga en Redis los análisis más usados")
+    parser.add_argument("--limit", type=int, default=settings.ANALYSIS_CACHE_WARMUP_SIZE,
+                        help="Número de análisis a precargar")
+    args = parser.parse_args()
+
+    mongo_client = create_mongo_client()
+    mongo_db = mongo_client[settings.MONGO_DB_NAME]
+    create_analysis_cache_indexes(mongo_db, settings.MONGO_COLLECTION_ANALYSIS_CACHE)
+
+    repository = AnalysisCacheRepository(mongo_db)
+    redis_cache = RedisCache()
+
+    # Incluir los aciertos que los workers todavía no volcaron
+    AnalysisHitCounter(redis_cache.client, repository).flush()
+
+    # Solo la generación actual: las demás ya no se consultan
+    generation = compute_cache_generation()
+    entries = repository.find_most_used(args.limit, key_prefix=f"sentiment:{generation}:")
+    loaded = 0
+
+    for start in range(0, len(entries), CHUNK_SIZE):
+        chunk = entries[start:start + CHUNK_SIZE]
+        loaded += redis_cache.set_many(
+            {doc.pop("_id"): doc for doc in chunk},
+            ttl=settings.ANALYSIS_CACHE_TTL
+        )
+
+    print(f"{loaded} análisis de la generación {generation} precargados en Redis")
+
+
+if __name__ == "__main__":
+    main()
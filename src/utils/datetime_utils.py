@@ -45,3 +45,57 @@ def format_timestamp_to_local(
     except Exception as e:
         # En caso de error, retornar el timestamp original
         return timestamp
+
+
+def truncate_to_local(
+    timestamp: datetime,
+    granularity: str,
+    timezone: str = None
+) -> datetime:
+    """
+    Trunca un timestamp UTC al inicio de su hora o de su día en hora local.
+
+    Args:
+        timestamp: Fecha en UTC (naive o con tzinfo)
+        granularity: "hora" o "dia"
+        timezone: Zona horaria local (por defecto la de settings)
+
+    Returns:
+        Inicio del bucket como datetime UTC naive (como se guarda en MongoDB)
+    """
+    local_tz = pytz.timezone(timezone or settings.TIMEZONE)
+
+    if timestamp.tzinfo is None:
+        timestamp = pytz.UTC.localize(timestamp)
+
+    local_dt = timestamp.astimezone(local_tz).replace(tzinfo=None)
+    if granularity == "dia":
+        local_dt = local_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        local_dt = local_dt.replace(minute=0, second=0, microsecond=0)
+
+    # Volver a localizar para usar el offset correcto si el truncado cruza un cambio de horario
+    return local_tz.localize(local_dt).astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def parse_local_date(value: str, timezone: str = None) -> datetime:
+    """
+    Interpreta una fecha ISO 8601 sin zona ("2025-01-31" o "2025-01-31T08:00")
+    como hora local y la convierte a UTC.
+
+    Args:
+        value: Fecha en formato ISO 8601
+        timezone: Zona horaria local (por defecto la de settings)
+
+    Returns:
+        Datetime UTC naive
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    dt = datetime.fromisoformat(value)
+
+    if dt.tzinfo is None:
+        dt = pytz.timezone(timezone or settings.TIMEZONE).localize(dt)
+
+    return dt.astimezone(pytz.UTC).replace(tzinfo=None)
@@ -0,0 +1,227 @@
+"""
+Supervisor que escala procesos worker según la profundidad de la cola.
+
+Lanza entre SUPERVISOR_MIN_WORKERS y SUPERVISOR_MAX_WORKERS procesos
+`worker.main`, reinicia los que se caen y ajusta la cantidad con histéresis
+según el tamaño de la cola y el throughput reciente.
+"""
+
+import math
+import multiprocessing
+import os
+import signal
+import time
+from src.frameworks.queue.factory import create_message_queue
+from src.frameworks.logging.logger import setup_logger
+from src.config.settings import settings
+import worker
+
+
+logger = setup_logger(__name__)
+
+# Variable global para manejar shutdown graceful
+shutdown_requested = False
+
+
+def signal_handler(signum, frame):
+    """Maneja señales de shutdown"""
+    global shutdown_requested
+    logger.warning("Señal de shutdown recibida, deteniendo workers...")
+    shutdown_requested = True
+
+
+class WorkerSupervisor:
+    """
+    Mantiene un conjunto de procesos worker y decide cuántos necesita.
+
+    Escala hacia arriba cuando la cola supera SUPERVISOR_SCALE_UP_QUEUE y no
+    se vaciaría en SUPERVISOR_TARGET_DRAIN_SECONDS al ritmo actual durante
+    SUPERVISOR_SCALE_UP_CHECKS revisiones seguidas. Escala hacia abajo cuando
+    la cola se mantiene bajo SUPERVISOR_SCALE_DOWN_QUEUE durante
+    SUPERVISOR_SCALE_DOWN_CHECKS revisiones. Entre cambios espera
+    SUPERVISOR_COOLDOWN segundos.
+    """
+
+    def __init__(self, message_queue, min_workers: int, max_workers: int):
+        self.message_queue = message_queue
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.processes = []
+        self.stopping = []
+        self.throughput = 0.0
+        self._above_checks = 0
+        self._below_checks = 0
+        self._last_scale_at = 0.0
+        self._last_sample = None
+
+    def start(self):
+        """Lanza los workers mínimos"""
+        for _ in range(self.min_workers):
+            self._spawn()
+
+    def _spawn(self):
+        """Lanza un nuevo proceso worker"""
+        process = multiprocessing.Process(target=worker.main, name="sentiment-worker")
+        process.start()
+        self.processes.append(process)
+        logger.info(f"Worker iniciado (pid {process.pid}), total: {len(self.processes)}")
+
+    def _stop_one(self):
+        """Pide a un worker que termine después de drenar sus mensajes en vuelo"""
+        process = self.processes.pop()
+        os.kill(process.pid, signal.SIGTERM)
+        self.stopping.append(process)
+        logger.info(f"Deteniendo worker (pid {process.pid}), total: {len(self.processes)}")
+
+    def restart_crashed(self):
+        """
+        Reinicia los workers que terminaron sin que se les pidiera.
+        Como solo se revisa cada SUPERVISOR_CHECK_INTERVAL segundos, un worker
+        que falla al arrancar no entra en un loop de reinicios inmediato.
+        """
+        self.stopping = [p for p in self.stopping if p.is_alive()]
+
+        for process in list(self.processes):
+            if process.is_alive():
+                continue
+
+            self.processes.remove(process)
+            logger.error(f"Worker (pid {process.pid}) terminó con código {process.exitcode}, reiniciando...")
+            self._spawn()
+
+    def sample_throughput(self, queue_size: int):
+        """
+        Estima los mensajes procesados por segundo a partir del contador de
+        encolados y la variación del tamaño de la cola (promedio móvil).
+
+        Args:
+            queue_size: Tamaño actual de la cola
+        """
+        now = time.monotonic()
+        enqueued = self.message_queue.get_enqueued_count()
+
+        if self._last_sample:
+            last_time, last_enqueued, last_size = self._last_sample
+            elapsed = now - last_time
+            if elapsed > 0:
+                processed = max(0, (enqueued - last_enqueued) - (queue_size - last_size))
+                self.throughput = 0.7 * self.throughput + 0.3 * (processed / elapsed)
+
+        self._last_sample = (now, enqueued, queue_size)
+
+    def desired_workers(self, queue_size: int) -> int:
+        """
+        Calcula cuántos workers debería haber aplicando histéresis.
+
+        Args:
+            queue_size: Tamaño actual de la cola
+
+        Returns:
+            Número de workers deseado
+        """
+        current = len(self.processes)
+        drain_seconds = queue_size / self.throughput if self.throughput > 0 else math.inf
+
+        if queue_size > settings.SUPERVISOR_SCALE_UP_QUEUE and drain_seconds > settings.SUPERVISOR_TARGET_DRAIN_SECONDS:
+            self._above_checks += 1
+            self._below_checks = 0
+        elif queue_size <= settings.SUPERVISOR_SCALE_DOWN_QUEUE:
+            self._below_checks += 1
+            self._above_checks = 0
+        else:
+            # Zona intermedia: mantener la cantidad actual
+            self._above_checks = 0
+            self._below_checks = 0
+
+        if time.monotonic() - self._last_scale_at < settings.SUPERVISOR_COOLDOWN:
+            return current
+
+        if self._above_checks >= settings.SUPERVISOR_SCALE_UP_CHECKS:
+            per_worker = self.throughput / current if current and self.throughput > 0 else 0
+            if per_worker > 0:
+                needed = math.ceil(queue_size / (per_worker * settings.SUPERVISOR_TARGET_DRAIN_SECONDS))
+            else:
+                needed = current + 1
+            return min(self.max_workers, max(current + 1, needed))
+
+        if self._below_checks >= settings.SUPERVISOR_SCALE_DOWN_CHECKS:
+            return max(self.min_workers, current - 1)
+
+        return current
+
+    def scale_to(self, desired: int):
+        """
+        Lanza o detiene workers hasta llegar a `desired`.
+
+        Args:
+            desired: Número de workers deseado
+        """
+        if desired == len(self.processes):
+            return
+
+        logger.info(f"Escalando workers: {len(self.processes)} -> {desired} "
+                    f"(throughput {self.throughput:.1f} msg/s)")
+
+        while len(self.processes) < desired:
+            self._spawn()
+        while len(self.processes) > desired:
+            self._stop_one()
+
+        self._last_scale_at = time.monotonic()
+        self._above_checks = 0
+        self._below_checks = 0
+
+    def check(self):
+        """Revisa la salud de los workers y ajusta la cantidad"""
+        self.restart_crashed()
+
+        queue_size = self.message_queue.get_queue_size()
+        self.sample_throughput(queue_size)
+        self.scale_to(self.desired_workers(queue_size))
+
+    def shutdown(self):
+        """Detiene todos los workers esperando a que drenen sus mensajes"""
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + settings.WORKER_SHUTDOWN_TIMEOUT + 5
+        for process in self.processes + self.stopping:
+            process.join(timeout=max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker (pid {process.pid}) no terminó a tiempo, forzando cierre")
+                process.kill()
+                process.join()
+
+
+def main():
+    """Función principal del supervisor"""
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal_handler)
+    settings.validate()
+
+    message_queue = create_message_queue()
+    supervisor = WorkerSupervisor(
+        message_queue,
+        min_workers=settings.SUPERVISOR_MIN_WORKERS,
+        max_workers=settings.SUPERVISOR_MAX_WORKERS
+    )
+
+    logger.info(f"Supervisor iniciado: entre {supervisor.min_workers} y {supervisor.max_workers} workers")
+    supervisor.start()
+
+    try:
+        while not shutdown_requested:
+            try:
+                supervisor.check()
+            except Exception as e:
+                logger.error(f"Error en loop del supervisor: {e}")
+            time.sleep(settings.SUPERVISOR_CHECK_INTERVAL)
+    finally:
+        supervisor.shutdown()
+
+    logger.info("Supervisor detenido correctamente")
+
+
+if __name__ == "__main__":
+    main()
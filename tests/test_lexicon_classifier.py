@@ -0,0 +1,60 @@
+"""
+Pruebas del clasificador léxico local.
+"""
+
+import pytest
+from src.app.messages.services.lexicon_classifier import (
+    LexiconClassifier,
+    NEGATED_MAX_CONFIDENCE,
+    normalize_tokens,
+)
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return LexiconClassifier()
+
+
+def test_normalize_tokens_keeps_clause_punctuation():
+    assert normalize_tokens("¿No? Excelente café, gracias.") == [
+        "¿", "no", "?", "excelente", "cafe", ",", "gracias", "."
+    ]
+
+
+@pytest.mark.parametrize("texto", [
+    "sin quejas, excelente café",
+    "no tengo quejas. Excelente café",
+    "no, excelente café",
+    "¿No? Excelente servicio",
+    "nada que reclamar, excelente servicio",
+])
+def test_negation_does_not_cross_clause_boundaries(classifier, texto):
+    result = classifier.classify(texto)
+
+    assert result["sentimiento"] == "positivo"
+
+
+@pytest.mark.parametrize("texto", [
+    "sin quejas, excelente café",
+    "no tengo quejas. Excelente café",
+    "nada que reclamar, excelente servicio",
+    "el café no estaba bueno",
+])
+def test_negated_terms_are_escalated(classifier, texto):
+    result = classifier.classify(texto)
+
+    assert result["confianza"] <= NEGATED_MAX_CONFIDENCE
+
+
+def test_negation_within_clause_flips_sentiment(classifier):
+    result = classifier.classify("el café no estaba bueno")
+
+    assert result["sentimiento"] == "negativo"
+
+
+def test_obvious_messages_keep_high_confidence(classifier):
+    result = classifier.classify("el baño estaba sucio, horrible")
+
+    assert result["sentimiento"] == "negativo"
+    assert result["tema"] == "Limpieza"
+    assert result["confianza"] > NEGATED_MAX_CONFIDENCE
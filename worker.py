@@ -4,16 +4,35 @@ Worker para procesar mensajes de la cola en background.
 
 import signal
 import sys
+import threading
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, wait
 from flask_socketio import SocketIO
 from src.frameworks.db.mongo import create_mongo_client
-from src.frameworks.cache.redis_cache import RedisCache
+from src.frameworks.cache.factory import create_cache
+from src.frameworks.cache.similarity_cache import SimilarityCache
+from src.frameworks.cache.single_flight import SingleFlight
+from src.frameworks.cache.generations import CacheGenerations
 from src.frameworks.queue.message_queue import MessageQueue
+from src.frameworks.queue.factory import create_message_queue
+from src.frameworks.queue.retry_scheduler import RetryScheduler
+from src.frameworks.resilience.rate_limiter import RedisRateLimiter
+from src.frameworks.resilience.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from src.frameworks.resilience.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.app.messages.services.sentiment_analysis_service import neutral_fallback_analysis
 from src.frameworks.websocket.socketio_manager import SocketIOManager
+from src.frameworks.websocket.stats_broadcaster import StatsBroadcaster, DEFERRED_INTERVAL_MS
 from src.app.messages.repositories.message_repository import MessageRepository
-from src.app.messages.services.sentiment_analysis_service import SentimentAnalysisService
+from src.app.messages.repositories.analysis_cache_repository import AnalysisCacheRepository, AnalysisHitCounter
+from src.app.messages.services.sentiment_analysis_service import SentimentAnalysisService, compute_cache_generation
+from src.app.messages.services.lexicon_classifier import LexiconClassifier
+from src.app.messages.services.output_metrics import OutputMetrics
 from src.frameworks.logging.logger import setup_logger
 from src.config.settings import settings
 from src.app.dashboard.repositories.dashboard_repository import DashboardRepository
+from src.app.dashboard.repositories.dashboard_counters import DashboardCounters
+from src.app.dashboard.repositories.rollup_repository import RollupRepository
 
 
 logger = setup_logger(__name__)
@@ -29,8 +48,32 @@ def signal_handler(signum, frame):
     shutdown_requested = True
 
 
+def handle_failure(message_data: dict, error: Exception, retry_scheduler: Optional[RetryScheduler]):
+    """
+    Programa el reintento de un mensaje fallido (o lo envía a la DLQ).
+
+    Args:
+        message_data: Mensaje que falló
+        error: Excepción que causó el fallo
+        retry_scheduler: Planificador de reintentos (None = descartar el mensaje)
+    """
+    if not retry_scheduler:
+        return
+
+    try:
+        # Con el circuito abierto no es un fallo del mensaje: se posterga sin gastar intentos
+        if isinstance(error, CircuitOpenError):
+            retry_scheduler.defer(message_data, settings.CIRCUIT_BREAKER_RESET_TIMEOUT)
+            return
+
+        retry_scheduler.schedule_retry(message_data, error)
+    except Exception as e:
+        logger.error(f"Error programando reintento de {message_data.get('message_id')}: {e}")
+
+
 def process_message(message_data: dict, repository: MessageRepository,
-                   sentiment_service: SentimentAnalysisService):
+                   sentiment_service: SentimentAnalysisService,
+                   retry_scheduler: Optional[RetryScheduler] = None):
     """
     Procesa un mensaje de la cola: analiza con IA y actualiza en MongoDB.
     Los eventos Socket.IO se emiten automáticamente desde el repositorio.
@@ -39,6 +82,7 @@ def process_message(message_data: dict, repository: MessageRepository,
         message_data: Dict con texto_mensaje, numero_remitente, message_id
         repository: Repositorio de mensajes (con socket manager configurado)
         sentiment_service: Servicio de análisis
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
     """
     try:
         message_id = message_data["message_id"]
@@ -56,20 +100,390 @@ def process_message(message_data: dict, repository: MessageRepository,
             sentimiento=analysis["sentimiento"],
             tema=analysis["tema"],
             resumen=analysis["resumen"],
-            numero_remitente=numero_remitente
+            numero_remitente=numero_remitente,
+            origen=analysis.get("origen")
         )
 
-        logger.info(f"Mensaje {message_id} procesado: {analysis['sentimiento']}/{analysis['tema']}")
+        logger.info(f"Mensaje {message_id} procesado ({analysis.get('origen')}): "
+                    f"{analysis['sentimiento']}/{analysis['tema']}")
 
     except Exception as e:
         logger.error(f"Error procesando mensaje {message_data.get('message_id')}: {e}")
-        # Aquí podrías implementar lógica de reintento o dead letter queue
+        handle_failure(message_data, e, retry_scheduler)
+
+
+class AnalysisWriteBuffer:
+    """
+    Acumula análisis y los persiste con un solo bulk_write cuando se llena
+    (WRITE_BATCH_SIZE) o cuando vence la ventana de tiempo (WRITE_FLUSH_MS).
+
+    Los mensajes se confirman en la cola solo después de guardarse, y los
+    que fallan al guardar pasan por el planificador de reintentos.
+    """
+
+    def __init__(self, repository: MessageRepository, message_queue: MessageQueue,
+                 retry_scheduler: Optional[RetryScheduler] = None,
+                 max_items: int = None, max_wait_ms: int = None):
+        self.repository = repository
+        self.message_queue = message_queue
+        self.retry_scheduler = retry_scheduler
+        self.max_items = max_items or settings.WRITE_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.WRITE_FLUSH_MS) / 1000
+        self._pending = []
+        self._first_added_at = None
+
+    def add(self, message_data: dict, analysis: dict):
+        """
+        Agrega un análisis al buffer y lo guarda si corresponde.
+
+        Args:
+            message_data: Mensaje de la cola
+            analysis: Dict con sentimiento, tema y resumen
+        """
+        if not self._pending:
+            self._first_added_at = time.monotonic()
+        self._pending.append((message_data, analysis))
+
+        if len(self._pending) >= self.max_items:
+            self.flush()
+
+    def fail(self, message_data: dict, error: Exception):
+        """
+        Registra un mensaje que no pudo analizarse: programa su reintento y lo confirma.
+
+        Args:
+            message_data: Mensaje de la cola
+            error: Excepción que causó el fallo
+        """
+        handle_failure(message_data, error, self.retry_scheduler)
+        self.message_queue.ack(message_data)
+
+    def time_until_flush(self) -> Optional[float]:
+        """Segundos que faltan para vencer la ventana de tiempo (None si el buffer está vacío)"""
+        if not self._pending:
+            return None
+        return max(0.0, self._first_added_at + self.max_wait - time.monotonic())
+
+    def flush_if_due(self):
+        """Guarda el buffer si venció la ventana de tiempo"""
+        if self._pending and self.time_until_flush() == 0:
+            self.flush()
+
+    def flush(self):
+        """Guarda todos los análisis pendientes con un solo bulk_write"""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+
+        results = [
+            {
+                "message_id": message_data["message_id"],
+                "sentimiento": analysis["sentimiento"],
+                "tema": analysis["tema"],
+                "resumen": analysis["resumen"],
+                "origen": analysis.get("origen"),
+                "numero_remitente": message_data.get("numero_remitente")
+            }
+            for message_data, analysis in pending
+        ]
+
+        try:
+            outcome = self.repository.bulk_update_analysis(results)
+            failed = {item["message_id"]: item["error"] for item in outcome["failed"]}
+        except Exception as e:
+            logger.error(f"Error guardando lote de {len(pending)} análisis: {e}")
+            failed = {message_data["message_id"]: str(e) for message_data, _ in pending}
+
+        for message_data, analysis in pending:
+            message_id = message_data["message_id"]
+            if message_id in failed:
+                logger.error(f"Error guardando análisis de {message_id}: {failed[message_id]}")
+                handle_failure(message_data, RuntimeError(failed[message_id]), self.retry_scheduler)
+            else:
+                logger.info(f"Mensaje {message_id} procesado: {analysis['sentimiento']}/{analysis['tema']}")
+            self.message_queue.ack(message_data)
+
+
+def process_batch(messages: list, sentiment_service: SentimentAnalysisService,
+                  write_buffer: AnalysisWriteBuffer):
+    """
+    Procesa un lote de mensajes con una sola llamada de análisis a Gemini.
+    Los resultados se guardan en MongoDB a través del buffer de escritura.
+
+    Args:
+        messages: Lista de dicts con texto_mensaje, numero_remitente, message_id
+        sentiment_service: Servicio de análisis
+        write_buffer: Buffer que persiste los análisis y confirma los mensajes
+    """
+    logger.info(f"Procesando lote de {len(messages)} mensajes")
+
+    try:
+        analyses = sentiment_service.analyze_batch([m["texto_mensaje"] for m in messages])
+    except Exception as e:
+        logger.error(f"Error analizando lote de {len(messages)} mensajes: {e}")
+        for message_data in messages:
+            write_buffer.fail(message_data, e)
+        return
+
+    for message_data, analysis in zip(messages, analyses):
+        if analysis is None:
+            logger.error(f"Error procesando mensaje {message_data.get('message_id')}: "
+                         f"sin análisis válido en el lote")
+            write_buffer.fail(message_data, ValueError("Sin análisis válido en el lote"))
+            continue
+
+        write_buffer.add(message_data, analysis)
+
+
+def collect_batch(message_queue: MessageQueue, max_items: int, max_wait_ms: int,
+                  timeout: float = 5) -> list:
+    """
+    Espera el primer grupo de mensajes de la cola y luego junta hasta
+    `max_items` mensajes o hasta que pasen `max_wait_ms` milisegundos.
+
+    Args:
+        message_queue: Cola de mensajes
+        max_items: Tamaño máximo del lote
+        max_wait_ms: Espera máxima para completar el lote
+        timeout: Segundos a esperar por el primer mensaje
+
+    Returns:
+        Lista de mensajes (vacía si no llegó ninguno)
+    """
+    batch = message_queue.dequeue_many(max_items, timeout=timeout)
+    if not batch:
+        return []
+
+    deadline = time.monotonic() + max_wait_ms / 1000
+
+    while len(batch) < max_items:
+        remaining = deadline - time.monotonic()
+        # Un timeout de 0 bloquea indefinidamente, así que se corta antes
+        if remaining <= 0.01:
+            break
+
+        messages = message_queue.dequeue_many(max_items - len(batch), timeout=remaining)
+        if not messages:
+            break
+        batch.extend(messages)
+
+    return batch
+
+
+def run_sequential(message_queue: MessageQueue, repository: MessageRepository,
+                   sentiment_service: SentimentAnalysisService,
+                   retry_scheduler: Optional[RetryScheduler] = None):
+    """
+    Procesa los mensajes de la cola uno a la vez.
+
+    Args:
+        message_queue: Cola de mensajes
+        repository: Repositorio de mensajes
+        sentiment_service: Servicio de análisis
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
+    """
+    while not shutdown_requested:
+        try:
+            # Esperar mensaje (bloqueante, timeout de 5 segundos)
+            message_data = message_queue.dequeue(timeout=5)
+
+            if message_data:
+                process_message(message_data, repository, sentiment_service, retry_scheduler)
+                message_queue.ack(message_data)
+
+        except KeyboardInterrupt:
+            logger.warning("KeyboardInterrupt recibido, cerrando worker...")
+            break
+        except Exception as e:
+            logger.error(f"Error en loop principal del worker: {e}")
+            # Continuar procesando a pesar del error
+
+
+def run_threaded(message_queue: MessageQueue, repository: MessageRepository,
+                 sentiment_service: SentimentAnalysisService, concurrency: int,
+                 retry_scheduler: Optional[RetryScheduler] = None):
+    """
+    Procesa hasta `concurrency` mensajes en paralelo con un pool de hilos.
+
+    Un semáforo acotado limita los mensajes en vuelo: solo se saca un mensaje
+    de la cola cuando hay un slot libre, así la cola de Redis sigue siendo el
+    único buffer. Al recibir SIGTERM se deja de sacar mensajes y se espera a
+    que terminen los que están en vuelo.
+
+    Args:
+        message_queue: Cola de mensajes
+        repository: Repositorio de mensajes
+        sentiment_service: Servicio de análisis
+        concurrency: Número máximo de mensajes en vuelo
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
+    """
+    slots = threading.BoundedSemaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="worker-slot")
+    in_flight = set()
+    in_flight_lock = threading.Lock()
+
+    def run_slot(message_data: dict):
+        # Un error en un slot no debe afectar a los demás ni al loop principal
+        try:
+            process_message(message_data, repository, sentiment_service, retry_scheduler)
+            message_queue.ack(message_data)
+        except Exception as e:
+            logger.error(f"Error no controlado en slot del worker: {e}", exc_info=True)
+        finally:
+            slots.release()
+
+    def forget(future):
+        with in_flight_lock:
+            in_flight.discard(future)
+
+    try:
+        while not shutdown_requested:
+            try:
+                # Esperar un slot libre antes de sacar otro mensaje
+                if not slots.acquire(timeout=1):
+                    continue
+
+                message_data = message_queue.dequeue(timeout=5)
+                if not message_data:
+                    slots.release()
+                    continue
+
+                future = executor.submit(run_slot, message_data)
+                with in_flight_lock:
+                    in_flight.add(future)
+                future.add_done_callback(forget)
+
+            except KeyboardInterrupt:
+                logger.warning("KeyboardInterrupt recibido, cerrando worker...")
+                break
+            except Exception as e:
+                logger.error(f"Error en loop principal del worker: {e}")
+
+    finally:
+        with in_flight_lock:
+            pending = set(in_flight)
+
+        if pending:
+            logger.info(f"Drenando {len(pending)} mensajes en vuelo "
+                        f"(máximo {settings.WORKER_SHUTDOWN_TIMEOUT}s)...")
+            _, not_done = wait(pending, timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+            if not_done:
+                logger.warning(f"{len(not_done)} mensajes no terminaron antes del timeout de shutdown")
+
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batched(message_queue: MessageQueue, repository: MessageRepository,
+                sentiment_service: SentimentAnalysisService,
+                retry_scheduler: Optional[RetryScheduler] = None):
+    """
+    Procesa la cola por lotes de hasta ANALYSIS_BATCH_SIZE mensajes.
+
+    Args:
+        message_queue: Cola de mensajes
+        repository: Repositorio de mensajes
+        sentiment_service: Servicio de análisis
+        retry_scheduler: Planificador de reintentos para mensajes fallidos
+    """
+    write_buffer = AnalysisWriteBuffer(repository, message_queue, retry_scheduler)
+
+    try:
+        while not shutdown_requested:
+            try:
+                # Con análisis pendientes de guardar no se espera más que su ventana
+                flush_in = write_buffer.time_until_flush()
+                timeout = 5 if flush_in is None else min(5, max(0.05, flush_in))
+
+                batch = collect_batch(
+                    message_queue,
+                    max_items=settings.ANALYSIS_BATCH_SIZE,
+                    max_wait_ms=settings.ANALYSIS_BATCH_WAIT_MS,
+                    timeout=timeout
+                )
+
+                if batch:
+                    process_batch(batch, sentiment_service, write_buffer)
+
+                write_buffer.flush_if_due()
+
+            except KeyboardInterrupt:
+                logger.warning("KeyboardInterrupt recibido, cerrando worker...")
+                break
+            except Exception as e:
+                logger.error(f"Error en loop principal del worker: {e}")
+
+    finally:
+        write_buffer.flush()
+
+
+def run_maintenance(tasks: list):
+    """
+    Ejecuta tareas periódicas de mantenimiento hasta que se pida el shutdown.
+
+    Args:
+        tasks: Lista de tuplas (intervalo_en_segundos, función)
+    """
+    next_run = [time.monotonic() + interval for interval, _ in tasks]
+
+    while not shutdown_requested:
+        now = time.monotonic()
+        for i, (interval, task) in enumerate(tasks):
+            if now < next_run[i]:
+                continue
+            next_run[i] = now + interval
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Error en tarea de mantenimiento {task.__name__}: {e}")
+        time.sleep(1)
+
+
+def start_maintenance(message_queue: MessageQueue,
+                      retry_scheduler: Optional[RetryScheduler] = None,
+                      cache_generations: Optional[CacheGenerations] = None,
+                      dashboard_repository: Optional[DashboardRepository] = None,
+                      circuit_breaker: Optional[CircuitBreaker] = None,
+                      hit_counter: Optional[AnalysisHitCounter] = None) -> Optional[threading.Thread]:
+    """
+    Inicia en segundo plano las tareas periódicas que necesitan la cola y el caché.
+
+    Args:
+        message_queue: Cola de mensajes
+        retry_scheduler: Planificador de reintentos
+        cache_generations: Generaciones del caché de análisis (heartbeat y limpieza)
+        dashboard_repository: Repositorio del dashboard (reconciliación de contadores)
+        circuit_breaker: Circuit breaker de Gemini (heartbeat del estado publicado)
+        hit_counter: Contador de aciertos del caché (volcado al caché durable)
+
+    Returns:
+        Hilo de mantenimiento o None si no hay tareas
+    """
+    tasks = []
+    if message_queue.reliable:
+        tasks.append((settings.QUEUE_REAPER_INTERVAL, message_queue.reap_expired))
+    if retry_scheduler:
+        tasks.append((settings.RETRY_POLL_INTERVAL, retry_scheduler.promote_due))
+    if cache_generations:
+        tasks.append((cache_generations.heartbeat_ttl / 3, cache_generations.heartbeat))
+        tasks.append((settings.CACHE_GENERATION_SWEEP_INTERVAL, cache_generations.sweep_step))
+    if dashboard_repository and dashboard_repository.counters:
+        tasks.append((settings.DASHBOARD_COUNTERS_RECONCILE_INTERVAL, dashboard_repository.reconcile_counters))
+    if circuit_breaker and circuit_breaker.state_client:
+        tasks.append((circuit_breaker.state_ttl / 3, circuit_breaker.heartbeat))
+    if hit_counter and hit_counter.repository:
+        tasks.append((settings.ANALYSIS_CACHE_HITS_FLUSH_INTERVAL, hit_counter.flush))
+
+    if not tasks:
+        return None
+
+    thread = threading.Thread(target=run_maintenance, args=(tasks,), name="worker-maintenance", daemon=True)
+    thread.start()
+    return thread
 
 
 def main():
     """Función principal del worker"""
-    global shutdown_requested
-
     # Registrar handlers para shutdown graceful
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
@@ -88,36 +502,142 @@ def main():
     socketio = SocketIO(message_queue=redis_url)
     socketio_manager = SocketIOManager(socketio)
 
-    dashboard_repository = DashboardRepository(mongo_db)
+    redis_cache = create_cache()
+    dashboard_counters = None
+    if settings.DASHBOARD_COUNTERS_ENABLED:
+        dashboard_counters = DashboardCounters(
+            redis_cache.client,
+            log_deltas=settings.STATS_DELTA_EVENTS and settings.STATS_BROADCAST_INTERVAL_MS > 0
+        )
+    dashboard_repository = DashboardRepository(mongo_db, counters=dashboard_counters)
+
+    message_queue = create_message_queue()
+    retry_scheduler = RetryScheduler(message_queue)
+
+    # Límites compartidos de Gemini entre todos los workers
+    rate_limiter = None
+    if settings.GEMINI_RPM or settings.GEMINI_TPM:
+        rate_limiter = RedisRateLimiter(
+            redis_cache.client,
+            name="gemini",
+            requests_per_minute=settings.GEMINI_RPM,
+            tokens_per_minute=settings.GEMINI_TPM
+        )
+
+    concurrency_limiter = None
+    if settings.GEMINI_ADAPTIVE_CONCURRENCY:
+        concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.WORKER_CONCURRENCY,
+            min_limit=settings.GEMINI_CONCURRENCY_MIN,
+            max_limit=settings.GEMINI_CONCURRENCY_MAX,
+            latency_threshold=settings.GEMINI_LATENCY_THRESHOLD
+        )
+
+    circuit_breaker = CircuitBreaker(
+        "gemini",
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        latency_threshold=settings.CIRCUIT_BREAKER_LATENCY_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+        state_client=redis_cache.client
+    )
+
+    # Namespace de las claves de análisis según prompt y modelo
+    cache_generation = compute_cache_generation()
+    cache_generations = CacheGenerations(redis_cache.client, cache_generation)
+    cache_generations.heartbeat()
+
+    similarity_cache = None
+    if settings.SIMILARITY_CACHE_ENABLED:
+        similarity_cache = SimilarityCache(
+            redis_cache.client,
+            prefix=f"simcache:{cache_generation}",
+            max_distance=settings.SIMILARITY_CACHE_MAX_DISTANCE,
+            bands=settings.SIMILARITY_CACHE_BANDS
+        )
+
+    single_flight = None
+    if settings.SINGLE_FLIGHT_ENABLED:
+        single_flight = SingleFlight(
+            redis_cache.client,
+            lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL,
+            wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+        )
+
+    # Primer nivel local: resuelve los mensajes obvios sin llamar a Gemini
+    local_classifier = LexiconClassifier() if settings.LEXICON_ENABLED else None
+
+    # Con el circuito abierto: postergar (defer) o responder con un analizador local
+    fallback_analyzer = None
+    if settings.CIRCUIT_BREAKER_FALLBACK == "neutral":
+        fallback_analyzer = neutral_fallback_analysis
+    elif settings.CIRCUIT_BREAKER_FALLBACK == "lexicon":
+        fallback_analyzer = (local_classifier or LexiconClassifier()).classify
 
-    redis_cache = RedisCache()
-    message_queue = MessageQueue()
-    sentiment_service = SentimentAnalysisService(redis_cache=redis_cache)
+    analysis_store = AnalysisCacheRepository(mongo_db) if settings.ANALYSIS_CACHE_STORE_ENABLED else None
+    hit_counter = AnalysisHitCounter(redis_cache.client, analysis_store) if analysis_store else None
+
+    sentiment_service = SentimentAnalysisService(
+        redis_cache=redis_cache,
+        rate_limiter=rate_limiter,
+        concurrency_limiter=concurrency_limiter,
+        circuit_breaker=circuit_breaker,
+        fallback_analyzer=fallback_analyzer,
+        local_classifier=local_classifier,
+        similarity_cache=similarity_cache,
+        single_flight=single_flight,
+        analysis_store=analysis_store,
+        output_metrics=OutputMetrics(redis_cache.client),
+        hit_counter=hit_counter
+    )
+
+    # El worker con el turno emite lo que cualquier proceso marcó como pendiente,
+    # incluidos los mensajes que el webhook resuelve desde caché
+    interval_ms = settings.STATS_BROADCAST_INTERVAL_MS or DEFERRED_INTERVAL_MS
+    if dashboard_counters and dashboard_counters.log_deltas:
+        # Los deltas registrados se emiten en orden de versión
+        stats_broadcaster = StatsBroadcaster(
+            redis_cache.client,
+            snapshot=dashboard_counters.take_deltas,
+            emit=socketio_manager.emit_stats_deltas,
+            interval_ms=interval_ms
+        )
+    else:
+        stats_broadcaster = StatsBroadcaster(
+            redis_cache.client,
+            snapshot=lambda: dashboard_repository.get_dashboard_snapshot(topics_limit=6),
+            emit=socketio_manager.emit_stats_updated,
+            interval_ms=interval_ms
+        )
+    stats_broadcaster.start()
 
     message_repository = MessageRepository(
         mongo_db=mongo_db,
         socketio_manager=socketio_manager,
-        dashboard_repository=dashboard_repository
+        dashboard_repository=dashboard_repository,
+        dashboard_counters=dashboard_counters,
+        # Sin emisión agrupada el worker emite stats_updated en cada análisis
+        stats_broadcaster=stats_broadcaster if settings.STATS_BROADCAST_INTERVAL_MS else None,
+        rollup_repository=RollupRepository(mongo_db) if settings.ROLLUPS_ENABLED else None
     )
 
-    logger.info(f"Worker escuchando cola '{message_queue.queue_name}'...")
+    start_maintenance(message_queue, retry_scheduler, cache_generations, dashboard_repository,
+                      circuit_breaker, hit_counter)
 
     # Loop principal
-    while not shutdown_requested:
-        try:
-            # Esperar mensaje (bloqueante, timeout de 5 segundos)
-            message_data = message_queue.dequeue(timeout=5)
-
-            if message_data:
-                process_message(message_data, message_repository, sentiment_service)
-
-        except KeyboardInterrupt:
-            logger.warning("KeyboardInterrupt recibido, cerrando worker...")
-            break
-        except Exception as e:
-            logger.error(f"Error en loop principal del worker: {e}")
-            # Continuar procesando a pesar del error
+    if settings.WORKER_MODE == "threads":
+        logger.info(f"Worker escuchando cola '{message_queue.queue_name}' "
+                    f"con {settings.WORKER_CONCURRENCY} mensajes en vuelo...")
+        run_threaded(message_queue, message_repository, sentiment_service,
+                     concurrency=settings.WORKER_CONCURRENCY, retry_scheduler=retry_scheduler)
+    elif settings.WORKER_MODE == "batch":
+        logger.info(f"Worker escuchando cola '{message_queue.queue_name}' "
+                    f"en lotes de hasta {settings.ANALYSIS_BATCH_SIZE} mensajes...")
+        run_batched(message_queue, message_repository, sentiment_service, retry_scheduler)
+    else:
+        logger.info(f"Worker escuchando cola '{message_queue.queue_name}'...")
+        run_sequential(message_queue, message_repository, sentiment_service, retry_scheduler)
 
+    circuit_breaker.unpublish()
     logger.info("Worker detenido correctamente")
 
 